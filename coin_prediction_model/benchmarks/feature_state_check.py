@@ -0,0 +1,77 @@
+"""
+FeatureState eşdeğerlik kontrolü: artımlı özellik satırları ve tahminler ile add_technical_indicators / predict_from_frame
+
+FeatureState satırları tam çerçeve hesabıyla bit bit aynı değildir (EMA'lar ve pencere
+toplamları farklı sırada toplanır); fark kayan nokta toleransı içinde kalmalıdır. Her uç
+nokta için pencere ve tahminler np.allclose ile karşılaştırılır, en büyük göreli fark yazdırılır.
+
+Kullanım (coin_prediction_model klasöründen): python benchmarks/feature_state_check.py [mum sayısı] [kontrol sayısı]
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prepare_data_benchmark import make_candles
+from market_data.features import FEATURE_COLUMNS, SEQUENCE_LENGTH, FeatureState
+from train_single_coin import add_technical_indicators, prepare_data, flatten_windows, build_models
+from predict_price import predict_from_frame, predict_from_state
+
+RTOL = 1e-9
+PREDICTION_KEYS = ('rf_prediction', 'gb_prediction', 'prediction', 'change_percent', 'agreement')
+
+
+def relative_difference(actual, expected):
+    """En büyük |actual - expected| / |expected| (sıfır beklenenlerde mutlak fark)"""
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    scale = np.where(expected == 0, 1.0, np.abs(expected))
+    return float(np.max(np.abs(actual - expected) / scale))
+
+
+def main():
+    n_candles = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    n_checks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    candles = make_candles(n_candles)
+    candles.insert(0, 'timestamp', pd.date_range('2024-01-01', periods=n_candles, freq='h'))
+
+    # Modeller kontrol edilen uç noktalardan önceki mumlarla eğitilir
+    train_end = n_candles - n_checks
+    X, y, scaler = prepare_data(add_technical_indicators(candles.iloc[:train_end]))
+    rf_model, gb_model = build_models(n_jobs=1)
+    index = np.arange(len(X))
+    rf_model.fit(flatten_windows(X, index), y)
+    gb_model.fit(flatten_windows(X, index), y)
+
+    state = FeatureState.from_dataframe(candles.iloc[:train_end])
+    window_diff = prediction_diff = 0.0
+    window_failures = prediction_failures = 0
+    for end in range(train_end, n_candles):
+        history = candles.iloc[:end + 1]
+        row = history.iloc[-1]
+        state.update(row['timestamp'].value // 10 ** 6, row['open'], row['high'], row['low'], row['close'], row['volume'])
+
+        expected_window = add_technical_indicators(history).dropna()[FEATURE_COLUMNS].values[-SEQUENCE_LENGTH:]
+        window = state.window()
+        window_diff = max(window_diff, relative_difference(window, expected_window))
+        window_failures += not np.allclose(window, expected_window, rtol=RTOL, atol=0)
+
+        expected = predict_from_frame(rf_model, gb_model, scaler, history)
+        actual = predict_from_state(rf_model, gb_model, scaler, state)
+        values = [actual[key] for key in PREDICTION_KEYS]
+        expected_values = [expected[key] for key in PREDICTION_KEYS]
+        prediction_diff = max(prediction_diff, relative_difference(values, expected_values))
+        prediction_failures += not np.allclose(values, expected_values, rtol=RTOL, atol=0) \
+            or actual['candle_time'] != expected['candle_time']
+
+    print(f"{n_candles} mum, {n_checks} uç nokta, rtol={RTOL:g}")
+    print(f"{'check':>12} | {'max rel diff':>12} | {'allclose':>8}")
+    print("-" * 40)
+    print(f"{'window':>12} | {window_diff:>12.2e} | {window_failures == 0}")
+    print(f"{'prediction':>12} | {prediction_diff:>12.2e} | {prediction_failures == 0}")
+    return 0 if window_failures == prediction_failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Model girdisi benchmark: düzleştirilmiş 60x13 pencere (780 sütun) ile özet vektör (summarize_windows)
+
+Her model türü (RF / GB) ve girdi için aynı veride eğitim süresi, kayıtlı model boyutu,
+tek satır ve toplu (coin listesi) tahmin gecikmesi ile zaman sıralı test MAPE'i ölçülür.
+
+Kullanım (coin_prediction_model klasöründen): python benchmarks/feature_vector_benchmark.py [mum sayısı]
+"""
+import io
+import os
+import sys
+import time
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prepare_data_benchmark import make_candles
+from train_single_coin import add_technical_indicators, prepare_data, flatten_windows, split_index, build_models
+
+
+def model_size(model):
+    """joblib ile kaydedilmiş boyut (MB, sıkıştırmasız)"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell() / 1024 ** 2
+
+
+def predict_latency(model, X, repeat=50):
+    """Tek predict çağrısının medyan süresi (ms)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    n_candles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    df = add_technical_indicators(make_candles(n_candles))
+    X, y, _ = prepare_data(df)
+    train_index, test_index = split_index(len(X))
+    X_train, X_test = flatten_windows(X, train_index), flatten_windows(X, test_index)
+    y_train, y_test = y[train_index], y[test_index]
+    batch = X_test[:100]
+
+    print(f"{n_candles} mum, {len(X_train)} eğitim / {len(X_test)} test örneği (n_jobs=1)")
+    print(f"{'model':>18} | {'input':>8} | {'fit (s)':>8} | {'size (MB)':>9} | {'1 row (ms)':>10} | "
+          f"{'100 rows (ms)':>13} | {'MAPE':>7}")
+    print("-" * 92)
+
+    for name, index in [('random_forest', 0), ('gradient_boosting', 1)]:
+        for inputs in ('flat', 'summary'):
+            model = build_models(n_jobs=1, inputs={name: inputs})[index]
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_time = time.perf_counter() - start
+            mape = np.mean(np.abs((y_test - model.predict(X_test)) / y_test)) * 100
+            print(f"{name:>18} | {inputs:>8} | {fit_time:>8.2f} | {model_size(model):>9.2f} | "
+                  f"{predict_latency(model, X_test[-1:]):>10.2f} | {predict_latency(model, batch):>13.2f} | {mape:>6.3f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Model yükleme benchmark: eski üç ayrı joblib dosyası ile model paketi karşılaştırması
+
+Aynı RF/GB/scaler N coin için eski biçimde, sıkıştırmasız paket (mmap) ve sıkıştırılmış
+paket olarak yazılır; disk boyutu, açılış (metadata) süresi ve tüm modellerin yüklenme
+süresi ölçülür.
+
+Kullanım (coin_prediction_model klasöründen): python benchmarks/model_load_benchmark.py [coin sayısı]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_bundle import MODEL_PARTS, legacy_paths, list_bundles, load_bundle, save_bundle
+from prepare_data_benchmark import make_candles
+from train_single_coin import add_technical_indicators, prepare_data, flatten_windows, train_model
+
+
+def train_reference_models(n_candles=1000):
+    """Sentetik veride eğitilmiş {'rf', 'gb', 'scaler'}"""
+    df = add_technical_indicators(make_candles(n_candles))
+    X, y, scaler = prepare_data(df)
+    rf_model, gb_model, _ = train_model(X, y)
+    return {'rf': rf_model, 'gb': gb_model, 'scaler': scaler}
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def load_all(symbols, loader, repeat=3):
+    """(açılış süresi, toplam süre) saniye, `repeat` denemenin en iyisi"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bundles = [loader(symbol) for symbol in symbols]
+        opened = time.perf_counter() - start
+        for bundle in bundles:
+            bundle.as_tuple()
+        timings.append((opened, time.perf_counter() - start))
+    return min(timings, key=lambda timing: timing[1])
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    models = train_reference_models()
+    sample = flatten_windows(prepare_data(add_technical_indicators(make_candles(200)))[0])[-1:]
+    expected = models['rf'].predict(sample)
+
+    work_dir = tempfile.mkdtemp(prefix='model_load_benchmark_')
+    try:
+        legacy_dir = os.path.join(work_dir, 'saved_models')
+        os.makedirs(legacy_dir)
+        symbols = [f"COIN{i}USDT" for i in range(n_symbols)]
+        for symbol in symbols:
+            for part, path in legacy_paths(symbol, legacy_dir).items():
+                joblib.dump(models[part], path)
+
+        # (etiket, paket klasörü, eski dosya klasörü, sıkıştırma, mmap)
+        empty_dir = os.path.join(work_dir, 'empty')
+        bundle_dir = os.path.join(work_dir, 'bundles')
+        variants = [('legacy 3 files', empty_dir, legacy_dir, None, False),
+                    ('bundle', bundle_dir, empty_dir, 0, False),
+                    ('bundle mmap', bundle_dir, empty_dir, 0, True),
+                    ('bundle compress=3', os.path.join(work_dir, 'bundles_z'), empty_dir, 3, False)]
+        for _, bundle_dir, _, compress, mmap in variants[2:]:
+            for symbol in symbols:
+                save_bundle(symbol, models, {'features': [], 'sequence_length': 60}, bundle_dir, compress)
+
+        print(f"{n_symbols} coin, RF {models['rf'].n_estimators} ağaç, "
+              f"{models['rf'].n_features_in_} özellik, GB {models['gb'].n_estimators} ağaç")
+        print(f"{'format':>18} | {'disk (MB)':>9} | {'open (ms)':>9} | {'load all (ms)':>13} | {'per coin (ms)':>13} | match")
+        print("-" * 86)
+
+        for label, bundle_dir, model_dir, compress, mmap in variants:
+            loader = lambda symbol: load_bundle(symbol, bundle_dir, model_dir, mmap)
+            opened, total = load_all(list_bundles(bundle_dir, model_dir), loader)
+            rf_model = loader(symbols[0]).models[MODEL_PARTS[0]]
+            match = np.allclose(rf_model.predict(sample), expected)
+            size = directory_size(legacy_dir if compress is None else bundle_dir) / 1024 ** 2
+            print(f"{label:>18} | {size:>9.1f} | {opened * 1000:>9.1f} | "
+                  f"{total * 1000:>13.1f} | {total * 1000 / n_symbols:>13.1f} | {match}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+prepare_data benchmark: eski Python döngüsü + np.array ile sliding_window_view karşılaştırması
+
+Eğitim kümelerinin hazırlanmasındaki (sequence + train/test split + düzleştirme)
+tepe bellek ve süre ölçülür.
+
+Kullanım (coin_prediction_model klasöründen): python benchmarks/prepare_data_benchmark.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from train_single_coin import add_technical_indicators, prepare_data, flatten_windows
+
+
+def legacy_training_sets(df, sequence_length=60):
+    """Önceki uygulama: döngüyle sequence, np.array kopyası, split ve reshape (referans)"""
+    df = df.dropna()
+    features = ['open', 'high', 'low', 'close', 'volume', 'rsi', 'macd', 'signal',
+                'ma20', 'upper_band', 'lower_band', 'atr', 'momentum']
+    X = df[features].values[:-1]
+    y = df['close'].shift(-1).values[:-1]
+    X_scaled = StandardScaler().fit_transform(X)
+
+    X_seq, y_seq = [], []
+    for i in range(len(X_scaled) - sequence_length):
+        X_seq.append(X_scaled[i:(i + sequence_length)])
+        y_seq.append(y[i + sequence_length])
+    X_seq, y_seq = np.array(X_seq), np.array(y_seq)
+
+    X_train, X_test, y_train, y_test = train_test_split(X_seq, y_seq, test_size=0.2, random_state=42)
+    return X_train.reshape(X_train.shape[0], -1), X_test.reshape(X_test.shape[0], -1)
+
+
+def window_training_sets(df, dtype=np.float64):
+    """Yeni uygulama: sliding_window_view + indeks split + tek kopyalık düzleştirme"""
+    X, y, _ = prepare_data(df, dtype=dtype)
+    train_index, test_index = train_test_split(np.arange(len(X)), test_size=0.2, random_state=42)
+    return flatten_windows(X, train_index), flatten_windows(X, test_index)
+
+
+def make_candles(n, seed=42):
+    """Rastgele yürüyüş ile sentetik mum verisi"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n)
+    })
+
+
+def measure(func, *args):
+    """(sonuç, süre saniye, tepe bellek MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def main():
+    print(f"{'Candles':>8} | {'method':>16} | {'time (ms)':>10} | {'peak (MB)':>10} | match")
+    print("-" * 66)
+
+    for n in [1_000, 8_760, 26_280]:
+        df = add_technical_indicators(make_candles(n))
+        (legacy_train, legacy_test), legacy_time, legacy_peak = measure(legacy_training_sets, df)
+        print(f"{n:>8} | {'loop + np.array':>16} | {legacy_time * 1000:>10.1f} | {legacy_peak:>10.1f} |")
+
+        for label, dtype in [('window float64', np.float64), ('window float32', np.float32)]:
+            (train, test), elapsed, peak = measure(window_training_sets, df, dtype)
+            match = np.allclose(train, legacy_train, atol=1e-5) and np.allclose(test, legacy_test, atol=1e-5)
+            print(f"{n:>8} | {label:>16} | {elapsed * 1000:>10.1f} | {peak:>10.1f} | {match}")
+        del legacy_train, legacy_test
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Model Paketleri
+Her coin için RF, GB ve scaler'ı tek dosyada, sürümlü metadata ile saklar
+
+    ml_models/bundles/BTCUSDT/models.joblib   # {'rf', 'gb', 'scaler'} (varsayılan sıkıştırmasız)
+    ml_models/bundles/BTCUSDT/metadata.json   # özellikler, eğitim penceresi, metrikler, sürümler
+
+Metadata model dosyası açılmadan okunur; modeller ilk kullanımda yüklenir.
+Eski ml_models/saved_models/{symbol}_rf/_gb/_scaler.joblib dosyaları da okunabilir.
+
+Kullanım: python model_bundle.py migrate   # eski dosyaları pakete çevir
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_DIR = os.path.join(BASE_DIR, 'ml_models', 'bundles')
+LEGACY_MODEL_DIR = os.path.join(BASE_DIR, 'ml_models', 'saved_models')
+BUNDLE_FORMAT_VERSION = 1
+MODEL_PARTS = ('rf', 'gb', 'scaler')
+
+class ModelBundle:
+    """Metadata of one symbol's models; the models are loaded on first access"""
+
+    def __init__(self, symbol, metadata, loader):
+        self.symbol = symbol
+        self.metadata = metadata
+        self._loader = loader
+        self._models = None
+        self._lock = threading.Lock()
+
+    @property
+    def models(self):
+        """{'rf': ..., 'gb': ..., 'scaler': ...}"""
+        if self._models is None:
+            with self._lock:
+                if self._models is None:
+                    self._models = self._loader()
+        return self._models
+
+    @property
+    def loaded(self):
+        return self._models is not None
+
+    def as_tuple(self):
+        """(rf, gb, scaler)"""
+        models = self.models
+        return tuple(models[part] for part in MODEL_PARTS)
+
+def bundle_path(symbol, bundle_dir=BUNDLE_DIR):
+    return os.path.join(bundle_dir, symbol)
+
+def legacy_paths(symbol, legacy_dir=LEGACY_MODEL_DIR):
+    return {part: os.path.join(legacy_dir, f"{symbol}_{part}.joblib") for part in MODEL_PARTS}
+
+def save_bundle(symbol, models, metadata, bundle_dir=BUNDLE_DIR, compress=0):
+    """Write models ({'rf', 'gb', 'scaler'}) and metadata atomically, returns the bundle directory
+
+    compress > 0 makes the file smaller but disables memory mapping and slows loading.
+    """
+    path = bundle_path(symbol, bundle_dir)
+    os.makedirs(path, exist_ok=True)
+
+    metadata = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'symbol': symbol,
+        'created_at': datetime.now().isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'compressed': bool(compress),
+        **metadata
+    }
+
+    # Önce modeller, en son metadata: metadata.json varsa paket tamdır
+    temp_path = os.path.join(path, 'models.joblib.tmp')
+    joblib.dump({part: models[part] for part in MODEL_PARTS}, temp_path, compress=compress)
+    os.replace(temp_path, os.path.join(path, 'models.joblib'))
+
+    with open(os.path.join(path, 'metadata.json.tmp'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, default=float)
+    os.replace(os.path.join(path, 'metadata.json.tmp'), os.path.join(path, 'metadata.json'))
+    return path
+
+def bundle_mtime(symbol, bundle_dir=BUNDLE_DIR, legacy_dir=LEGACY_MODEL_DIR):
+    """Modification time of a symbol's models (bundle or legacy files), None if there are none"""
+    try:
+        return os.path.getmtime(os.path.join(bundle_path(symbol, bundle_dir), 'metadata.json'))
+    except OSError:
+        pass
+    try:
+        return max(os.path.getmtime(path) for path in legacy_paths(symbol, legacy_dir).values())
+    except OSError:
+        return None
+
+def load_bundle(symbol, bundle_dir=BUNDLE_DIR, legacy_dir=LEGACY_MODEL_DIR, mmap=False):
+    """ModelBundle for a symbol (legacy files as fallback), None if it has no trained models
+
+    mmap=True opens uncompressed arrays with mmap_mode='r'. sklearn trees copy their
+    node arrays on unpickling, so this is slower for RF/GB (benchmarks/model_load_benchmark.py).
+    """
+    path = bundle_path(symbol, bundle_dir)
+    metadata_path = os.path.join(path, 'metadata.json')
+
+    if os.path.exists(metadata_path):
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        models_path = os.path.join(path, 'models.joblib')
+        mmap_mode = 'r' if mmap and not metadata.get('compressed') else None
+        return ModelBundle(symbol, metadata, lambda: joblib.load(models_path, mmap_mode=mmap_mode))
+
+    paths = legacy_paths(symbol, legacy_dir)
+    if all(os.path.exists(p) for p in paths.values()):
+        metadata = {'format_version': 0, 'symbol': symbol}
+        return ModelBundle(symbol, metadata, lambda: {part: joblib.load(p) for part, p in paths.items()})
+
+    return None
+
+def legacy_symbols(legacy_dir=LEGACY_MODEL_DIR):
+    """Symbols with all three legacy model files"""
+    if not os.path.isdir(legacy_dir):
+        return []
+    candidates = {name.rsplit('_', 1)[0] for name in os.listdir(legacy_dir) if name.endswith('.joblib')}
+    return sorted(symbol for symbol in candidates
+                  if all(os.path.exists(p) for p in legacy_paths(symbol, legacy_dir).values()))
+
+def list_bundles(bundle_dir=BUNDLE_DIR, legacy_dir=LEGACY_MODEL_DIR):
+    """Symbols with trained models (bundles and legacy files)"""
+    symbols = set(legacy_symbols(legacy_dir))
+    if os.path.isdir(bundle_dir):
+        symbols.update(name for name in os.listdir(bundle_dir)
+                       if os.path.exists(os.path.join(bundle_dir, name, 'metadata.json')))
+    return sorted(symbols)
+
+def migrate_legacy_models(legacy_dir=LEGACY_MODEL_DIR, bundle_dir=BUNDLE_DIR):
+    """Convert {symbol}_rf/_gb/_scaler.joblib files into bundles, returns migrated symbols"""
+    migrated = []
+    for symbol in legacy_symbols(legacy_dir):
+        if os.path.exists(os.path.join(bundle_path(symbol, bundle_dir), 'metadata.json')):
+            continue
+        try:
+            models = {part: joblib.load(path) for part, path in legacy_paths(symbol, legacy_dir).items()}
+            save_bundle(symbol, models, {'migrated_from': legacy_dir}, bundle_dir)
+            migrated.append(symbol)
+            logger.info(f"✅ {symbol} pakete çevrildi")
+        except Exception as e:
+            logger.error(f"❌ {symbol} çevrilemedi: {e}")
+    return migrated
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) != 2 or sys.argv[1] != 'migrate':
+        print("Kullanım: python model_bundle.py migrate")
+        sys.exit(1)
+    migrated = migrate_legacy_models()
+    logger.info(f"{len(migrated)} coin modeli pakete çevrildi: {BUNDLE_DIR}")
+
+if __name__ == "__main__":
+    main()
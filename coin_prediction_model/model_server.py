@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Model Sunucusu
+Tüm coinlerin modellerini bellekte tutan ve tahminleri yerel HTTP üzerinden veren servis
+
+Modeller LRU önbellekte tutulur (model paketi değişirse yeniden yüklenir). Bir coin için
+tahmin, bir sonraki mum kapanana kadar tekrar kullanılır; aynı coin için eş zamanlı
+gelen istekler tek bir hesaplamayı bekler. Özellikler coin başına FeatureState ile
+tutulur, her mum kapanışında yalnızca yeni satır hesaplanır.
+
+Havuz modeli (train_pooled_model.py) varsa kendi modeli olmayan coinler onunla tahmin
+edilir; --pooled ile tüm coinler havuz modelini kullanır.
+
+Kullanım: python model_server.py [--port 8765] [--max-models 200] [--preload] [--pooled]
+
+    GET  /predict?symbol=BTCUSDT
+    POST /predict  {"symbols": ["BTCUSDT", "ETHUSDT"]}
+    GET  /stats
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import ccxt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from market_data import CandleStore, schema_matches, symbol_key, timeframe_to_ms
+from market_data.prediction_client import request_predictions  # İstemci (tradebot vb.) buradan da alınabilir
+from model_bundle import BUNDLE_DIR, LEGACY_MODEL_DIR, bundle_mtime, list_bundles, load_bundle
+from pooled_model import POOLED_SYMBOL, TARGET_HORIZON
+from predict_price import predict_from_state, update_feature_state
+
+# Logging ayarları
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_MODELS = 200
+PREDICTION_TIMEFRAME = '1h'
+PREDICTION_CANDLES = 100
+
+class ModelCache:
+    """LRU cache of (rf, gb, scaler) per symbol, reloaded when the bundle changes on disk
+
+    pooled=True serves every symbol from the pooled bundle; otherwise it is only used
+    for symbols without their own models.
+    """
+
+    def __init__(self, bundle_dir=BUNDLE_DIR, max_models=DEFAULT_MAX_MODELS, legacy_dir=LEGACY_MODEL_DIR, pooled=False):
+        self.bundle_dir = bundle_dir
+        self.legacy_dir = legacy_dir
+        self.pooled = pooled
+        self.max_models = max_models
+        self.models = OrderedDict()  # symbol -> (mtime, (rf, gb, scaler))
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def _mtime(self, symbol):
+        return bundle_mtime(symbol, self.bundle_dir, self.legacy_dir)
+
+    def available_symbols(self):
+        """Eğitilmiş modeli bulunan semboller (paket veya eski dosyalar)"""
+        return list_bundles(self.bundle_dir, self.legacy_dir)
+
+    def get(self, symbol):
+        """(rf, gb, scaler) for a symbol, None if it has no trained model"""
+        if not self.pooled or symbol == POOLED_SYMBOL:
+            models = self._get_bundle(symbol)
+            if models is not None or symbol == POOLED_SYMBOL:
+                return models
+
+        # Havuz modeli: tüm coinler aynı RF/GB nesnelerini paylaşır
+        models = self._get_bundle(POOLED_SYMBOL)
+        if models is None:
+            return None
+        rf_model, gb_model, features = models
+        return rf_model, gb_model, features.for_symbol(symbol)
+
+    def _get_bundle(self, symbol):
+        mtime = self._mtime(symbol)
+        if mtime is None:
+            return None
+
+        with self.lock:
+            entry = self.models.get(symbol)
+            if entry is not None and entry[0] == mtime:
+                self.models.move_to_end(symbol)
+                return entry[1]
+            load_lock = self.load_locks.setdefault(symbol, threading.Lock())
+
+        # Aynı coin için modeller bir kez yüklenir
+        with load_lock:
+            with self.lock:
+                entry = self.models.get(symbol)
+                if entry is not None and entry[0] == mtime:
+                    return entry[1]
+
+            bundle = load_bundle(symbol, self.bundle_dir, self.legacy_dir)
+            if bundle is None:
+                return None
+            if not schema_matches(bundle.metadata):
+                logger.warning(f"⚠️ {symbol} modeli farklı bir özellik şemasıyla eğitilmiş, yeniden eğitin")
+            # Eski havuz paketleri bir sonraki mumu tahmin ediyordu (coin başına modeller 2 mum sonrasını)
+            if symbol == POOLED_SYMBOL and bundle.metadata.get('target_horizon', 1) != TARGET_HORIZON:
+                logger.warning(f"⚠️ Havuz modeli farklı bir tahmin ufkuyla eğitilmiş, yeniden eğitin (train_pooled_model.py)")
+            models = bundle.as_tuple()
+
+            with self.lock:
+                self.models[symbol] = (mtime, models)
+                self.models.move_to_end(symbol)
+                self.loads += 1
+                while len(self.models) > self.max_models:
+                    evicted, _ = self.models.popitem(last=False)
+                    self.evictions += 1
+                    logger.info(f"Model önbellekten çıkarıldı: {evicted}")
+
+        logger.info(f"✅ {symbol} modeli yüklendi")
+        return models
+
+    def stats(self):
+        with self.lock:
+            return {'resident': len(self.models), 'loads': self.loads, 'evictions': self.evictions}
+
+class PredictionService:
+    """Per-symbol predictions, reused until the next candle closes, with concurrent requests coalesced"""
+
+    def __init__(self, models, exchange, store, timeframe=PREDICTION_TIMEFRAME, candles=PREDICTION_CANDLES):
+        self.models = models
+        self.exchange = exchange
+        self.store = store
+        self.timeframe = timeframe
+        self.candles = candles
+        self.predictions = {}  # symbol -> (geçerlilik sonu ms, sonuç)
+        self.features = {}     # symbol -> FeatureState
+        self.inflight = {}     # symbol -> Future
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.computed = 0
+
+    def predict(self, symbol):
+        """Prediction dict for one symbol ({'success': False, 'error': ...} on failure)"""
+        symbol = symbol_key(symbol)
+        started = time.perf_counter()
+
+        with self.lock:
+            self.requests += 1
+            cached = self.predictions.get(symbol)
+            if cached is not None and time.time() * 1000 < cached[0]:
+                self.cache_hits += 1
+                return {**cached[1], 'cached': True, 'latency_ms': (time.perf_counter() - started) * 1000}
+
+            future = self.inflight.get(symbol)
+            owner = future is None
+            if owner:
+                future = self.inflight[symbol] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            result = future.result()
+        else:
+            try:
+                result = self._compute(symbol)
+            except Exception as e:
+                logger.error(f"{symbol} tahmin hatası: {e}")
+                result = {'success': False, 'symbol': symbol, 'error': str(e)}
+            with self.lock:
+                self.inflight.pop(symbol, None)
+            future.set_result(result)
+
+        return {**result, 'cached': False, 'latency_ms': (time.perf_counter() - started) * 1000}
+
+    def _compute(self, symbol):
+        models = self.models.get(symbol)
+        if models is None:
+            return {'success': False, 'symbol': symbol, 'error': 'Eğitilmiş model yok'}
+
+        # Aynı coin aynı anda tek istekte hesaplanır, state kilitsiz güncellenebilir
+        state = update_feature_state(self.exchange, symbol, self.features.get(symbol), self.timeframe,
+                                     self.candles, store=self.store)
+        if state is None:
+            return {'success': False, 'symbol': symbol, 'error': 'Veri alınamadı'}
+        self.features[symbol] = state
+
+        prediction = predict_from_state(*models, state)
+        if prediction is None:
+            return {'success': False, 'symbol': symbol, 'error': 'Yetersiz veri'}
+        result = {'success': True, 'symbol': symbol, **prediction}
+
+        # Son kapanmış mumun açılışı + 2 periyot = bir sonraki mumun kapanışı
+        expires = state.last_timestamp + 2 * timeframe_to_ms(self.timeframe)
+        with self.lock:
+            self.predictions[symbol] = (expires, result)
+            self.computed += 1
+        return result
+
+    def predict_many(self, symbols, executor):
+        """{symbol: prediction}, symbols computed concurrently"""
+        return dict(zip(symbols, executor.map(self.predict, symbols)))
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'cache_hits': self.cache_hits,
+                'coalesced': self.coalesced,
+                'computed': self.computed,
+                'models': self.models.stats()
+            }
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: GET /predict?symbol=, POST /predict, GET /stats"""
+
+    service = None
+    executor = None
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            self._send_json(self.service.stats())
+        elif url.path == '/predict':
+            symbol = parse_qs(url.query).get('symbol', [None])[0]
+            if not symbol:
+                self._send_json({'error': 'symbol parametresi gerekli'}, 400)
+                return
+            self._send_json(self.service.predict(symbol))
+        else:
+            self._send_json({'error': 'Bulunamadı'}, 404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/predict':
+            self._send_json({'error': 'Bulunamadı'}, 404)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            symbols = json.loads(self.rfile.read(length) or b'{}').get('symbols', [])
+        except (ValueError, AttributeError):
+            self._send_json({'error': 'Geçersiz JSON'}, 400)
+            return
+        self._send_json({'predictions': self.service.predict_many(symbols, self.executor)})
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, max_models=DEFAULT_MAX_MODELS, workers=8,
+                  bundle_dir=BUNDLE_DIR, legacy_dir=LEGACY_MODEL_DIR, exchange=None, store=None, pooled=False):
+    """ThreadingHTTPServer with a PredictionService attached"""
+    if exchange is None:
+        exchange = ccxt.binance({
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'future'
+            }
+        })
+    service = PredictionService(ModelCache(bundle_dir, max_models, legacy_dir, pooled), exchange, store or CandleStore())
+    handler = type('Handler', (PredictionHandler,), {
+        'service': service,
+        'executor': ThreadPoolExecutor(max_workers=workers)
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident price prediction server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-models', type=int, default=DEFAULT_MAX_MODELS, help="Bellekte tutulacak en fazla coin modeli")
+    parser.add_argument('--workers', type=int, default=8, help="Toplu isteklerde paralel tahmin sayısı")
+    parser.add_argument('--preload', action='store_true', help="Açılışta tüm modelleri yükle")
+    parser.add_argument('--pooled', action='store_true', help="Tüm coinler için havuz modelini kullan")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.max_models, args.workers, pooled=args.pooled)
+    models = server.RequestHandlerClass.service.models
+
+    if args.preload:
+        started = time.time()
+        symbols = models.available_symbols()[:args.max_models]
+        for symbol in symbols:
+            models.get(symbol)
+        logger.info(f"{len(symbols)} coin modeli {time.time() - started:.1f}s içinde yüklendi")
+
+    logger.info(f"🤖 Model sunucusu: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Model sunucusu durduruldu")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Havuz Modeli
+Tüm coinler için tek RF + GB: fiyattan bağımsız (getiri/oran) özellikler, coin kodu ve
+volatilite özellikleriyle tüm coinlerin verisi üzerinde eğitilir.
+
+Paket ml_models/bundles/POOLED/ altında saklanır; model sunucusu ve MLTradingSignals bu
+paketi her coin için aynı model nesneleriyle kullanır (ModelCache(pooled=True) veya coinin
+kendi modeli yoksa). Girdi yine FeatureState penceresidir (FEATURE_COLUMNS x SEQUENCE_LENGTH);
+'scaler' yerine coin başına PooledFeatures dönüşümü kullanılır.
+
+Hedef coin başına modellerle (train_single_coin.prepare_data) aynıdır: pencerenin son
+mumundan TARGET_HORIZON mum sonraki kapanış. Böylece price_change_pct aynı sinyal
+eşikleriyle (_convert_to_trading_signal) aynı ufukta yorumlanır.
+"""
+import logging
+import os
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+
+# Parent dizini path'e ekle (market_data için)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_data.features import FEATURE_COLUMNS, SEQUENCE_LENGTH, add_technical_indicators
+
+logger = logging.getLogger(__name__)
+
+POOLED_SYMBOL = 'POOLED'
+TARGET_HORIZON = 2  # prepare_data: X_seq[i] = i..i+59. satırlar, hedef i+61. satırın kapanışı
+RETURN_HORIZONS = (1, 2, 4, 8, 24, 48)  # Mum cinsinden getiri ufukları
+POOLED_FEATURE_COLUMNS = (
+    [f'return_{horizon}' for horizon in RETURN_HORIZONS]
+    + ['open_rel', 'high_rel', 'low_rel', 'rsi', 'macd_rel', 'signal_rel', 'ma20_dist',
+       'band_width', 'atr_rel', 'momentum_rel', 'volume_ratio', 'volatility_24',
+       'volatility_window', 'symbol_code']
+)
+_COLUMN = {name: index for index, name in enumerate(FEATURE_COLUMNS)}
+
+def pooled_features(windows, symbol_code):
+    """(n, SEQUENCE_LENGTH, FEATURE_COLUMNS) ham pencereler -> (n, POOLED_FEATURE_COLUMNS)"""
+    windows = np.asarray(windows, dtype=np.float64)
+    last = windows[:, -1, :]
+    close = last[:, _COLUMN['close']]
+    log_close = np.log(windows[:, :, _COLUMN['close']])
+    step_returns = np.diff(log_close, axis=1)
+    volume = windows[:, :, _COLUMN['volume']]
+
+    def relative(name):
+        return last[:, _COLUMN[name]] / close
+
+    columns = [log_close[:, -1] - log_close[:, -1 - horizon] for horizon in RETURN_HORIZONS]
+    columns += [
+        relative('open') - 1,
+        relative('high') - 1,
+        relative('low') - 1,
+        last[:, _COLUMN['rsi']] / 100,
+        relative('macd'),
+        relative('signal'),
+        1 - relative('ma20'),
+        relative('upper_band') - relative('lower_band'),
+        relative('atr'),
+        relative('momentum'),
+        np.log1p(volume[:, -1]) - np.log1p(volume[:, -24:].mean(axis=1)),
+        step_returns[:, -24:].std(axis=1),
+        step_returns.std(axis=1),
+        np.full(len(windows), symbol_code, dtype=np.float64)
+    ]
+    return np.column_stack(columns)
+
+class PooledFeatures:
+    """Stands in for the scaler: one FeatureState window -> pooled feature row + last close"""
+
+    def __init__(self, symbols, symbol=None):
+        self.symbols = list(symbols)
+        self.symbol = symbol
+        # Eğitimde görülmeyen coin: -1
+        self.symbol_code = self.symbols.index(symbol) if symbol in self.symbols else -1
+
+    def for_symbol(self, symbol):
+        return PooledFeatures(self.symbols, symbol)
+
+    def transform(self, window):
+        """(SEQUENCE_LENGTH, FEATURE_COLUMNS) -> (1, özellik + 1), son sütun kapanış fiyatı"""
+        window = np.asarray(window, dtype=np.float64)[None]
+        return np.column_stack([pooled_features(window, self.symbol_code), window[:, -1, _COLUMN['close']]])
+
+class PooledRegressor:
+    """Predicts the close TARGET_HORIZON candles after the window from the predicted log return"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return X[:, -1] * np.exp(self.model.predict(X[:, :-1]))
+
+def symbol_dataset(df, symbol_code, sequence_length=SEQUENCE_LENGTH):
+    """(özellikler, TARGET_HORIZON mum sonraki log getiri, son kapanış) bir coinin tüm pencereleri için"""
+    df = add_technical_indicators(df).dropna()
+    raw = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    if len(raw) < sequence_length + TARGET_HORIZON:
+        return None
+    # Pencere k, k + sequence_length - 1. satırda biter; hedef TARGET_HORIZON mum sonrası
+    windows = sliding_window_view(raw, (sequence_length, raw.shape[1]))[:-TARGET_HORIZON, 0]
+    close = raw[:, _COLUMN['close']]
+    last_close = close[sequence_length - 1:-TARGET_HORIZON]
+    y = np.log(close[sequence_length - 1 + TARGET_HORIZON:] / last_close)
+    return pooled_features(windows, symbol_code), y, last_close
+
+def train_pooled(frames, test_size=0.2, n_jobs=None):
+    """frames: {symbol: OHLCV DataFrame}. Her coinin son test_size kısmı test için ayrılır (zaman sırası)
+
+    (rf, gb, features, metrics) döndürür; metrics['symbols'] coin başına test MAPE'leridir.
+    """
+    symbols = sorted(frames)
+    train_parts, test_parts = [], {}
+    for code, symbol in enumerate(symbols):
+        dataset = symbol_dataset(frames[symbol], code)
+        if dataset is None:
+            logger.warning(f"{symbol}: yetersiz veri, havuz modeline alınmadı")
+            continue
+        X, y, last_close = dataset
+        split = int(len(X) * (1 - test_size))
+        train_parts.append((X[:split], y[:split]))
+        test_parts[symbol] = (X[split:], y[split:], last_close[split:])
+
+    X_train = np.vstack([X for X, _ in train_parts])
+    y_train = np.concatenate([y for _, y in train_parts])
+    logger.info(f"Havuz modeli: {len(test_parts)} coin, {len(X_train)} eğitim örneği")
+
+    # Yaprak başına en az 20 örnek: çok sayıda coin ile model boyutu sınırlı kalır
+    rf_model = RandomForestRegressor(n_estimators=100, min_samples_leaf=20, max_features=0.5,
+                                     random_state=42, n_jobs=n_jobs)
+    rf_model.fit(X_train, y_train)
+    gb_model = HistGradientBoostingRegressor(max_iter=300, learning_rate=0.05, random_state=42)
+    gb_model.fit(X_train, y_train)
+
+    def price_mape(predicted_returns, y, last_close):
+        actual = last_close * np.exp(y)
+        return float(np.mean(np.abs((actual - last_close * np.exp(predicted_returns)) / actual)) * 100)
+
+    per_symbol = {}
+    for symbol, (X, y, last_close) in test_parts.items():
+        if len(X) == 0:
+            continue
+        rf_mape = price_mape(rf_model.predict(X), y, last_close)
+        gb_mape = price_mape(gb_model.predict(X), y, last_close)
+        per_symbol[symbol] = {
+            'rf_mape': rf_mape,
+            'gb_mape': gb_mape,
+            'best_mape': min(rf_mape, gb_mape),
+            'naive_mape': price_mape(np.zeros(len(y)), y, last_close),  # Fiyat değişmez tahmini
+            'test_samples': len(X)
+        }
+
+    metrics = {
+        'train_samples': len(X_train),
+        'symbols': per_symbol,
+        'mean_best_mape': float(np.mean([m['best_mape'] for m in per_symbol.values()])) if per_symbol else None
+    }
+    features = PooledFeatures(symbols)
+    return PooledRegressor(rf_model), PooledRegressor(gb_model), features, metrics
@@ -1,19 +1,36 @@
+import os
 import sys
 import ccxt
-import joblib
 import numpy as np
 import pandas as pd
 import logging
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from market_data import CandleStore, timeframe_to_ms
+from market_data.features import FEATURE_COLUMNS, SEQUENCE_LENGTH, FeatureState, add_technical_indicators
+from model_bundle import load_bundle
+
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_latest_data(exchange, symbol, timeframe='1h', limit=100):
-    """En son fiyat verilerini çek"""
+def fetch_latest_data(exchange, symbol, timeframe='1h', limit=100, store=None, start=None):
+    """En son fiyat verilerini çek
+
+    store (CandleStore) verilirse sadece yerel depoda olmayan mumlar indirilir,
+    veri depodan okunur (yalnızca kapanmış mumlar).
+    start (ms) verilirse son `limit` mum yerine bu açılış zamanından itibaren olanlar döner.
+    """
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        if store is not None:
+            since = exchange.milliseconds() - limit * timeframe_to_ms(timeframe)
+            store.sync(exchange, symbol, timeframe, since=since)
+            if start is not None:
+                return store.load_dataframe(symbol, timeframe, start=start)
+            return store.load_dataframe(symbol, timeframe, limit=limit)
+
+        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=start, limit=limit)
         df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         return df
@@ -21,60 +38,38 @@ def fetch_latest_data(exchange, symbol, timeframe='1h', limit=100):
         logger.error(f"Veri çekme hatası: {e}")
         return None
 
-def add_technical_indicators(df):
-    """Teknik indikatörleri ekle"""
-    # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
-    # MACD
-    exp1 = df['close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['close'].ewm(span=26, adjust=False).mean()
-    df['macd'] = exp1 - exp2
-    df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-    
-    # Bollinger Bands
-    df['ma20'] = df['close'].rolling(window=20).mean()
-    df['20std'] = df['close'].rolling(window=20).std()
-    df['upper_band'] = df['ma20'] + (df['20std'] * 2)
-    df['lower_band'] = df['ma20'] - (df['20std'] * 2)
-    
-    # ATR
-    high_low = df['high'] - df['low']
-    high_close = np.abs(df['high'] - df['close'].shift())
-    low_close = np.abs(df['low'] - df['close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = np.max(ranges, axis=1)
-    df['atr'] = true_range.rolling(14).mean()
-    
-    # Momentum
-    df['momentum'] = df['close'] - df['close'].shift(4)
-    
-    return df
-
 def prepare_prediction_data(df, scaler):
     """Tahmin için veri hazırla"""
     df = df.dropna()
-    
-    features = ['open', 'high', 'low', 'close', 'volume', 'rsi', 'macd', 'signal', 
-               'ma20', 'upper_band', 'lower_band', 'atr', 'momentum']
-    
-    X = df[features].values
-    X_scaled = scaler.transform(X)
-    
-    return X_scaled[-60:].reshape(1, -1)  # Son 60 veriyi al ve reshape et
+    return prepare_prediction_window(df[FEATURE_COLUMNS].values[-SEQUENCE_LENGTH:], scaler)
+
+def prepare_prediction_window(window, scaler):
+    """(SEQUENCE_LENGTH, özellik) penceresini ölçekle ve tek satıra çevir"""
+    return scaler.transform(window).reshape(1, -1)
+
+def update_feature_state(exchange, symbol, state=None, timeframe='1h', limit=100, store=None):
+    """FeatureState'e yalnızca yeni kapanan mumları ekle
+
+    State yoksa veya yeni veri ona bağlanmıyorsa son `limit` mumdan yeniden kurulur.
+    Veri alınamazsa None döner.
+    """
+    if state is not None:
+        df = fetch_latest_data(exchange, symbol, timeframe, limit, store=store, start=state.last_timestamp)
+        if df is not None and state.sync_frame(df):
+            return state
+
+    df = fetch_latest_data(exchange, symbol, timeframe, limit, store=store)
+    if df is None or df.empty:
+        return None
+    return FeatureState.from_dataframe(df)
 
 def load_models(symbol):
-    """Kaydedilmiş modelleri yükle"""
+    """Kaydedilmiş modelleri yükle (model paketi, yoksa eski üç dosya)"""
     try:
-        base_path = f"ml_models/saved_models/{symbol}"
-        rf_model = joblib.load(f"{base_path}_rf.joblib")
-        gb_model = joblib.load(f"{base_path}_gb.joblib")
-        scaler = joblib.load(f"{base_path}_scaler.joblib")
-        return rf_model, gb_model, scaler
+        bundle = load_bundle(symbol)
+        if bundle is None:
+            raise FileNotFoundError(f"{symbol} için eğitilmiş model yok")
+        return bundle.as_tuple()
     except Exception as e:
         logger.error(f"Model yükleme hatası: {e}")
         return None, None, None
@@ -92,6 +87,36 @@ def calculate_trend_strength(current_price, predictions):
     
     return change_percent, agreement
 
+def predict_from_frame(rf_model, gb_model, scaler, df):
+    """Ham OHLCV DataFrame'den tahmin yap"""
+    df = add_technical_indicators(df)
+    X = prepare_prediction_data(df, scaler)
+    return predict_from_features(rf_model, gb_model, X, float(df['close'].iloc[-1]), df['timestamp'].iloc[-1])
+
+def predict_from_state(rf_model, gb_model, scaler, state):
+    """FeatureState'in son penceresinden tahmin yap (model sunucusu), pencere dolmadıysa None"""
+    window = state.window()
+    if window is None:
+        return None
+    X = prepare_prediction_window(window, scaler)
+    return predict_from_features(rf_model, gb_model, X, state.last_close, pd.Timestamp(state.last_timestamp, unit='ms'))
+
+def predict_from_features(rf_model, gb_model, X, current_price, candle_time):
+    """Ölçeklenmiş özellik satırından (1, pencere) tahmin sonucu"""
+    rf_prediction = float(rf_model.predict(X)[0])
+    gb_prediction = float(gb_model.predict(X)[0])
+    change_percent, agreement = calculate_trend_strength(current_price, (rf_prediction, gb_prediction))
+    
+    return {
+        'current_price': current_price,
+        'rf_prediction': rf_prediction,
+        'gb_prediction': gb_prediction,
+        'prediction': (rf_prediction + gb_prediction) / 2,
+        'change_percent': change_percent,
+        'agreement': agreement,
+        'candle_time': candle_time.isoformat()
+    }
+
 def main():
     if len(sys.argv) != 2:
         print("Kullanım: python predict_price.py BTCUSDT")
@@ -114,25 +139,15 @@ def main():
     })
     
     # En son verileri çek
-    df = fetch_latest_data(exchange, symbol)
+    df = fetch_latest_data(exchange, symbol, store=CandleStore())
     if df is None:
         return
         
-    # Teknik indikatörleri ekle
-    df = add_technical_indicators(df)
-    
-    # Tahmin için veriyi hazırla
-    X = prepare_prediction_data(df, scaler)
-    
-    # Tahminleri al
-    rf_prediction = rf_model.predict(X)[0]
-    gb_prediction = gb_model.predict(X)[0]
-    
-    # Mevcut fiyat
-    current_price = df['close'].iloc[-1]
-    
-    # Trend analizi
-    change_percent, agreement = calculate_trend_strength(current_price, (rf_prediction, gb_prediction))
+    # İndikatörler + tahmin
+    result = predict_from_frame(rf_model, gb_model, scaler, df)
+    current_price = result['current_price']
+    rf_prediction, gb_prediction = result['rf_prediction'], result['gb_prediction']
+    change_percent, agreement = result['change_percent'], result['agreement']
     
     # Sonuçları yazdır
     logger.info(f"\n{'='*50}")
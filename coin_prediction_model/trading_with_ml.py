@@ -9,78 +9,89 @@ Bu dosya mevcut trading botuna ML tahminlerinin nasıl entegre edileceğini gös
 import asyncio
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
+import ccxt
+import numpy as np
 
 # Yolu ayarla
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import config
 
-# ML modüllerini import et
-from ml_models.model_trainer import ModelTrainer
+from market_data import CandleStore, FeatureState, symbol_key
+from predict_price import update_feature_state, prepare_prediction_window, calculate_trend_strength
+from model_server import ModelCache, PREDICTION_TIMEFRAME, PREDICTION_CANDLES
 
 # Logging ayarla
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+FETCH_WORKERS = 8  # Eş zamanlı veri çekme sayısı
+
 class MLTradingSignals:
     """ML tahminleri ile trading sinyalleri"""
     
-    def __init__(self):
-        self.trainer = ModelTrainer()
-        self.loaded_models = {}
+    def __init__(self, exchange=None, store=None, models=None):
+        self.exchange = exchange or ccxt.binance({
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'future'
+            }
+        })
+        self.store = store or CandleStore()
+        self.models = models or ModelCache(pooled=config.ML_POOLED_MODEL)
+        self.executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+        self.features = {}  # symbol -> FeatureState
+        self.last_timings = {}
         logger.info("ML Trading Signals başlatıldı")
     
     async def load_model_for_symbol(self, symbol: str):
         """Coin için modeli yükle"""
-        if symbol not in self.loaded_models:
-            if self.trainer.is_model_trained(symbol):
-                predictor = self.trainer.load_trained_model(symbol)
-                if predictor:
-                    self.loaded_models[symbol] = predictor
-                    logger.info(f"✅ {symbol} modeli yüklendi")
-                    return True
-                else:
-                    logger.warning(f"❌ {symbol} modeli yüklenemedi")
-                    return False
-            else:
-                logger.warning(f"❌ {symbol} için eğitilmiş model yok")
-                return False
+        loop = asyncio.get_running_loop()
+        models = await loop.run_in_executor(self.executor, self.models.get, symbol_key(symbol))
+        if models is None:
+            logger.warning(f"❌ {symbol} için eğitilmiş model yok")
+            return False
         return True
     
     async def get_ml_signal(self, symbol: str, df=None) -> dict:
         """ML sinyali al"""
-        try:
-            # Model yükle
-            if not await self.load_model_for_symbol(symbol):
-                return {'success': False, 'error': 'Model yüklenemedi'}
-            
-            # Veri al (eğer verilmemişse)
-            if df is None:
-                df = await self.trainer.get_historical_data(symbol, days=30)
-                if df is None:
-                    return {'success': False, 'error': 'Veri alınamadı'}
-            
-            # Tahmin yap
-            predictor = self.loaded_models[symbol]
-            result = predictor.predict(df)
-            
-            if not result['success']:
-                return result
-            
-            # Trading sinyali oluştur
-            signal = self._convert_to_trading_signal(result)
-            signal['symbol'] = symbol
-            signal['timestamp'] = datetime.now().isoformat()
-            
-            return signal
-            
-        except Exception as e:
-            logger.error(f"ML sinyal hatası: {e}")
-            return {'success': False, 'error': str(e)}
+        results = await self.get_multiple_signals([symbol], frames=None if df is None else {symbol: df})
+        return results[symbol]
+    
+    def _update_features(self, symbol, df=None):
+        """Coin'in FeatureState'ini yeni kapanan mumlarla güncelle (df verilirse ondan)"""
+        state = self.features.get(symbol)
+        if df is not None:
+            if state is None or not state.sync_frame(df):
+                state = FeatureState.from_dataframe(df)
+        else:
+            state = update_feature_state(self.exchange, symbol_key(symbol), state, PREDICTION_TIMEFRAME,
+                                         PREDICTION_CANDLES, store=self.store)
+        if state is not None:
+            self.features[symbol] = state
+        return state
+    
+    @staticmethod
+    def _prediction_result(current_price, rf_prediction, gb_prediction):
+        """RF/GB tahminlerini _convert_to_trading_signal girdisine çevir"""
+        change_percent, agreement = calculate_trend_strength(current_price, (rf_prediction, gb_prediction))
+        prediction = (rf_prediction + gb_prediction) / 2
+        return {
+            'success': True,
+            'current_price': current_price,
+            'prediction': prediction,
+            'price_change_pct': change_percent,
+            'confidence': min(max(agreement, 0.0), 100.0) / 100,  # Model uyumu
+            'trend': 'BULLISH' if prediction > current_price else 'BEARISH',
+            'individual_predictions': {'random_forest': rf_prediction, 'gradient_boosting': gb_prediction}
+        }
     
-    def _convert_to_trading_signal(self, ml_result: dict) -> dict:
-        """ML sonucunu trading sinyaline çevir"""
+    @staticmethod
+    def _convert_to_trading_signal(ml_result: dict) -> dict:
+        """ML sonucunu trading sinyaline çevir (walk_forward.py de aynı kuralları kullanır)"""
         try:
             price_change_pct = ml_result['price_change_pct']
             confidence = ml_result['confidence']
@@ -124,13 +135,69 @@ class MLTradingSignals:
         except Exception as e:
             return {'success': False, 'error': f'Sinyal dönüşüm hatası: {e}'}
     
-    async def get_multiple_signals(self, symbols: list) -> dict:
-        """Çoklu coin için sinyaller"""
+    async def get_multiple_signals(self, symbols: list, frames=None, return_timings=False):
+        """Çoklu coin için sinyaller
+        
+        Veri ve modeller tüm coinler için eş zamanlı yüklenir, aynı model nesnesini
+        paylaşan coinlerin özellik satırları tek predict çağrısında tahmin edilir.
+        return_timings=True ise (sinyaller, aşama süreleri ms) döndürür.
+        """
+        loop = asyncio.get_running_loop()
+        timings = {}
         results = {}
         
+        # 1) Yeni mumlar ve modeller (eş zamanlı)
+        started = time.perf_counter()
+        frames = frames or {}
+        states, models = await asyncio.gather(
+            asyncio.gather(*(loop.run_in_executor(self.executor, self._update_features, symbol, frames.get(symbol))
+                             for symbol in symbols)),
+            asyncio.gather(*(loop.run_in_executor(self.executor, self.models.get, symbol_key(symbol)) for symbol in symbols))
+        )
+        states = dict(zip(symbols, states))
+        models = dict(zip(symbols, models))
+        timings['load_ms'] = (time.perf_counter() - started) * 1000
+        
+        # 2) Özellikler: coin başına son pencere (1, sequence * özellik), ölçeklenmiş
+        started = time.perf_counter()
+        rows = {}
         for symbol in symbols:
-            logger.info(f"🔍 {symbol} sinyali alınıyor...")
-            signal = await self.get_ml_signal(symbol)
+            if models[symbol] is None:
+                results[symbol] = {'success': False, 'error': 'Model yüklenemedi'}
+                continue
+            state = states[symbol]
+            if state is None:
+                results[symbol] = {'success': False, 'error': 'Veri alınamadı'}
+                continue
+            window = state.window()
+            if window is None:
+                results[symbol] = {'success': False, 'error': 'Yetersiz veri'}
+                continue
+            try:
+                rows[symbol] = (prepare_prediction_window(window, models[symbol][2]), state.last_close)
+            except Exception as e:
+                results[symbol] = {'success': False, 'error': str(e)}
+        timings['features_ms'] = (time.perf_counter() - started) * 1000
+        
+        # 3) Tahmin: model ailesi (rf, gb) başına aynı model nesnesi için tek çağrı
+        started = time.perf_counter()
+        predictions = {symbol: [None, None] for symbol in rows}
+        for family in (0, 1):
+            groups = {}
+            for symbol in rows:
+                model = models[symbol][family]
+                groups.setdefault(id(model), (model, []))[1].append(symbol)
+            for model, group in groups.values():
+                values = model.predict(np.vstack([rows[symbol][0] for symbol in group]))
+                for symbol, value in zip(group, values):
+                    predictions[symbol][family] = float(value)
+        timings['predict_ms'] = (time.perf_counter() - started) * 1000
+        
+        # 4) Trading sinyalleri
+        for symbol, (rf_prediction, gb_prediction) in predictions.items():
+            signal = self._convert_to_trading_signal(self._prediction_result(rows[symbol][1], rf_prediction, gb_prediction))
+            signal['symbol'] = symbol
+            signal['timestamp'] = datetime.now().isoformat()
             results[symbol] = signal
             
             if signal['success'] and signal['should_trade']:
@@ -139,7 +206,12 @@ class MLTradingSignals:
                 confidence = signal['confidence']
                 logger.info(f"🎯 {symbol}: {direction} {level} sinyal (Güven: {confidence:.1%})")
         
-        return results
+        timings['total_ms'] = sum(timings.values())
+        self.last_timings = timings
+        logger.info(f"{len(symbols)} coin sinyali: " + ', '.join(f"{name} {value:.1f}" for name, value in timings.items()))
+        
+        results = {symbol: results[symbol] for symbol in symbols}
+        return (results, timings) if return_timings else results
 
 async def demo_ml_trading():
     """ML trading demo"""
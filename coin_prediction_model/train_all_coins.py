@@ -7,16 +7,21 @@ Coin listesindeki tüm coinler için ML modellerini eğitir
 import asyncio
 import json
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import sys
 import os
 import logging
+import ccxt
+from threadpoolctl import threadpool_limits
 
 # Parent dizini path'e ekle (config.py için)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ml_models.model_trainer import ModelTrainer
 import config
+from market_data import CandleStore
+from market_data.coin_list import read_coin_list
+from train_single_coin import train_and_save
 
 # Logging ayarla
 logging.basicConfig(
@@ -25,24 +30,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TRAINING_RETRIES = 2  # Başarısız coin için tekrar deneme sayısı
+
+# Eğitim süreçlerinde tekrar kullanılan bağlantılar
+_worker_exchange = None
+_worker_store = None
+
+def _init_training_worker(n_jobs):
+    """Süreç başına exchange/depo oluştur, BLAS/OpenMP thread'lerini n_jobs ile sınırla"""
+    global _worker_exchange, _worker_store
+    threadpool_limits(n_jobs)
+    _worker_exchange = ccxt.binance({
+        'enableRateLimit': True,
+        'options': {
+            'defaultType': 'future'
+        }
+    })
+    _worker_store = CandleStore()
+
+def _train_coin_job(symbol, candle_limit, n_jobs):
+    """Tek coin eğitimi (süreç havuzunda çalışır)"""
+    start_time = time.time()
+    try:
+        result = train_and_save(_worker_exchange, symbol, limit=candle_limit, store=_worker_store, n_jobs=n_jobs)
+    except Exception as e:
+        result = {'success': False, 'error': str(e)[:100]}
+    result['duration'] = time.time() - start_time
+    return result
+
 class AllCoinsTrainer:
     """Tüm coinler için ML model eğitimi"""
     
-    def __init__(self):
-        self.trainer = ModelTrainer()  # Client içeride oluşturuluyor
+    def __init__(self, candle_limit=1000, retries=TRAINING_RETRIES):
+        self.candle_limit = candle_limit
+        self.retries = retries
         self.results = {}
         self.failed_coins = []
+        self.results_file = None
         
     def load_all_coins(self):
         """Tüm coinleri yükle"""
-        with open(config.COIN_LIST_FILE, 'r') as f:
-            coin_data = json.load(f)
-            
-        if 'coins' in coin_data:
-            # "/" karakterini kaldır (BTCUSDT formatına çevir)
-            coins = [coin.replace('/', '') for coin in coin_data['coins']]
-        else:
-            coins = [coin['symbol'] for coin in coin_data]
+        # "/" karakterini kaldır (BTCUSDT formatına çevir)
+        coins = [coin.replace('/', '') for coin in read_coin_list(config.COIN_LIST_FILE)]
             
         # Problematik coinleri filtrele
         filtered_coins = []
@@ -55,80 +84,86 @@ class AllCoinsTrainer:
         logger.info(f"Toplam {len(filtered_coins)} coin yüklenecek")
         return filtered_coins
     
-    async def train_single_coin(self, symbol, index, total):
-        """Tek coin için model eğit"""
-        start_time = time.time()
-        
-        try:
-            logger.info(f"[{index+1}/{total}] {symbol} eğitimi başlıyor...")
-            
-            # Yeni API kullan
-            result = await self.trainer.train_single_coin(symbol)
-            
-            if result['success']:
-                duration = time.time() - start_time
-                
-                self.results[symbol] = {
-                    'success': True,
-                    'test_mape': result['best_mape'],
-                    'best_model': result['best_model'],
-                    'duration': duration,
-                    'train_samples': result['train_samples'],
-                    'test_samples': result['test_samples'],
-                    'trained_at': datetime.now().isoformat()
-                }
-                
-                logger.info(f"✅ {symbol} başarılı! MAPE: {result['best_mape']:.2f}%, Model: {result['best_model']}, Süre: {duration:.1f}s")
-                
-            else:
-                self.results[symbol] = {
-                    'success': False,
-                    'error': result['error'],
-                    'duration': time.time() - start_time
-                }
-                self.failed_coins.append(symbol)
-                logger.error(f"❌ {symbol} başarısız: {result['error']}")
-                
-        except Exception as e:
-            duration = time.time() - start_time
-            error_msg = str(e)[:100]
-            
+    def record_result(self, symbol, result, attempts):
+        """Tamamlanan bir eğitimin sonucunu kaydet"""
+        if result['success']:
+            self.results[symbol] = {
+                'success': True,
+                'test_mape': result['best_mape'],
+                'best_model': result['best_model'],
+                'duration': result['duration'],
+                'train_samples': result['train_samples'],
+                'test_samples': result['test_samples'],
+                'split': result.get('split'),
+                'attempts': attempts,
+                'trained_at': datetime.now().isoformat()
+            }
+            if symbol in self.failed_coins:
+                self.failed_coins.remove(symbol)
+        else:
             self.results[symbol] = {
                 'success': False,
-                'error': error_msg,
-                'duration': duration
+                'error': result['error'],
+                'duration': result['duration'],
+                'attempts': attempts
             }
-            self.failed_coins.append(symbol)
-            logger.error(f"❌ {symbol} hatası: {error_msg}")
+            if symbol not in self.failed_coins:
+                self.failed_coins.append(symbol)
     
-    async def train_all_coins(self, batch_size=1):
-        """Tüm coinleri eğit"""
+    async def train_all_coins(self, workers=None):
+        """Tüm coinleri süreç havuzunda paralel eğit
+        
+        workers: aynı anda eğitilen coin sayısı (varsayılan: çekirdek sayısı).
+        Her süreç çekirdeklerin workers'a düşen payı kadar thread kullanır.
+        Sonuçlar her coin bittiğinde training_results_*.json dosyasına yazılır.
+        """
         
         coins = self.load_all_coins()
         total_coins = len(coins)
+        if total_coins == 0:
+            return
+        
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(workers or cpu_count, total_coins))
+        n_jobs = max(1, cpu_count // workers)
+        self.results_file = f"training_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        logger.info(f"🚀 {total_coins} coin için ML model eğitimi başlıyor...")
-        logger.info(f"⏱️  Tahmini süre: {total_coins * 1.5 / 60:.1f} dakika")
+        logger.info(f"🚀 {total_coins} coin için ML model eğitimi başlıyor ({workers} süreç x {n_jobs} thread)...")
         
         start_time = time.time()
+        loop = asyncio.get_running_loop()
+        attempts = {}
         
-        # Batch halinde eğit (API limitlerini aşmamak için)
-        for i in range(0, len(coins), batch_size):
-            batch = coins[i:i+batch_size]
-            
-            # Batch'teki coinleri eğit
-            tasks = []
-            for j, symbol in enumerate(batch):
-                global_index = i + j
-                task = self.train_single_coin(symbol, global_index, total_coins)
-                tasks.append(task)
-            
-            # Batch'i çalıştır
-            await asyncio.gather(*tasks, return_exceptions=True)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_training_worker, initargs=(n_jobs,)) as pool:
+            def submit(symbol):
+                attempts[symbol] = attempts.get(symbol, 0) + 1
+                future = loop.run_in_executor(pool, _train_coin_job, symbol, self.candle_limit, n_jobs)
+                return future, symbol
             
-            # Batch arası kısa mola (API limiti için)
-            if i + batch_size < len(coins):
-                await asyncio.sleep(2)
+            pending = dict(submit(symbol) for symbol in coins)
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    symbol = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Süreç çökmesi vb.
+                        result = {'success': False, 'error': str(e)[:100], 'duration': 0.0}
+                    
+                    if not result['success'] and attempts[symbol] <= self.retries:
+                        logger.warning(f"⚠️ {symbol} başarısız ({result['error']}), tekrar deneniyor ({attempts[symbol]}/{self.retries})")
+                        retry, _ = submit(symbol)
+                        pending[retry] = symbol
+                        continue
+                    
+                    self.record_result(symbol, result, attempts[symbol])
+                    finished = len(self.results)
+                    if result['success']:
+                        logger.info(f"✅ [{finished}/{total_coins}] {symbol} başarılı! MAPE: {result['best_mape']:.2f}%, Model: {result['best_model']}, Süre: {result['duration']:.1f}s")
+                    else:
+                        logger.error(f"❌ [{finished}/{total_coins}] {symbol} başarısız: {result['error']}")
+                    self.save_results(completed=False)
         
         total_duration = time.time() - start_time
         
@@ -186,18 +221,19 @@ class AllCoinsTrainer:
             if failed > 10:
                 print(f"   ... ve {failed-10} coin daha")
         
-        print("\n✅ Tüm modeller ml_models/saved_models/ klasöründe kaydedildi")
+        print("\n✅ Tüm modeller ml_models/bundles/ klasöründe kaydedildi")
         print("🔄 Modelleri kullanmak için: python quick_prediction.py COINUSDT")
         print("="*80)
     
-    def save_results(self):
-        """Sonuçları dosyaya kaydet"""
+    def save_results(self, completed=True):
+        """Sonuçları dosyaya kaydet (eğitim sürerken de aynı dosya güncellenir)"""
         
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        results_file = f"training_results_{timestamp}.json"
+        if self.results_file is None:
+            self.results_file = f"training_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        results_file = self.results_file
         
         summary = {
-            'training_completed_at': datetime.now().isoformat(),
+            'training_completed_at': datetime.now().isoformat() if completed else None,
             'total_coins': len(self.results),
             'successful_coins': sum(1 for r in self.results.values() if r['success']),
             'failed_coins': len(self.failed_coins),
@@ -205,10 +241,13 @@ class AllCoinsTrainer:
             'failed_coin_list': self.failed_coins
         }
         
-        with open(results_file, 'w') as f:
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        with open(f"{results_file}.tmp", 'w') as f:
             json.dump(summary, f, indent=2)
+        os.replace(f"{results_file}.tmp", results_file)
         
-        logger.info(f"📄 Sonuçlar kaydedildi: {results_file}")
+        if completed:
+            logger.info(f"📄 Sonuçlar kaydedildi: {results_file}")
 
 async def main():
     """Ana fonksiyon"""
@@ -217,14 +256,14 @@ async def main():
     print("="*50)
     
     # Kullanıcı onayı al
-    response = input("Bu işlem 1-2 saat sürebilir. Devam etmek istiyor musunuz? (y/N): ")
+    response = input(f"Bu işlem uzun sürebilir ({os.cpu_count()} çekirdek paralel kullanılacak). Devam etmek istiyor musunuz? (y/N): ")
     
     if response.lower() not in ['y', 'yes', 'evet', 'e']:
         print("❌ İşlem iptal edildi")
         return
     
     trainer = AllCoinsTrainer()
-    await trainer.train_all_coins(batch_size=1)
+    await trainer.train_all_coins()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Havuz Modeli Eğitimi
+Tüm coinler için tek model eğitir (pooled_model.py) ve coin başına modellerin
+training_results_*.json sonuçlarıyla karşılaştırır.
+
+Kullanım: python train_pooled_model.py [--candles 1000] [--results training_results_X.json]
+
+Her iki model de pencerenin son mumundan 2 mum sonraki kapanışı tahmin eder ve test MAPE'i
+her coinin son %20'lik zaman diliminde ölçülür. Rastgele bölmeyle (train_test_split) eğitilmiş
+eski coin başına sonuçlar ('split' kaydı olmayanlar) daha iyimserdir: karşılaştırmaya yalnızca
+zaman sıralı sonuçlar alınır, hiç yoksa tümü uyarıyla karşılaştırılır.
+"""
+
+import argparse
+import glob
+import json
+import sys
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import ccxt
+import numpy as np
+
+# Parent dizini path'e ekle (config.py için)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_data import CandleStore
+from market_data.features import FEATURE_COLUMNS, FEATURE_SET_VERSION, SEQUENCE_LENGTH
+from model_bundle import bundle_path, legacy_paths, save_bundle
+from pooled_model import POOLED_FEATURE_COLUMNS, POOLED_SYMBOL, TARGET_HORIZON, train_pooled
+from train_all_coins import AllCoinsTrainer
+from train_single_coin import fetch_historical_data
+
+# Logging ayarları
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FETCH_WORKERS = 8  # Eş zamanlı veri çekme sayısı
+
+def load_frames(exchange, store, symbols, candles, workers=FETCH_WORKERS):
+    """{symbol: OHLCV DataFrame}, veri alınamayan coinler atlanır"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = executor.map(lambda symbol: fetch_historical_data(exchange, symbol, limit=candles, store=store), symbols)
+        return {symbol: df for symbol, df in zip(symbols, frames) if df is not None and not df.empty}
+
+def directory_size(paths):
+    size = 0
+    for path in paths:
+        if os.path.isfile(path):
+            size += os.path.getsize(path)
+        elif os.path.isdir(path):
+            size += sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+    return size
+
+def latest_results_file():
+    files = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'training_results_*.json')))
+    return files[-1] if files else None
+
+def compare_with_per_coin(metrics, results_file, pooled_duration):
+    """Coin başına MAPE karşılaştırması (training_results_*.json ile ortak coinler)"""
+    with open(results_file, 'r') as f:
+        per_coin = {symbol: result for symbol, result in json.load(f)['results'].items() if result.get('success')}
+
+    # 'split' kaydı olmayan eski sonuçlar rastgele bölmeyle eğitildi
+    chronological = {symbol for symbol, result in per_coin.items() if result.get('split') == 'chronological'}
+    split_mismatch = not chronological
+    if split_mismatch:
+        logger.warning("Coin başına sonuçlar rastgele bölmeyle eğitilmiş: MAPE karşılaştırması aynı bölmede değil")
+
+    rows = {}
+    for symbol, pooled in metrics['symbols'].items():
+        if symbol in per_coin and (split_mismatch or symbol in chronological):
+            rows[symbol] = {
+                'per_coin_mape': per_coin[symbol]['test_mape'],
+                'pooled_mape': pooled['best_mape'],
+                'naive_mape': pooled['naive_mape']
+            }
+
+    per_coin_sizes = directory_size([bundle_path(symbol) for symbol in per_coin]
+                                    + [path for symbol in per_coin for path in legacy_paths(symbol).values()])
+    report = {
+        'results_file': os.path.basename(results_file),
+        'compared_coins': len(rows),
+        'split_mismatch': split_mismatch,
+        'skipped_random_split': sorted(set(per_coin) - chronological) if not split_mismatch else [],
+        'pooled_better': sum(1 for row in rows.values() if row['pooled_mape'] < row['per_coin_mape']),
+        'per_coin_mean_mape': float(np.mean([row['per_coin_mape'] for row in rows.values()])) if rows else None,
+        'pooled_mean_mape': float(np.mean([row['pooled_mape'] for row in rows.values()])) if rows else None,
+        'naive_mean_mape': float(np.mean([row['naive_mape'] for row in rows.values()])) if rows else None,
+        'per_coin_training_seconds': sum(result.get('duration', 0.0) for result in per_coin.values()),
+        'pooled_training_seconds': pooled_duration,
+        'per_coin_model_bytes': per_coin_sizes,
+        'pooled_model_bytes': directory_size([bundle_path(POOLED_SYMBOL)]),
+        'coins': rows
+    }
+    return report
+
+def print_report(report):
+    print("\n" + "=" * 72)
+    print(f"📊 HAVUZ MODELİ / COİN BAŞINA MODEL ({report['results_file']})")
+    print("=" * 72)
+    print(f"{'Coin':<14} | {'coin başına MAPE':>16} | {'havuz MAPE':>10} | {'naive MAPE':>10}")
+    print("-" * 72)
+    for symbol, row in sorted(report['coins'].items()):
+        print(f"{symbol:<14} | {row['per_coin_mape']:>15.3f}% | {row['pooled_mape']:>9.3f}% | {row['naive_mape']:>9.3f}%")
+    if report['compared_coins']:
+        print("-" * 72)
+        print(f"{'Ortalama':<14} | {report['per_coin_mean_mape']:>15.3f}% | {report['pooled_mean_mape']:>9.3f}% | "
+              f"{report['naive_mean_mape']:>9.3f}%")
+        print(f"Havuz modeli daha iyi: {report['pooled_better']}/{report['compared_coins']} coin")
+    if report['split_mismatch']:
+        print("⚠️  Coin başına sonuçlar rastgele bölmeyle: karşılaştırma aynı bölmede değil")
+    elif report['skipped_random_split']:
+        print(f"Rastgele bölmeyle eğitildiği için atlanan: {len(report['skipped_random_split'])} coin")
+    print(f"Eğitim süresi: coin başına toplam {report['per_coin_training_seconds'] / 60:.1f} dk, "
+          f"havuz {report['pooled_training_seconds'] / 60:.1f} dk")
+    print(f"Model boyutu: coin başına toplam {report['per_coin_model_bytes'] / 1024 ** 2:.1f} MB, "
+          f"havuz {report['pooled_model_bytes'] / 1024 ** 2:.1f} MB")
+    print("=" * 72)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one pooled price model for all coins")
+    parser.add_argument('symbols', nargs='*', help="Coinler (varsayılan: coin listesi)")
+    parser.add_argument('--candles', type=int, default=1000, help="Coin başına mum sayısı")
+    parser.add_argument('--results', help="Karşılaştırılacak training_results_*.json (varsayılan: en yenisi)")
+    args = parser.parse_args()
+
+    symbols = args.symbols or AllCoinsTrainer().load_all_coins()
+    exchange = ccxt.binance({
+        'enableRateLimit': True,
+        'options': {
+            'defaultType': 'future'
+        }
+    })
+
+    started = time.time()
+    frames = load_frames(exchange, CandleStore(), symbols, args.candles)
+    logger.info(f"{len(frames)}/{len(symbols)} coin verisi yüklendi ({time.time() - started:.1f}s)")
+
+    rf_model, gb_model, features, metrics = train_pooled(frames)
+    duration = time.time() - started
+
+    metadata = {
+        'feature_set_version': FEATURE_SET_VERSION,
+        'features': FEATURE_COLUMNS,
+        'pooled_features': POOLED_FEATURE_COLUMNS,
+        'sequence_length': SEQUENCE_LENGTH,
+        'target_horizon': TARGET_HORIZON,
+        'timeframe': '1h',
+        'full_training_at': datetime.now().isoformat(),
+        'candles_per_symbol': args.candles,
+        'symbols': features.symbols,
+        'metrics': metrics
+    }
+    path = save_bundle(POOLED_SYMBOL, {'rf': rf_model, 'gb': gb_model, 'scaler': features}, metadata)
+    logger.info(f"✅ Havuz modeli kaydedildi: {path} (ortalama test MAPE: {metrics['mean_best_mape']:.3f}%)")
+
+    results_file = args.results or latest_results_file()
+    if results_file is None:
+        logger.warning("training_results_*.json bulunamadı, karşılaştırma atlandı")
+        return
+    report = compare_with_per_coin(metrics, results_file, duration)
+    print_report(report)
+    report_file = f"pooled_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"📄 Karşılaştırma kaydedildi: {report_file}")
+
+if __name__ == "__main__":
+    main()
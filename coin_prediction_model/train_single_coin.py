@@ -4,19 +4,36 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-import joblib
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+from numpy.lib.stride_tricks import sliding_window_view
 import logging
 import os
 from datetime import datetime, timedelta
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from market_data import CandleStore, timeframe_to_ms
+from market_data.features import (FEATURE_COLUMNS, FEATURE_SET_VERSION, SEQUENCE_LENGTH, add_technical_indicators,
+                                  summarize_windows)
+from model_bundle import save_bundle
+
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_historical_data(exchange, symbol, timeframe='1h', limit=1000):
-    """Geçmiş fiyat verilerini çek"""
+def fetch_historical_data(exchange, symbol, timeframe='1h', limit=1000, store=None):
+    """Geçmiş fiyat verilerini çek
+
+    store (CandleStore) verilirse sadece yerel depoda olmayan mumlar indirilir,
+    veri depodan okunur (yalnızca kapanmış mumlar).
+    """
     try:
+        if store is not None:
+            since = exchange.milliseconds() - limit * timeframe_to_ms(timeframe)
+            store.sync(exchange, symbol, timeframe, since=since)
+            return store.load_dataframe(symbol, timeframe, limit=limit)
+
         ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
         df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
@@ -25,49 +42,18 @@ def fetch_historical_data(exchange, symbol, timeframe='1h', limit=1000):
         logger.error(f"Veri çekme hatası: {e}")
         return None
 
-def add_technical_indicators(df):
-    """Teknik indikatörleri ekle"""
-    # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
-    # MACD
-    exp1 = df['close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['close'].ewm(span=26, adjust=False).mean()
-    df['macd'] = exp1 - exp2
-    df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-    
-    # Bollinger Bands
-    df['ma20'] = df['close'].rolling(window=20).mean()
-    df['20std'] = df['close'].rolling(window=20).std()
-    df['upper_band'] = df['ma20'] + (df['20std'] * 2)
-    df['lower_band'] = df['ma20'] - (df['20std'] * 2)
-    
-    # ATR
-    high_low = df['high'] - df['low']
-    high_close = np.abs(df['high'] - df['close'].shift())
-    low_close = np.abs(df['low'] - df['close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = np.max(ranges, axis=1)
-    df['atr'] = true_range.rolling(14).mean()
-    
-    # Momentum
-    df['momentum'] = df['close'] - df['close'].shift(4)
-    
-    return df
-
-def prepare_data(df, sequence_length=60):
-    """Model için veri hazırla"""
+def prepare_data(df, sequence_length=SEQUENCE_LENGTH, dtype=np.float64, scaler=None):
+    """Model için veri hazırla
+
+    X, (örnek, sequence_length, özellik) şeklinde ölçeklenmiş veri üzerinde
+    sliding_window_view'dır (kopya yok). dtype=np.float32 belleği yarıya indirir;
+    ağaç modelleri zaten float32 ile çalışır.
+    scaler verilirse yeniden fit edilmez (mevcut modele yeni veri eklerken).
+    """
     df = df.dropna()
     
     # Özellikler ve hedef
-    features = ['open', 'high', 'low', 'close', 'volume', 'rsi', 'macd', 'signal', 
-                'ma20', 'upper_band', 'lower_band', 'atr', 'momentum']
-    
-    X = df[features].values
+    X = df[FEATURE_COLUMNS].values
     y = df['close'].shift(-1).values  # Bir sonraki kapanış fiyatı
     
     # NaN değerleri kaldır
@@ -75,50 +61,152 @@ def prepare_data(df, sequence_length=60):
     y = y[:-1]
     
     # Veriyi normalize et
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Sequence oluştur
-    X_seq = []
-    y_seq = []
-    
-    for i in range(len(X_scaled) - sequence_length):
-        X_seq.append(X_scaled[i:(i + sequence_length)])
-        y_seq.append(y[i + sequence_length])
-    
-    return np.array(X_seq), np.array(y_seq), scaler
+    if scaler is None:
+        scaler = StandardScaler().fit(X)
+    # Satır sıralı (C) düzen: pencere kopyaları tek seferde ve bitişik olur
+    X_scaled = np.ascontiguousarray(scaler.transform(X), dtype=dtype)
+    
+    # Sequence oluştur: X_seq[i] = X_scaled[i:i + sequence_length], hedef y[i + sequence_length]
+    if len(X_scaled) <= sequence_length:
+        return np.empty((0, sequence_length, X_scaled.shape[1]), dtype=dtype), np.empty(0), scaler
+    X_seq = sliding_window_view(X_scaled, (sequence_length, X_scaled.shape[1]))[:-1, 0]
+    y_seq = y[sequence_length:]
+    
+    return X_seq, y_seq, scaler
 
-def train_model(X, y):
-    """Ensemble model eğit"""
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # Random Forest
-    rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-    rf_model.fit(X_train.reshape(X_train.shape[0], -1), y_train)
-    
-    # Gradient Boosting
-    gb_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-    gb_model.fit(X_train.reshape(X_train.shape[0], -1), y_train)
+def flatten_windows(X, index=None):
+    """Seçilen pencereleri (örnek, sequence_length * özellik) matrisine tek kopyayla aç"""
+    windows = X if index is None else X[index]
+    return np.ascontiguousarray(windows).reshape(len(windows), -1)
+
+MODEL_INPUTS = ('flat', 'summary')
+LEGACY_MODEL_INPUTS = {'random_forest': 'flat', 'gradient_boosting': 'flat'}  # model_inputs kaydı olmayan paketler
+
+def model_inputs(inputs=None):
+    """{model türü: 'flat' | 'summary'}, varsayılan config.ML_MODEL_INPUTS"""
+    inputs = {**LEGACY_MODEL_INPUTS, **(config.ML_MODEL_INPUTS if inputs is None else inputs)}
+    for name, value in inputs.items():
+        if value not in MODEL_INPUTS:
+            raise ValueError(f"{name}: bilinmeyen model girdisi '{value}' ({', '.join(MODEL_INPUTS)})")
+    return inputs
+
+def build_models(n_jobs=None, inputs=None):
+    """Eğitilmemiş (rf_model, gb_model) çifti (eğitim ve walk-forward testi aynı ayarları kullanır)
+
+    'summary' girdili model, düzleştirilmiş pencereyi summarize_windows ile özet vektöre
+    çeviren bir Pipeline'dır; tahmin tarafı her iki girdide de aynı satırı verir.
+    """
+    inputs = model_inputs(inputs)
+    models = {
+        'random_forest': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs),
+        'gradient_boosting': GradientBoostingRegressor(n_estimators=100, random_state=42)
+    }
+    for name, model in models.items():
+        if inputs[name] == 'summary':
+            models[name] = Pipeline([('summary', FunctionTransformer(summarize_windows)), ('model', model)])
+    return models['random_forest'], models['gradient_boosting']
+
+def split_index(n_samples, test_size=0.2, chronological=True):
+    """(train_index, test_index)
+
+    chronological=True: son test_size kısım test kümesidir. Pencereler üst üste bindiği
+    için rastgele bölmede test hedefleri eğitim pencerelerinin içinde kalır ve MAPE
+    iyimser çıkar; rastgele bölme yalnızca eski sonuçlarla karşılaştırma içindir.
+    """
+    index = np.arange(n_samples)
+    if chronological:
+        split = n_samples - int(np.ceil(n_samples * test_size))
+        return index[:split], index[split:]
+    return train_test_split(index, test_size=test_size, random_state=42)
+
+def train_model(X, y, n_jobs=None, chronological=True, inputs=None):
+    """Ensemble model eğit, (rf_model, gb_model, metrics) döndürür
+
+    n_jobs: Random Forest için thread sayısı (paralel eğitimde süreç başına pay)
+    chronological: test kümesi son %20'lik zaman dilimi (False: eski rastgele bölme)
+    inputs: model türü başına 'flat' / 'summary' (varsayılan config.ML_MODEL_INPUTS)
+    """
+    # Train-test split (indeks üzerinden: pencereler her küme için bir kez kopyalanır)
+    train_index, test_index = split_index(len(X), chronological=chronological)
+    X_train, X_test = flatten_windows(X, train_index), flatten_windows(X, test_index)
+    y_train, y_test = y[train_index], y[test_index]
+    
+    rf_model, gb_model = build_models(n_jobs, inputs)
+    rf_model.fit(X_train, y_train)
+    gb_model.fit(X_train, y_train)
     
     # Test performansı
-    rf_score = rf_model.score(X_test.reshape(X_test.shape[0], -1), y_test)
-    gb_score = gb_model.score(X_test.reshape(X_test.shape[0], -1), y_test)
+    rf_score = rf_model.score(X_test, y_test)
+    gb_score = gb_model.score(X_test, y_test)
     
     logger.info(f"Random Forest R2 Score: {rf_score:.4f}")
     logger.info(f"Gradient Boosting R2 Score: {gb_score:.4f}")
     
-    return rf_model, gb_model
+    # Test MAPE (training_results_*.json ile aynı metrik)
+    mape = {
+        'random_forest': np.mean(np.abs((y_test - rf_model.predict(X_test)) / y_test)) * 100,
+        'gradient_boosting': np.mean(np.abs((y_test - gb_model.predict(X_test)) / y_test)) * 100
+    }
+    best_model = min(mape, key=mape.get)
+    metrics = {
+        'rf_r2': rf_score,
+        'gb_r2': gb_score,
+        'rf_mape': mape['random_forest'],
+        'gb_mape': mape['gradient_boosting'],
+        'best_model': best_model,
+        'best_mape': mape[best_model],
+        'split': 'chronological' if chronological else 'random',
+        'model_inputs': model_inputs(inputs),
+        'train_samples': len(X_train),
+        'test_samples': len(X_test)
+    }
+    
+    return rf_model, gb_model, metrics
+
+def train_and_save(exchange, symbol, limit=1000, store=None, n_jobs=None, compact=False, timeframe='1h'):
+    """Veri çek, modeli eğit ve kaydet; başarı durumu ve metrikleri döndürür
+
+    compact: eğitim matrislerini float32 tut (uzun geçmişlerde bellek yarıya iner)
+    """
+    df = fetch_historical_data(exchange, symbol, timeframe=timeframe, limit=limit, store=store)
+    if df is None or df.empty:
+        return {'success': False, 'error': 'Veri çekilemedi'}
+    
+    df = add_technical_indicators(df)
+    X, y, scaler = prepare_data(df, dtype=np.float32 if compact else np.float64)
+    if len(X) < 10:
+        return {'success': False, 'error': f'Yetersiz veri ({len(df)} mum)'}
+    
+    rf_model, gb_model, metrics = train_model(X, y, n_jobs)
+    
+    # Modelleri tek paket olarak kaydet
+    metadata = {
+        'feature_set_version': FEATURE_SET_VERSION,
+        'features': FEATURE_COLUMNS,
+        'sequence_length': SEQUENCE_LENGTH,
+        'model_inputs': metrics['model_inputs'],
+        'timeframe': timeframe,
+        'full_training_at': datetime.now().isoformat(),
+        'training_window': {
+            'start': df['timestamp'].iloc[0].isoformat(),
+            'end': df['timestamp'].iloc[-1].isoformat(),
+            'candles': len(df)
+        },
+        'metrics': metrics
+    }
+    model_path = save_bundle(symbol.replace('/', ''), {'rf': rf_model, 'gb': gb_model, 'scaler': scaler}, metadata)
+    logger.info(f"Modeller kaydedildi: {model_path}")
+    
+    return {'success': True, **metrics}
 
 def main():
-    if len(sys.argv) != 2:
-        print("Kullanım: python train_single_coin.py BTCUSDT")
+    if len(sys.argv) not in (2, 3):
+        print("Kullanım: python train_single_coin.py BTCUSDT [mum_sayısı]")
         sys.exit(1)
     
     symbol = sys.argv[1]
-    
-    # Model kayıt dizini oluştur
-    os.makedirs('ml_models/saved_models', exist_ok=True)
+    # 1000'den fazla mum için önce: python -m market_data.backfill --since 2022-01-01
+    limit = int(sys.argv[2]) if len(sys.argv) == 3 else 1000
     
     # Exchange bağlantısı
     exchange = ccxt.binance({
@@ -128,32 +216,14 @@ def main():
         }
     })
     
-    # Veri çek
-    logger.info(f"{symbol} için veri çekiliyor...")
-    df = fetch_historical_data(exchange, symbol)
-    if df is None:
-        logger.error("Veri çekilemedi!")
+    # Veri çek, eğit ve kaydet
+    logger.info(f"{symbol} için veri çekiliyor ve model eğitiliyor...")
+    result = train_and_save(exchange, symbol, limit=limit, store=CandleStore())
+    if not result['success']:
+        logger.error(f"Eğitim başarısız: {result['error']}")
         return
     
-    # İndikatörleri ekle
-    logger.info("Teknik indikatörler ekleniyor...")
-    df = add_technical_indicators(df)
-    
-    # Veriyi hazırla
-    logger.info("Veri hazırlanıyor...")
-    X, y, scaler = prepare_data(df)
-    
-    # Modeli eğit
-    logger.info("Model eğitiliyor...")
-    rf_model, gb_model = train_model(X, y)
-    
-    # Modelleri kaydet
-    model_path = f"ml_models/saved_models/{symbol.replace('/', '')}"
-    joblib.dump(rf_model, f"{model_path}_rf.joblib")
-    joblib.dump(gb_model, f"{model_path}_gb.joblib")
-    joblib.dump(scaler, f"{model_path}_scaler.joblib")
-    
-    logger.info(f"Modeller kaydedildi: {model_path}")
+    logger.info(f"Test MAPE: {result['best_mape']:.2f}% ({result['best_model']})")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Artımlı Model Güncelleme
+Kayıtlı modellere sadece son eğitimden sonra kapanan mumları ekler; sıfırdan eğitim
+yalnızca drift veya yaş kontrolleri gerektirdiğinde yapılır.
+
+Güncellemede scaler sabit kalır, RF ve GB'ye warm_start ile ML_UPDATE_ESTIMATORS ağaç
+eklenir (yeni mumlar + son ML_UPDATE_REPLAY_CANDLES mum). RF en eski ağaçlarını bırakır
+(ağaç sayısı sabit), GB ağaçları ML_GB_MAX_ESTIMATORS'a kadar birikir.
+
+Tam eğitim sebepleri:
+- paket yok / eski biçim / farklı özellik şeması
+- son tam eğitim ML_FULL_RETRAIN_DAYS günden eski
+- yeni mumlardaki MAPE, eğitim MAPE'inin ML_DRIFT_MAPE_RATIO katından büyük
+- yeni mumların fiyat seviyesinden bağımsız özellik ortalaması (RSI, fiyata oranlı MACD /
+  momentum / ATR / bant genişliği, hacim oranı) tekrar mumlarının dağılımından
+  ML_DRIFT_FEATURE_SHIFT std'den fazla kaymış
+
+Kullanım: python update_models.py [BTCUSDT ETHUSDT ...] [--full] [--workers 4]
+"""
+
+import argparse
+import sys
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+# Parent dizini path'e ekle (config.py için)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from market_data import schema_matches, timeframe_to_ms
+from market_data.features import FEATURE_COLUMNS, SEQUENCE_LENGTH, add_technical_indicators, timestamps_ms
+from model_bundle import list_bundles, load_bundle, save_bundle
+from pooled_model import POOLED_SYMBOL
+from train_single_coin import LEGACY_MODEL_INPUTS, prepare_data, flatten_windows, model_inputs, train_and_save
+import train_all_coins
+
+# Logging ayarları
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WARMUP_CANDLES = 100  # İndikatörlerin (EMA) oturması için pencereden önce yüklenen mum
+
+def mape(model, X, y):
+    return float(np.mean(np.abs((y - model.predict(X)) / y)) * 100)
+
+def full_retrain_reason(metadata, now=None):
+    """Yeni veriye bakmadan tam eğitim gerektiren durum, yoksa None"""
+    if metadata.get('format_version', 0) < 1 or 'training_window' not in metadata:
+        return 'eski model biçimi'
+    if not schema_matches(metadata):
+        return 'özellik şeması değişti'
+    if metadata.get('model_inputs', LEGACY_MODEL_INPUTS) != model_inputs():
+        return 'model girdisi değişti (ML_MODEL_INPUTS)'
+    trained_at = datetime.fromisoformat(metadata.get('full_training_at', metadata['created_at']))
+    if (now or datetime.now()) - trained_at > timedelta(days=config.ML_FULL_RETRAIN_DAYS):
+        return f"son tam eğitim {config.ML_FULL_RETRAIN_DAYS} günden eski"
+    return None
+
+def load_update_frame(exchange, store, symbol, timeframe, trained_until_ms):
+    """Son eğitilen mumdan sonrası + tekrar ve ısınma için önceki mumlar (kapanmış mumlar)"""
+    context = SEQUENCE_LENGTH + WARMUP_CANDLES + config.ML_UPDATE_REPLAY_CANDLES
+    start = trained_until_ms - context * timeframe_to_ms(timeframe)
+    store.sync(exchange, symbol, timeframe, since=start)
+    return store.load_dataframe(symbol, timeframe, start=start)
+
+def update_samples(df, scaler, trained_until_ms):
+    """Mevcut scaler ile (X, y, yeni örnek maskesi); X düzleştirilmiş"""
+    df = add_technical_indicators(df).dropna()
+    X, y, _ = prepare_data(df, scaler=scaler)
+    # y_seq[i] = i + sequence_length + 1. satırın kapanışı
+    target_times = timestamps_ms(df)[SEQUENCE_LENGTH + 1:]
+    # İlk WARMUP_CANDLES pencere EMA ısınması için atlanır
+    keep = slice(min(WARMUP_CANDLES, len(X)), None)
+    return flatten_windows(X[keep]), y[keep], target_times[keep] > trained_until_ms
+
+def scale_free_features(X, scaler):
+    """Düzleştirilmiş pencerelerin son satırından fiyat seviyesine bağlı olmayan özellikler
+
+    Fiyat sütunları (open/high/low/close, ma20, bantlar) durağan değildir: sıradan bir
+    fiyat hareketi bile eğitim ortalamasından std'lerce uzaklaşır. Sütunlar:
+    rsi, (macd - signal) / close, momentum / close, atr / close, bant genişliği / ma20, hacim / pencere ortalaması
+    """
+    n_features = len(FEATURE_COLUMNS)
+    windows = scaler.inverse_transform(X.reshape(-1, n_features)).reshape(len(X), SEQUENCE_LENGTH, n_features)
+    last = {name: windows[:, -1, i] for i, name in enumerate(FEATURE_COLUMNS)}
+    volume_mean = windows[:, :, FEATURE_COLUMNS.index('volume')].mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.column_stack([
+            last['rsi'],
+            (last['macd'] - last['signal']) / last['close'],
+            last['momentum'] / last['close'],
+            last['atr'] / last['close'],
+            (last['upper_band'] - last['lower_band']) / last['ma20'],
+            last['volume'] / volume_mean
+        ])
+
+def feature_shift(X_new, X_reference, scaler):
+    """Yeni örneklerin ölçekten bağımsız özellik ortalamalarının, referans örneklere göre en büyük kayması (std)"""
+    if len(X_new) == 0 or len(X_reference) == 0:
+        return 0.0
+    new, reference = scale_free_features(X_new, scaler), scale_free_features(X_reference, scaler)
+    std = np.nanstd(reference, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.abs(np.nanmean(new, axis=0) - np.nanmean(reference, axis=0)) / std
+    shift = shift[np.isfinite(shift)]
+    return float(shift.max()) if len(shift) else 0.0
+
+def tree_model(model):
+    """'summary' girdili modellerde (Pipeline) içteki ağaç modeli"""
+    return model[-1] if isinstance(model, Pipeline) else model
+
+def tree_input(model, X):
+    """Düzleştirilmiş pencereler -> içteki ağaç modelinin girdisi"""
+    return model[:-1].transform(X) if isinstance(model, Pipeline) else X
+
+def add_trees(rf_model, gb_model, X, y, n_jobs=None):
+    """RF ve GB'ye warm_start ile ML_UPDATE_ESTIMATORS ağaç ekle (RF ağaç sayısı sabit kalır)"""
+    rf_X, gb_X = tree_input(rf_model, X), tree_input(gb_model, X)
+    rf_model, gb_model = tree_model(rf_model), tree_model(gb_model)
+    rf_size = rf_model.n_estimators
+    rf_model.set_params(warm_start=True, n_estimators=rf_size + config.ML_UPDATE_ESTIMATORS, n_jobs=n_jobs)
+    rf_model.fit(rf_X, y)
+    # Kayan orman: en eski ağaçlar çıkar
+    rf_model.estimators_ = rf_model.estimators_[-rf_size:]
+    rf_model.set_params(n_estimators=rf_size, warm_start=False)
+
+    gb_model.set_params(warm_start=True, n_estimators=gb_model.n_estimators + config.ML_UPDATE_ESTIMATORS)
+    gb_model.fit(gb_X, y)
+    gb_model.set_params(warm_start=False)
+
+def update_model(exchange, store, symbol, full=False, n_jobs=None):
+    """Bir coinin modelini yeni mumlarla güncelle veya gerekirse tam eğit
+
+    Dönen sözlükte 'action': 'updated', 'retrained' veya 'up_to_date'.
+    """
+    started = time.time()
+    bundle = load_bundle(symbol)
+    metadata = bundle.metadata if bundle is not None else {}
+
+    def retrain(reason):
+        logger.info(f"🔁 {symbol}: tam eğitim ({reason})")
+        # Son tam eğitimle aynı uzunlukta pencereyle (yeni mumlar dahil) yeniden eğit
+        candles = metadata.get('full_training_candles', metadata.get('training_window', {}).get('candles', 1000))
+        result = train_and_save(exchange, symbol, limit=candles, store=store, n_jobs=n_jobs)
+        return {**result, 'action': 'retrained', 'reason': reason, 'duration': time.time() - started}
+
+    reason = '--full' if full else 'model yok' if bundle is None else full_retrain_reason(metadata)
+    if reason:
+        return retrain(reason)
+
+    timeframe = metadata.get('timeframe', '1h')
+    # training_window zamanları UTC (saat dilimsiz)
+    trained_until = pd.Timestamp(metadata['training_window']['end']).value // 10**6
+    rf_model, gb_model, scaler = bundle.as_tuple()
+
+    df = load_update_frame(exchange, store, symbol, timeframe, trained_until)
+    X, y, is_new = update_samples(df, scaler, trained_until)
+    new_samples = int(is_new.sum())
+    if new_samples < config.ML_UPDATE_MIN_CANDLES:
+        return {'success': True, 'action': 'up_to_date', 'new_samples': new_samples, 'duration': time.time() - started}
+
+    # Drift kontrolü: mevcut model yeni mumları görmeden önce ölçülür
+    # (özellik kayması eğitimde görülmüş tekrar mumlarına göre)
+    X_new, y_new = X[is_new], y[is_new]
+    live = {
+        'rf_mape': mape(rf_model, X_new, y_new),
+        'gb_mape': mape(gb_model, X_new, y_new),
+        'feature_shift': feature_shift(X_new, X[~is_new], scaler)
+    }
+    trained = metadata.get('metrics', {})
+    mape_ratio = min(live['rf_mape'], live['gb_mape']) / max(trained.get('best_mape', 0.0), 1e-9)
+    if mape_ratio > config.ML_DRIFT_MAPE_RATIO:
+        return retrain(f"MAPE {mape_ratio:.1f}x arttı")
+    if live['feature_shift'] > config.ML_DRIFT_FEATURE_SHIFT:
+        return retrain(f"özellik kayması {live['feature_shift']:.1f} std")
+    if tree_model(gb_model).n_estimators + config.ML_UPDATE_ESTIMATORS > config.ML_GB_MAX_ESTIMATORS:
+        return retrain(f"GB {config.ML_GB_MAX_ESTIMATORS} ağaç sınırında")
+
+    add_trees(rf_model, gb_model, X, y, n_jobs)
+
+    last_candle = df['timestamp'].iloc[-1]
+    metadata = {key: value for key, value in metadata.items()
+                if key not in ('format_version', 'symbol', 'created_at', 'sklearn_version', 'compressed')}
+    metadata.setdefault('full_training_at', bundle.metadata['created_at'])
+    metadata.setdefault('full_training_candles', metadata['training_window']['candles'])
+    metadata['training_window'] = {
+        **metadata['training_window'],
+        'end': last_candle.isoformat(),
+        'candles': metadata['training_window']['candles'] + new_samples
+    }
+    metadata['updates'] = metadata.get('updates', 0) + 1
+    metadata['last_update'] = {'at': datetime.now().isoformat(), 'new_samples': new_samples, **live}
+    save_bundle(symbol, {'rf': rf_model, 'gb': gb_model, 'scaler': scaler}, metadata)
+
+    return {'success': True, 'action': 'updated', 'new_samples': new_samples, **live,
+            'gb_estimators': tree_model(gb_model).n_estimators, 'duration': time.time() - started}
+
+def _update_coin_job(symbol, full, n_jobs):
+    """Tek coin güncellemesi (süreç havuzunda çalışır)"""
+    try:
+        return update_model(train_all_coins._worker_exchange, train_all_coins._worker_store, symbol, full, n_jobs)
+    except Exception as e:
+        return {'success': False, 'action': 'failed', 'error': str(e)[:100]}
+
+def update_all(symbols, full=False, workers=None):
+    """Tüm coinleri süreç havuzunda güncelle, {symbol: sonuç} döndürür"""
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, len(symbols)))
+    n_jobs = max(1, cpu_count // workers)
+    started = time.time()
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=train_all_coins._init_training_worker,
+                             initargs=(n_jobs,)) as pool:
+        futures = {pool.submit(_update_coin_job, symbol, full, n_jobs): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            result = results[symbol] = future.result()
+            if result['success']:
+                logger.info(f"[{len(results)}/{len(symbols)}] {symbol}: {result['action']} "
+                            f"({result.get('new_samples', '-')} yeni mum, {result.get('duration', 0):.1f}s)")
+            else:
+                logger.error(f"[{len(results)}/{len(symbols)}] {symbol} başarısız: {result.get('error')}")
+
+    actions = {}
+    for result in results.values():
+        actions[result['action']] = actions.get(result['action'], 0) + 1
+    logger.info(f"{len(symbols)} coin {(time.time() - started) / 60:.1f} dakikada güncellendi: "
+                + ', '.join(f"{action} {count}" for action, count in sorted(actions.items())))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental price model updates")
+    parser.add_argument('symbols', nargs='*', help="Coinler (varsayılan: kayıtlı tüm modeller)")
+    parser.add_argument('--full', action='store_true', help="Drift kontrolü olmadan tam eğitim")
+    parser.add_argument('--workers', type=int, help="Aynı anda güncellenen coin sayısı")
+    args = parser.parse_args()
+
+    # Havuz modeli train_pooled_model.py ile yeniden eğitilir
+    symbols = args.symbols or [symbol for symbol in list_bundles() if symbol != POOLED_SYMBOL]
+    if not symbols:
+        logger.error("Güncellenecek model yok, önce: python train_all_coins.py")
+        sys.exit(1)
+    update_all(symbols, args.full, args.workers)
+
+if __name__ == "__main__":
+    main()
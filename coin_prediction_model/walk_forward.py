@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Doğrulama
+Fiyat modellerini zaman sırasına uygun katlarla test eder: her katta model yalnızca
+test diliminden önceki mumlarla eğitilir (scaler dahil), sonraki dilimde tahmin yapar.
+
+Katlar (coin x kat) süreç havuzunda paralel eğitilir. Kat özellik matrisleri
+ml_models/walk_forward_cache/ altında saklanır; aynı veri ve özellik şemasıyla
+tekrar çalıştırmada yeniden hesaplanmaz.
+
+Rapor coin başına:
+- MAPE (RF / GB / ortalama) ve yön doğruluğu
+- _convert_to_trading_signal kurallarıyla açılan işlemler: isabet, ortalama getiri
+  (komisyon düşülmüş), profit factor, maksimum düşüş, sinyal seviyesi başına isabet
+- modelin kayıtlı (eğitimde ölçülen) MAPE'i ile karşılaştırma
+
+Kullanım: python walk_forward.py [BTCUSDT ETHUSDT ...] [--candles 1000] [--folds 5] [--workers 4] [--no-cache]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import ccxt
+import numpy as np
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+# Parent dizini path'e ekle (config.py için)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from market_data import CandleStore
+from market_data.features import FEATURE_COLUMNS, FEATURE_SET_VERSION, SEQUENCE_LENGTH, add_technical_indicators, timestamps_ms
+from model_bundle import list_bundles, load_bundle
+from pooled_model import POOLED_SYMBOL
+from train_single_coin import build_models, fetch_historical_data, flatten_windows, prepare_data
+from trading_with_ml import MLTradingSignals
+
+# Logging ayarları
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ml_models', 'walk_forward_cache')
+CACHE_VERSION = 2  # Kat matrisi biçimi değişirse artırılır
+# Hedef pencerenin son mumundan 2 mum sonra: son eğitim örneği ile ilk test örneği arasında
+# 1 örnek boşluk bırakılmazsa son eğitim hedefi ilk testin tahmin anındaki fiyattan sonraya düşer
+LABEL_GAP = 1
+SIGNAL_LEVELS = ('STRONG', 'MEDIUM', 'WEAK', 'NONE')
+
+def fold_fingerprint(symbol, df, n_folds):
+    """Veri + özellik şeması + kat sayısı özeti (önbellek anahtarı)"""
+    timestamps = timestamps_ms(df)
+    key = json.dumps([CACHE_VERSION, FEATURE_SET_VERSION, FEATURE_COLUMNS, SEQUENCE_LENGTH, symbol, n_folds,
+                      int(timestamps[0]), int(timestamps[-1]), len(df), float(df['close'].sum())])
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def build_fold(X_raw, y, close, train_index, test_index):
+    """Tek kat matrisleri: scaler yalnızca eğitim pencerelerinin satırlarıyla fit edilir"""
+    # Eğitim pencereleri 0 .. train_index[-1] + SEQUENCE_LENGTH - 1 satırlarını kapsar
+    scaler = StandardScaler().fit(X_raw.to_numpy()[:train_index[-1] + SEQUENCE_LENGTH])
+    X, _, _ = prepare_data(X_raw, scaler=scaler, dtype=np.float32)
+    return {
+        'X_train': flatten_windows(X, train_index),
+        'y_train': y[train_index],
+        'X_test': flatten_windows(X, test_index),
+        'y_test': y[test_index],
+        # Test penceresinin son kapanışı (tahmin anındaki fiyat)
+        'current': close[test_index + SEQUENCE_LENGTH - 1]
+    }
+
+def fold_files(symbol, df, n_folds, cache_dir=CACHE_DIR, use_cache=True):
+    """Coin'in kat matrislerini diske yaz (önbellekte varsa tekrar kullan), dosya yollarını döndürür"""
+    fingerprint = fold_fingerprint(symbol, df, n_folds)
+    symbol_dir = os.path.join(cache_dir, symbol)
+    paths = [os.path.join(symbol_dir, f"{fingerprint}_fold{fold}.npz") for fold in range(n_folds)]
+    if use_cache and all(os.path.exists(path) for path in paths):
+        return paths, True
+
+    df = add_technical_indicators(df).dropna()
+    X_raw = df[FEATURE_COLUMNS]
+    close = df['close'].to_numpy(dtype=np.float64)
+    # prepare_data ile aynı hizalama: örnek i'nin hedefi i + SEQUENCE_LENGTH + 1. satırın kapanışı
+    y = close[SEQUENCE_LENGTH + 1:]
+    splits = TimeSeriesSplit(n_splits=n_folds, gap=LABEL_GAP).split(np.arange(len(y)))
+
+    os.makedirs(symbol_dir, exist_ok=True)
+    for path in os.listdir(symbol_dir):
+        if not path.startswith(fingerprint):
+            os.remove(os.path.join(symbol_dir, path))  # Eski veriye ait katlar
+    for path, (train_index, test_index) in zip(paths, splits):
+        np.savez(f"{path}.tmp.npz", **build_fold(X_raw, y, close, train_index, test_index))
+        os.replace(f"{path}.tmp.npz", path)
+    return paths, False
+
+def _init_fold_worker(n_jobs):
+    """BLAS/OpenMP thread'lerini süreç başına n_jobs ile sınırla"""
+    threadpool_limits(n_jobs)
+
+def _run_fold_job(path, n_jobs):
+    """Tek kat: modelleri eğit, test dilimini tahmin et (süreç havuzunda çalışır)"""
+    started = time.time()
+    with np.load(path) as fold:
+        data = {name: fold[name] for name in fold.files}
+    rf_model, gb_model = build_models(n_jobs)
+    rf_model.fit(data['X_train'], data['y_train'])
+    gb_model.fit(data['X_train'], data['y_train'])
+    return {
+        'rf': rf_model.predict(data['X_test']),
+        'gb': gb_model.predict(data['X_test']),
+        'actual': data['y_test'],
+        'current': data['current'],
+        'train_samples': len(data['y_train']),
+        'duration': time.time() - started
+    }
+
+def mape(actual, predicted):
+    return float(np.mean(np.abs((actual - predicted) / actual)) * 100)
+
+def evaluate_predictions(rf, gb, actual, current):
+    """Test tahminlerinden doğruluk ve sinyal kurallarıyla işlem metrikleri"""
+    ensemble = (rf + gb) / 2
+    moved = actual != current
+    direction_hits = np.sign(ensemble - current) == np.sign(actual - current)
+
+    fee_pct = 2 * config.EXCHANGE_FEES  # Giriş + çıkış
+    trades = []
+    levels = {level: {'signals': 0, 'hits': 0} for level in SIGNAL_LEVELS}
+    for index in range(len(actual)):
+        signal = MLTradingSignals._convert_to_trading_signal(
+            MLTradingSignals._prediction_result(current[index], rf[index], gb[index]))
+        if not signal['success']:
+            continue
+        level = levels[signal['signal_level']]
+        level['signals'] += 1
+        level['hits'] += int(direction_hits[index])
+        if signal['should_trade']:
+            side = 1 if signal['direction'] == 'LONG' else -1
+            trades.append(side * (actual[index] / current[index] - 1) * 100 - fee_pct)
+
+    trades = np.array(trades)
+    wins, losses = trades[trades > 0], trades[trades <= 0]
+    equity = np.cumsum(trades)
+    return {
+        'samples': len(actual),
+        'rf_mape': mape(actual, rf),
+        'gb_mape': mape(actual, gb),
+        'ensemble_mape': mape(actual, ensemble),
+        'naive_mape': mape(actual, current),  # Fiyat değişmez tahmini
+        'directional_accuracy': float(direction_hits[moved].mean() * 100) if moved.any() else None,
+        'trades': len(trades),
+        'trade_rate': len(trades) / len(actual) * 100 if len(actual) else 0.0,
+        'win_rate': float(len(wins) / len(trades) * 100) if len(trades) else None,
+        'avg_trade_pct': float(trades.mean()) if len(trades) else None,
+        'total_return_pct': float(trades.sum()),
+        'profit_factor': float(wins.sum() / -losses.sum()) if losses.sum() < 0 else None,
+        'max_drawdown_pct': float(np.max(np.maximum.accumulate(np.r_[0.0, equity]) - np.r_[0.0, equity])),
+        'signal_levels': {name: {'signals': level['signals'],
+                                 'hit_rate': level['hits'] / level['signals'] * 100 if level['signals'] else None}
+                          for name, level in levels.items()}
+    }
+
+def evaluate_symbol(folds):
+    """Kat sonuçlarını birleştir: toplam metrikler tüm test dilimlerinin tahminleri üzerinden"""
+    report = evaluate_predictions(*(np.concatenate([fold[name] for fold in folds])
+                                    for name in ('rf', 'gb', 'actual', 'current')))
+    report['folds'] = [
+        {'train_samples': fold['train_samples'], 'duration': fold['duration'],
+         **{key: value for key, value in evaluate_predictions(fold['rf'], fold['gb'], fold['actual'], fold['current']).items()
+            if key != 'signal_levels'}}
+        for fold in folds
+    ]
+    return report
+
+def walk_forward(frames, n_folds=5, workers=None, cache_dir=CACHE_DIR, use_cache=True):
+    """frames: {symbol: OHLCV DataFrame}. Katları paralel çalıştırır, {symbol: rapor} döndürür"""
+    jobs = {}
+    for symbol, df in frames.items():
+        if len(df) < SEQUENCE_LENGTH + 100 + n_folds * 10:
+            logger.warning(f"{symbol}: yetersiz veri ({len(df)} mum), atlandı")
+            continue
+        paths, cached = fold_files(symbol, df, n_folds, cache_dir, use_cache)
+        logger.info(f"{symbol}: {n_folds} kat {'önbellekten' if cached else 'hazırlandı'}")
+        for fold, path in enumerate(paths):
+            jobs[(symbol, fold)] = path
+    if not jobs:
+        return {}
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, len(jobs)))
+    n_jobs = max(1, cpu_count // workers)
+    started = time.time()
+    folds = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker, initargs=(n_jobs,)) as pool:
+        futures = {pool.submit(_run_fold_job, path, n_jobs): key for key, path in jobs.items()}
+        for future in as_completed(futures):
+            symbol, fold = futures[future]
+            folds.setdefault(symbol, {})[fold] = future.result()
+    logger.info(f"{len(jobs)} kat {time.time() - started:.1f}s içinde eğitildi ({workers} süreç x {n_jobs} thread)")
+
+    return {symbol: evaluate_symbol([symbol_folds[fold] for fold in sorted(symbol_folds)])
+            for symbol, symbol_folds in folds.items()}
+
+def format_value(value, suffix='%'):
+    return '-' if value is None else f"{value:.2f}{suffix}"
+
+def print_report(reports):
+    print("\n" + "=" * 100)
+    print("📊 WALK-FORWARD DOĞRULAMA")
+    print("=" * 100)
+    print(f"{'Coin':<14} | {'kayıtlı':>7} | {'MAPE':>7} | {'naive':>7} | {'yön':>7} | {'işlem':>5} | "
+          f"{'isabet':>7} | {'ort.':>7} | {'toplam':>8} | {'maks. düşüş':>11}")
+    print("-" * 100)
+    for symbol, report in sorted(reports.items()):
+        best_mape = min(report['rf_mape'], report['gb_mape'])
+        print(f"{symbol:<14} | {format_value(report.get('reported_mape')):>7} | {format_value(best_mape):>7} | "
+              f"{format_value(report['naive_mape']):>7} | {format_value(report['directional_accuracy']):>7} | "
+              f"{report['trades']:>5} | {format_value(report['win_rate']):>7} | {format_value(report['avg_trade_pct']):>7} | "
+              f"{format_value(report['total_return_pct']):>8} | {format_value(report['max_drawdown_pct']):>11}")
+    print("-" * 100)
+    print("kayıtlı: modelin eğitimde ölçülen MAPE'i; isabet/getiri: _convert_to_trading_signal işlemleri, "
+          f"komisyon ({2 * config.EXCHANGE_FEES:.2f}%) düşülmüş")
+
+    for level in SIGNAL_LEVELS:
+        counts = [report['signal_levels'][level] for report in reports.values()]
+        signals = sum(count['signals'] for count in counts)
+        if signals:
+            hits = sum(count['hit_rate'] * count['signals'] / 100 for count in counts if count['signals'])
+            print(f"  {level:<6}: {signals} sinyal, yön isabeti {hits / signals * 100:.1f}%")
+    print("=" * 100)
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward validation of the price models")
+    parser.add_argument('symbols', nargs='*', help="Coinler (varsayılan: kayıtlı tüm modeller)")
+    parser.add_argument('--candles', type=int, default=1000, help="Coin başına mum sayısı")
+    parser.add_argument('--folds', type=int, default=5, help="Kat sayısı")
+    parser.add_argument('--workers', type=int, help="Aynı anda eğitilen kat sayısı")
+    parser.add_argument('--no-cache', action='store_true', help="Kat matrislerini yeniden hesapla")
+    args = parser.parse_args()
+
+    symbols = args.symbols or [symbol for symbol in list_bundles() if symbol != POOLED_SYMBOL]
+    if not symbols:
+        logger.error("Test edilecek coin yok")
+        sys.exit(1)
+
+    exchange = ccxt.binance({
+        'enableRateLimit': True,
+        'options': {
+            'defaultType': 'future'
+        }
+    })
+    store = CandleStore()
+    frames = {}
+    for symbol in symbols:
+        df = fetch_historical_data(exchange, symbol, limit=args.candles, store=store)
+        if df is not None and not df.empty:
+            frames[symbol] = df
+
+    reports = walk_forward(frames, args.folds, args.workers, use_cache=not args.no_cache)
+    for symbol, report in reports.items():
+        bundle = load_bundle(symbol)
+        if bundle is not None:
+            report['reported_mape'] = bundle.metadata.get('metrics', {}).get('best_mape')
+
+    print_report(reports)
+    results_file = f"walk_forward_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(results_file, 'w') as f:
+        json.dump({'candles': args.candles, 'folds': args.folds, 'results': reports}, f, indent=2)
+    logger.info(f"📄 Sonuçlar kaydedildi: {results_file}")
+
+if __name__ == "__main__":
+    main()
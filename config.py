@@ -50,6 +50,28 @@ POSITION_SIZE_MAPPING = {
     'STRONG': 1.2   # 100% of base amount
 }
 
+# ================== ML PREDICTION SETTINGS ==================
+# coin_prediction_model sinyalleri (tradebot/config.py ile aynı değerler)
+ML_MIN_CONFIDENCE = 0.6     # Minimum model güven skoru
+ML_SIGNAL_THRESHOLD = 0.7   # Tahmin sinyali için minimum değişim (%)
+
+# Artımlı model güncelleme (coin_prediction_model/update_models.py)
+ML_UPDATE_ESTIMATORS = 10       # Güncelleme başına RF ve GB'ye eklenen ağaç sayısı
+ML_UPDATE_MIN_CANDLES = 6       # Bundan az yeni mum varsa güncelleme atlanır
+ML_UPDATE_REPLAY_CANDLES = 240  # Yeni ağaçlar yeni mumlar + önceki N mumla eğitilir
+ML_GB_MAX_ESTIMATORS = 200      # GB ağaç sayısı bunu aşacaksa tam eğitim
+ML_FULL_RETRAIN_DAYS = 7        # Son tam eğitimden bu kadar gün sonra tam eğitim
+ML_DRIFT_MAPE_RATIO = 1.5       # Yeni mumlardaki MAPE / eğitim MAPE'i bunu aşarsa tam eğitim
+ML_DRIFT_FEATURE_SHIFT = 2.0    # Ölçekten bağımsız özelliklerin (RSI, fiyata oranlar) ortalaması tekrar mumlarından kaç std kayarsa tam eğitim
+
+# Havuz modeli (coin_prediction_model/train_pooled_model.py)
+ML_POOLED_MODEL = False         # True: tüm coinler tek havuz modelinden tahmin edilir
+
+# Model türü başına girdi: 'flat' (60x13 pencere düzleştirilmiş, 780 sütun) veya 'summary' (133 sütunluk özet)
+# Karşılaştırma: python coin_prediction_model/benchmarks/feature_vector_benchmark.py
+# 'summary' isteğe bağlıdır: değiştirmek, sonraki update_models.py çalışmasında tüm coinlerin tam eğitimi demektir
+ML_MODEL_INPUTS = {'random_forest': 'flat', 'gradient_boosting': 'flat'}
+
 # ================== TECHNICAL ANALYSIS SETTINGS ==================
 # RSI settings
 RSI_PERIOD = 14
@@ -0,0 +1,17 @@
+from .candle_store import (
+    CandleStore,
+    DEFAULT_STORE_DIR,
+    candles_to_dataframe,
+    next_page_since,
+    symbol_key,
+    timeframe_to_ms
+)
+
+from .features import (
+    FEATURE_COLUMNS,
+    FEATURE_SET_VERSION,
+    SEQUENCE_LENGTH,
+    FeatureState,
+    add_technical_indicators,
+    schema_matches
+)
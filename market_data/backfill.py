@@ -0,0 +1,154 @@
+"""
+Toplu geçmiş mum indirme: coins.json'daki tüm coinler için fetch_ohlcv sayfalarını
+`since` imleciyle gezer ve yerel mum deposuna (CandleStore) yazar.
+
+Birden fazla coin aynı anda indirilir, tüm istekler ortak bir Binance ağırlık (weight)
+bütçesini paylaşır. Her sayfa hemen diske yazıldığı için yarıda kesilen bir çalışma
+tekrar başlatıldığında depodaki son mumdan devam eder (yarım kalan geçmiş indirmeleri
+boşluk olarak bulunur ve doldurulur).
+
+Kullanım (depo kökünden):
+    python -m market_data.backfill --coins tradebot/coins.json --timeframes 1h 15m --since 2022-01-01
+"""
+import argparse
+import asyncio
+import logging
+import time
+import ccxt
+import ccxt.async_support as ccxt_async
+from market_data.candle_store import (
+    CandleStore,
+    DEFAULT_STORE_DIR,
+    SYNC_PAGE_LIMIT,
+    next_page_since,
+    timeframe_to_ms
+)
+from market_data.coin_list import read_coin_list
+from market_data.rate_limits import BINANCE_WEIGHT_LIMIT, BACKFILL_WEIGHT_BUDGET, WeightWindow, kline_request_weight
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CONCURRENCY = 4
+MAX_RETRIES = 5
+
+
+class AsyncWeightLimiter(WeightWindow):
+    """Sliding window limiter for Binance request weight shared by asyncio tasks"""
+
+    def __init__(self, max_weight, window=60.0):
+        super().__init__(max_weight, window)
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, weight=1):
+        """Wait until `weight` fits into the current one minute window"""
+        async with self.lock:
+            while True:
+                wait = self._reserve(weight, time.monotonic())
+                if not wait:
+                    return
+                # Kilit tutulurken beklenir: sıradaki istekler de aynı pencereyi bekler
+                await asyncio.sleep(wait)
+
+
+def parse_since(value):
+    """'2022-01-01' or epoch ms -> epoch ms"""
+    if value.isdigit():
+        return int(value)
+    return ccxt.Exchange.parse8601(value if 'T' in value else f"{value}T00:00:00Z")
+
+
+async def fetch_page(exchange, limiter, symbol, timeframe, since, page_limit):
+    """One fetch_ohlcv page under the weight budget, retried on network errors"""
+    for attempt in range(1, MAX_RETRIES + 1):
+        await limiter.acquire(kline_request_weight(page_limit))
+        try:
+            return await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=int(since), limit=page_limit)
+        except (ccxt.NetworkError, ccxt.RateLimitExceeded) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"{symbol} {timeframe} page failed ({e}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def backfill_symbol(exchange, store, limiter, symbol, timeframe, since, page_limit=SYNC_PAGE_LIMIT):
+    """Fetch every range missing from the store for one symbol, returns the number of new candles"""
+    step = timeframe_to_ms(timeframe)
+    added = 0
+    # Sayfa başına disk işlemi tek aylık bölümdür (milisaniyeler), event loop'ta yapılır
+    ranges = store.pending_ranges(symbol, timeframe, since, fill_gaps=True)
+    for range_start, end in ranges:
+        start, range_added = range_start, 0
+        while start is not None:
+            now = exchange.milliseconds()
+            ohlcv = await fetch_page(exchange, limiter, symbol, timeframe, start, page_limit)
+            range_added += store.write_page(symbol, timeframe, ohlcv, now, end)
+            start = next_page_since(ohlcv, start, step, page_limit, end)
+        if end is not None and not range_added:
+            # Borsada da boş: sonraki çalışmalarda tekrar istenmez
+            store.mark_empty(symbol, timeframe, range_start, end)
+        added += range_added
+    return added
+
+
+async def backfill(coins, timeframes, since, store_dir=DEFAULT_STORE_DIR, concurrency=BACKFILL_CONCURRENCY,
+                   weight_budget=BACKFILL_WEIGHT_BUDGET, page_limit=SYNC_PAGE_LIMIT, exchange=None):
+    """Backfill all coins and timeframes concurrently, returns {(symbol, timeframe): new candles or error}"""
+    store = CandleStore(store_dir)
+    limiter = AsyncWeightLimiter(int(BINANCE_WEIGHT_LIMIT * weight_budget))
+    semaphore = asyncio.Semaphore(concurrency)
+    own_exchange = exchange is None
+    if own_exchange:
+        exchange = ccxt_async.binance({
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'future'
+            }
+        })
+
+    jobs = [(symbol, timeframe) for symbol in coins for timeframe in timeframes]
+    results = {}
+    started = time.time()
+
+    async def run(symbol, timeframe):
+        async with semaphore:
+            try:
+                added = await backfill_symbol(exchange, store, limiter, symbol, timeframe, since, page_limit)
+                results[(symbol, timeframe)] = added
+                logger.info(f"[{len(results)}/{len(jobs)}] {symbol} {timeframe}: {added} new candles")
+            except Exception as e:
+                results[(symbol, timeframe)] = e
+                logger.error(f"[{len(results)}/{len(jobs)}] {symbol} {timeframe} failed: {e}")
+
+    try:
+        await asyncio.gather(*(run(symbol, timeframe) for symbol, timeframe in jobs))
+    finally:
+        if own_exchange:
+            await exchange.close()
+
+    total = sum(value for value in results.values() if not isinstance(value, Exception))
+    failed = [key for key, value in results.items() if isinstance(value, Exception)]
+    logger.info(f"Backfill finished in {time.time() - started:.1f}s: {total} new candles, {len(failed)} failed")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk OHLCV backfill into the local candle store")
+    parser.add_argument('--coins', default='tradebot/coins.json', help="Coin listesi (JSON)")
+    parser.add_argument('--timeframes', nargs='+', default=['1h'], help="Zaman dilimleri")
+    parser.add_argument('--since', required=True, help="Başlangıç tarihi (YYYY-MM-DD) veya epoch ms")
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR, help="Mum deposu klasörü")
+    parser.add_argument('--concurrency', type=int, default=BACKFILL_CONCURRENCY, help="Aynı anda indirilen coin sayısı")
+    parser.add_argument('--weight-budget', type=float, default=BACKFILL_WEIGHT_BUDGET,
+                        help="Kullanılacak dakikalık ağırlık limiti payı (0-1, bot çalışmıyorsa 1'e kadar)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    coins = read_coin_list(args.coins)
+    asyncio.run(backfill(coins, args.timeframes, parse_since(args.since), args.store_dir,
+                         args.concurrency, args.weight_budget))
+
+
+if __name__ == "__main__":
+    main()
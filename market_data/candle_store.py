@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+import ccxt
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan depo: <repo>/data/candles (MARKET_DATA_DIR ortam değişkeni ile değiştirilebilir)
+DEFAULT_STORE_DIR = os.getenv(
+    'MARKET_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'candles')
+)
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+SYNC_PAGE_LIMIT = 1000
+EMPTY_RANGES_FILE = 'empty_ranges.json'
+
+
+def timeframe_to_ms(timeframe):
+    """'15m' -> 900000"""
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+def symbol_key(symbol):
+    """'BTC/USDT' or 'BTC/USDT:USDT' or 'BTCUSDT' -> 'BTCUSDT'"""
+    return symbol.split(':')[0].replace('/', '').upper()
+
+
+def month_keys(timestamps):
+    """Partition key ('YYYY-MM') of each open time in ms"""
+    return np.datetime_as_string(np.asarray(timestamps, dtype='datetime64[ms]').astype('datetime64[M]'))
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on a lock file shared by every process that writes the same file"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def replace_file(path, write, mode='wb', **open_kwargs):
+    """Write through a uniquely named temporary file in the same directory, then rename it over path"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def candles_to_dataframe(candles):
+    """(n, 6) array -> OHLCV DataFrame with a datetime timestamp column (like fetch_ohlcv callers build)"""
+    df = pd.DataFrame(np.asarray(candles), columns=CANDLE_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+class CandleStore:
+    """On-disk OHLCV warehouse partitioned as {root}/{SYMBOL}/{timeframe}/{YYYY-MM}.npy
+
+    Each partition is an (n, 6) float64 array [timestamp ms, open, high, low, close, volume],
+    sorted by open time without duplicates. Only closed candles are stored. Partitions are
+    loaded with np.load(mmap_mode='r'), so reads inside one month are zero-copy views.
+
+    Ranges that were fetched but came back empty (exchange outages, history before the
+    listing) are recorded in {SYMBOL}/{timeframe}/empty_ranges.json and not requested
+    again; delete the file to retry them.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def _directory(self, symbol, timeframe):
+        return os.path.join(self.root, symbol_key(symbol), timeframe)
+
+    def _path(self, symbol, timeframe, month):
+        return os.path.join(self._directory(symbol, timeframe), f"{month}.npy")
+
+    def partitions(self, symbol, timeframe):
+        """Sorted month keys stored for a symbol/timeframe"""
+        directory = self._directory(symbol, timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.npy'))
+
+    def load_partition(self, symbol, timeframe, month, mmap=True):
+        """One month of candles (read-only memory map by default)"""
+        path = self._path(symbol, timeframe, month)
+        if not os.path.exists(path):
+            return np.empty((0, 6))
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def load(self, symbol, timeframe, start=None, end=None, limit=None, mmap=True):
+        """Candles with start <= open time < end (ms), optionally only the last `limit`
+
+        Ranges inside one month are returned as memory-mapped views; ranges spanning
+        several months are concatenated into one array.
+        """
+        months = self.partitions(symbol, timeframe)
+        if start is not None:
+            months = [m for m in months if m >= month_keys([start])[0]]
+        if end is not None:
+            months = [m for m in months if m <= month_keys([end - 1])[0]]
+
+        parts, rows = [], 0
+        # Sondan başa: limit dolunca eski ayları açma
+        for month in reversed(months):
+            part = self.load_partition(symbol, timeframe, month, mmap)
+            if start is not None:
+                part = part[np.searchsorted(part[:, 0], start):]
+            if end is not None:
+                part = part[:np.searchsorted(part[:, 0], end)]
+            parts.append(part)
+            rows += len(part)
+            if limit is not None and rows >= limit:
+                break
+
+        if not parts:
+            return np.empty((0, 6))
+        candles = parts[0] if len(parts) == 1 else np.concatenate(parts[::-1])
+        return candles[-limit:] if limit is not None else candles
+
+    def load_dataframe(self, symbol, timeframe, start=None, end=None, limit=None):
+        """load() as an OHLCV DataFrame"""
+        return candles_to_dataframe(self.load(symbol, timeframe, start, end, limit))
+
+    def first_timestamp(self, symbol, timeframe):
+        """Open time (ms) of the oldest stored candle, None if nothing is stored"""
+        for month in self.partitions(symbol, timeframe):
+            part = self.load_partition(symbol, timeframe, month)
+            if len(part):
+                return int(part[0, 0])
+        return None
+
+    def last_timestamp(self, symbol, timeframe):
+        """Open time (ms) of the newest stored candle, None if nothing is stored"""
+        months = self.partitions(symbol, timeframe)
+        for month in reversed(months):
+            part = self.load_partition(symbol, timeframe, month)
+            if len(part):
+                return int(part[-1, 0])
+        return None
+
+    def write(self, symbol, timeframe, candles):
+        """Merge candles into their month partitions, returns the number of new rows
+
+        Existing rows with the same open time are replaced. Files are written to a
+        temporary name and renamed, so readers never see a half-written partition. Each
+        read-merge-replace holds a {month}.npy.lock file lock, so processes sharing the
+        store (bot candle cache, backfill, model server) do not drop each other's rows.
+        """
+        candles = np.asarray(candles, dtype=np.float64)
+        if len(candles) == 0:
+            return 0
+
+        directory = self._directory(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        keys = month_keys(candles[:, 0])
+        added = 0
+
+        with self.lock:
+            for month in np.unique(keys):
+                new_rows = candles[keys == month]
+                path = self._path(symbol, timeframe, month)
+                with file_lock(f"{path}.lock"):
+                    existing = self.load_partition(symbol, timeframe, month, mmap=False)
+
+                    merged = np.concatenate([new_rows, existing])
+                    # np.unique ilk görüleni tutar: yeni satırlar öncelikli
+                    _, index = np.unique(merged[:, 0], return_index=True)
+                    merged = merged[index]
+                    added += len(merged) - len(existing)
+
+                    replace_file(path, lambda f: np.save(f, merged))
+
+        return added
+
+    def find_gaps(self, symbol, timeframe, start=None, end=None):
+        """Missing candle ranges as [(first missing open time, last missing open time)] in ms"""
+        timestamps = self.load(symbol, timeframe, start, end)[:, 0]
+        if len(timestamps) < 2:
+            return []
+        step = timeframe_to_ms(timeframe)
+        jumps = np.flatnonzero(np.diff(timestamps) > step)
+        return [(int(timestamps[i] + step), int(timestamps[i + 1] - step)) for i in jumps]
+
+    def empty_ranges(self, symbol, timeframe):
+        """[(start, end)] ranges (ms) that were fetched and had no candles on the exchange"""
+        path = os.path.join(self._directory(symbol, timeframe), EMPTY_RANGES_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [tuple(item) for item in json.load(f)]
+
+    def mark_empty(self, symbol, timeframe, start, end):
+        """Record that start <= open time < end has no candles, so pending_ranges skips it"""
+        directory = self._directory(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, EMPTY_RANGES_FILE)
+        with self.lock, file_lock(f"{path}.lock"):
+            ranges = set(self.empty_ranges(symbol, timeframe))
+            ranges.add((int(start), int(end)))
+            replace_file(path, lambda f: json.dump(sorted(ranges), f), 'w', encoding='utf-8')
+        logger.info(f"Candle store: no {timeframe} candles for {symbol} in [{start}, {end}), skipping it from now on")
+
+    def pending_ranges(self, symbol, timeframe, since, fill_gaps=False):
+        """[(start, end)] open time ranges (ms) still to fetch, end None means until now
+
+        since: first open time that should be stored; history before the oldest
+               stored candle is backfilled down to it
+        fill_gaps: include missing ranges inside the stored history
+        Bounded ranges already recorded as empty (mark_empty) are left out.
+        """
+        step = timeframe_to_ms(timeframe)
+        first = self.first_timestamp(symbol, timeframe)
+        last = self.last_timestamp(symbol, timeframe)
+        if last is None:
+            return [(since, None)]
+
+        ranges = []
+        if since is not None and since < first:
+            ranges.append((since, first))
+        if fill_gaps:
+            ranges += [(gap_start, gap_end + step) for gap_start, gap_end in self.find_gaps(symbol, timeframe)]
+        empty = self.empty_ranges(symbol, timeframe)
+        ranges = [(start, end) for start, end in ranges
+                  if not any(empty_start <= start and end <= empty_end for empty_start, empty_end in empty)]
+        ranges.append((last + step, None))
+        return ranges
+
+    def write_page(self, symbol, timeframe, ohlcv, now, end=None):
+        """Store the closed candles of one fetch_ohlcv page (open time < end), returns new rows"""
+        if not ohlcv:
+            return 0
+        page = np.asarray(ohlcv, dtype=np.float64)
+        # Açık mum saklanmaz
+        closed = page[page[:, 0] + timeframe_to_ms(timeframe) <= now]
+        if end is not None:
+            closed = closed[closed[:, 0] < end]
+        return self.write(symbol, timeframe, closed)
+
+    def sync(self, exchange, symbol, timeframe, since=None, page_limit=SYNC_PAGE_LIMIT, fill_gaps=False):
+        """Append candles newer than the last stored one, returns the number of new candles
+
+        since: first open time (ms) that should be stored (default: last page_limit candles)
+        fill_gaps: also re-fetch missing ranges inside the stored history
+        """
+        if since is None and self.last_timestamp(symbol, timeframe) is None:
+            since = exchange.milliseconds() - page_limit * timeframe_to_ms(timeframe)
+
+        added = 0
+        for start, end in self.pending_ranges(symbol, timeframe, since, fill_gaps):
+            range_added = self._fetch_range(exchange, symbol, timeframe, start, end, page_limit)
+            if end is not None and not range_added:
+                self.mark_empty(symbol, timeframe, start, end)
+            added += range_added
+
+        if added:
+            logger.info(f"Candle store: {added} new {timeframe} candles for {symbol}")
+        return added
+
+    def _fetch_range(self, exchange, symbol, timeframe, start, end, page_limit):
+        """Fetch closed candles with start <= open time < end page by page"""
+        step = timeframe_to_ms(timeframe)
+        added = 0
+        while start is not None:
+            now = exchange.milliseconds()
+            ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=int(start), limit=page_limit)
+            added += self.write_page(symbol, timeframe, ohlcv, now, end)
+            start = next_page_since(ohlcv, start, step, page_limit, end)
+        return added
+
+
+def next_page_since(ohlcv, since, timeframe_ms, page_limit, end=None):
+    """Cursor for the next fetch_ohlcv page, None when the range is exhausted"""
+    if not ohlcv or len(ohlcv) < page_limit:
+        return None
+    next_since = int(ohlcv[-1][0]) + timeframe_ms
+    if next_since <= since or (end is not None and next_since >= end):
+        return None
+    return next_since
@@ -0,0 +1,18 @@
+"""Coin listesi dosyası (coins.json): bot, backfill ve model eğitimi aynı okuyucuyu kullanır"""
+import json
+
+
+def read_coin_list(path):
+    """Symbols from a coin list file: [...], {"coins": [...]} or [{"symbol": ...}, ...]
+
+    Raises ValueError for any other layout.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        if 'coins' not in data:
+            raise ValueError(f"Invalid coin list format in {path}")
+        data = data['coins']
+    if not isinstance(data, list):
+        raise ValueError(f"Invalid coin list format in {path}")
+    return [coin['symbol'] if isinstance(coin, dict) else coin for coin in data]
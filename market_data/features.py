@@ -0,0 +1,249 @@
+"""
+Fiyat modelleri için ortak özellik hesabı (eğitim, tahmin ve model sunucusu aynı kodu kullanır)
+
+FEATURE_COLUMNS model girdisinin sütun sırasıdır; her pencere SEQUENCE_LENGTH satırdır.
+İndikatör formülleri tradebot/indicators/technical.py ile aynıdır (RSI: clip + basit
+ortalama, ATR: true range'in basit ortalaması).
+
+    add_technical_indicators(df)  : tüm tablo için vektörel hesap (eğitim)
+    FeatureState                  : kapanan her yeni mum için tek satırlık artımlı hesap (tahmin)
+    summarize_windows(X)          : pencere -> ağaç modelleri için kısa özet vektör
+"""
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+
+FEATURE_SET_VERSION = 1
+FEATURE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'rsi', 'macd', 'signal',
+                   'ma20', 'upper_band', 'lower_band', 'atr', 'momentum']
+SEQUENCE_LENGTH = 60
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_WINDOW = 20
+BOLLINGER_STD = 2
+ATR_PERIOD = 14
+MOMENTUM_PERIOD = 4
+
+# Özet vektör: son satır, gecikmeli farklar ve pencere istatistikleri
+SUMMARY_LAGS = (1, 4, 24)                         # Tüm özellikler için son satır - gecikmeli satır
+SUMMARY_RETURN_LAGS = (2, 8, SEQUENCE_LENGTH - 1)  # Ek kapanış farkları (çoklu ufuk getirileri)
+SUMMARY_WINDOWS = (6, 24, SEQUENCE_LENGTH)        # Son N satırın ortalaması ve std'si
+
+
+def _rolling(values, window, func):
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = func(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    return out
+
+
+def _ewm(values, span):
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def _rsi(avg_gain, avg_loss):
+    """RSI from average gain/loss (100 when there is no loss, NaN on a flat window)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def add_technical_indicators(df):
+    """Add the indicator columns of FEATURE_COLUMNS to an OHLCV frame"""
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+
+    previous_close = np.r_[np.nan, close[:-1]]
+    delta = close - previous_close
+
+    # RSI
+    avg_gain = _rolling(np.clip(delta, 0, None), RSI_PERIOD, np.mean)
+    avg_loss = _rolling(np.clip(-delta, 0, None), RSI_PERIOD, np.mean)
+    df['rsi'] = _rsi(avg_gain, avg_loss)
+
+    # MACD
+    macd = _ewm(close, MACD_FAST) - _ewm(close, MACD_SLOW)
+    df['macd'] = macd
+    df['signal'] = _ewm(macd, MACD_SIGNAL)
+
+    # Bollinger Bands
+    ma20 = _rolling(close, BOLLINGER_WINDOW, np.mean)
+    std = _rolling(close, BOLLINGER_WINDOW, lambda windows, axis: windows.std(axis=axis, ddof=1))
+    df['ma20'] = ma20
+    df['upper_band'] = ma20 + std * BOLLINGER_STD
+    df['lower_band'] = ma20 - std * BOLLINGER_STD
+
+    # ATR (ilk mumda true range = high - low)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    df['atr'] = _rolling(true_range, ATR_PERIOD, np.mean)
+
+    # Momentum
+    momentum = np.full(len(close), np.nan)
+    momentum[MOMENTUM_PERIOD:] = close[MOMENTUM_PERIOD:] - close[:-MOMENTUM_PERIOD]
+    df['momentum'] = momentum
+
+    return df
+
+
+def timestamps_ms(df):
+    """Open times of an OHLCV frame (datetime timestamp column) as int64 epoch ms"""
+    return df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+
+def summary_feature_names():
+    """Column names of summarize_windows output"""
+    names = [f'{column}_last' for column in FEATURE_COLUMNS]
+    names += [f'{column}_diff_{lag}' for lag in SUMMARY_LAGS for column in FEATURE_COLUMNS]
+    names += [f'close_diff_{lag}' for lag in SUMMARY_RETURN_LAGS]
+    names += [f'{column}_{stat}_{window}' for window in SUMMARY_WINDOWS for stat in ('mean', 'std')
+              for column in FEATURE_COLUMNS]
+    return names
+
+
+def summarize_windows(X):
+    """Scaled windows (n, SEQUENCE_LENGTH, features) or their flattened rows -> (n, summary_feature_names())
+
+    Flattened 60x13 windows give tree models 780 mostly redundant columns; the summary keeps
+    the newest row, changes over several horizons and rolling mean/std of every feature.
+    """
+    windows = np.asarray(X).reshape(len(X), -1, len(FEATURE_COLUMNS))
+    last = windows[:, -1, :]
+    close = FEATURE_COLUMNS.index('close')
+    columns = [last]
+    columns += [last - windows[:, -1 - lag, :] for lag in SUMMARY_LAGS]
+    columns.append(np.column_stack([last[:, close] - windows[:, -1 - lag, close] for lag in SUMMARY_RETURN_LAGS]))
+    for window in SUMMARY_WINDOWS:
+        recent = windows[:, -window:, :]
+        columns += [recent.mean(axis=1), recent.std(axis=1)]
+    return np.hstack(columns)
+
+
+def schema_matches(metadata):
+    """Whether a model bundle was trained on FEATURE_COLUMNS (older bundles without a schema are assumed to be)"""
+    features = metadata.get('features')
+    return features is None or (list(features) == FEATURE_COLUMNS
+                                and metadata.get('sequence_length', SEQUENCE_LENGTH) == SEQUENCE_LENGTH)
+
+
+class FeatureState:
+    """Feature rows of one symbol, extended by one closed candle at a time
+
+    update() computes only the newest row from running state (EMAs and the short
+    indicator windows) instead of recomputing the whole frame. Rows match
+    add_technical_indicators on the same history within floating-point tolerance (sums
+    run in a different order; see benchmarks/feature_state_check.py in
+    coin_prediction_model); EMAs keep the full history seen so far.
+    """
+
+    def __init__(self, sequence_length=SEQUENCE_LENGTH):
+        self.sequence_length = sequence_length
+        self.rows = deque(maxlen=sequence_length)
+        self.last_timestamp = None
+        self.last_close = None
+
+        self.gains = deque(maxlen=RSI_PERIOD)
+        self.losses = deque(maxlen=RSI_PERIOD)
+        self.closes = deque(maxlen=max(BOLLINGER_WINDOW, MOMENTUM_PERIOD + 1))
+        self.true_ranges = deque(maxlen=ATR_PERIOD)
+        self.ema_fast = None
+        self.ema_slow = None
+        self.ema_signal = None
+
+    @staticmethod
+    def _ema(previous, value, span):
+        return value if previous is None else previous + 2 / (span + 1) * (value - previous)
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """Add one closed candle, returns its feature row (NaN while indicators warm up)"""
+        previous_close = self.last_close
+        if previous_close is None:
+            true_range = high - low
+        else:
+            delta = close - previous_close
+            self.gains.append(max(delta, 0.0))
+            self.losses.append(max(-delta, 0.0))
+            true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+        self.true_ranges.append(true_range)
+        self.closes.append(close)
+
+        # RSI
+        rsi = math.nan
+        if len(self.gains) == RSI_PERIOD:
+            avg_gain, avg_loss = sum(self.gains) / RSI_PERIOD, sum(self.losses) / RSI_PERIOD
+            if avg_loss > 0:
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+            elif avg_gain > 0:
+                rsi = 100.0
+
+        # MACD
+        self.ema_fast = self._ema(self.ema_fast, close, MACD_FAST)
+        self.ema_slow = self._ema(self.ema_slow, close, MACD_SLOW)
+        macd = self.ema_fast - self.ema_slow
+        self.ema_signal = self._ema(self.ema_signal, macd, MACD_SIGNAL)
+
+        # Bollinger Bands
+        ma20 = upper_band = lower_band = math.nan
+        if len(self.closes) >= BOLLINGER_WINDOW:
+            window = list(self.closes)[-BOLLINGER_WINDOW:]
+            ma20 = sum(window) / BOLLINGER_WINDOW
+            std = math.sqrt(sum((value - ma20) ** 2 for value in window) / (BOLLINGER_WINDOW - 1))
+            upper_band, lower_band = ma20 + std * BOLLINGER_STD, ma20 - std * BOLLINGER_STD
+
+        atr = sum(self.true_ranges) / ATR_PERIOD if len(self.true_ranges) == ATR_PERIOD else math.nan
+        momentum = close - self.closes[-MOMENTUM_PERIOD - 1] if len(self.closes) > MOMENTUM_PERIOD else math.nan
+
+        row = np.array([open_, high, low, close, volume, rsi, macd, self.ema_signal,
+                        ma20, upper_band, lower_band, atr, momentum])
+        self.rows.append(row)
+        self.last_timestamp = int(timestamp)
+        self.last_close = close
+        return row
+
+    def extend(self, df):
+        """Add the closed candles of an OHLCV frame in order, returns the number added"""
+        candles = zip(timestamps_ms(df), *(df[column].to_numpy(dtype=np.float64)
+                                           for column in ('open', 'high', 'low', 'close', 'volume')))
+        added = 0
+        for timestamp, open_, high, low, close, volume in candles:
+            self.update(timestamp, float(open_), float(high), float(low), float(close), float(volume))
+            added += 1
+        return added
+
+    def sync_frame(self, df):
+        """Add the candles of df that are newer than the state
+
+        Returns False when df does not contain the last candle of the state (or that
+        candle changed), in which case the state has to be rebuilt from a full frame.
+        """
+        if self.last_timestamp is None:
+            self.extend(df)
+            return True
+        timestamps = timestamps_ms(df)
+        position = np.searchsorted(timestamps, self.last_timestamp)
+        if position == len(timestamps) or timestamps[position] != self.last_timestamp \
+                or not math.isclose(float(df['close'].iloc[position]), self.last_close):
+            return False
+        self.extend(df.iloc[position + 1:])
+        return True
+
+    @property
+    def ready(self):
+        """A full window of valid rows is available"""
+        return len(self.rows) == self.sequence_length and not np.isnan(self.rows[0]).any()
+
+    def window(self):
+        """(sequence_length, features) array of the newest rows, None until ready"""
+        if not self.ready:
+            return None
+        return np.vstack(self.rows)
+
+    @classmethod
+    def from_dataframe(cls, df, sequence_length=SEQUENCE_LENGTH):
+        """State seeded from an OHLCV frame of closed candles"""
+        state = cls(sequence_length)
+        state.extend(df)
+        return state
@@ -0,0 +1,11 @@
+"""Tahmin sunucusu istemcisi (coin_prediction_model/model_server.py): bot ve sunucu aynı istemciyi kullanır"""
+import json
+import urllib.request
+
+
+def request_predictions(url, symbols, timeout=10.0):
+    """{symbol: prediction} from the model server (POST /predict)"""
+    body = json.dumps({'symbols': list(symbols)}).encode('utf-8')
+    request = urllib.request.Request(f"{url}/predict", data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())['predictions']
@@ -0,0 +1,66 @@
+"""
+Binance futures istek ağırlığı (weight) limiti ve paylaşımı
+
+Bot (tradebot/utils/rate_limiter.py) ve toplu indirme (market_data/backfill.py) aynı IP'den
+aynı dakikalık limiti kullanır. İkisinin payı birlikte limitin %80'idir; kalan %20 bu iki
+limiter'ın saymadığı istekler içindir (model sunucusu ve update_models mum senkronları,
+bot limiter'ı dolu iken beklemeden gönderilen emir / fiyat / pozisyon istekleri).
+"""
+from collections import deque
+
+BINANCE_WEIGHT_LIMIT = 2400  # Binance futures request weight limit per minute
+SCAN_WEIGHT_BUDGET = 0.6  # Share of the weight limit the trading bot may use
+BACKFILL_WEIGHT_BUDGET = 0.2  # Share left to backfill while the bot is running
+
+
+# Botun kline dışındaki REST istekleri (Binance futures IP ağırlığı)
+REQUEST_WEIGHTS = {
+    'fetch_ticker': 1,         # GET /fapi/v1/ticker/24hr (tek sembol)
+    'fetch_last_prices': 2,    # GET /fapi/v1/ticker/price (tüm semboller)
+    'fetch_positions': 5,      # GET /fapi/v2/positionRisk
+    'fetch_balance': 5,        # GET /fapi/v2/account
+    'position_side_dual': 30,  # GET /fapi/v1/positionSide/dual
+    'load_markets': 1,         # GET /fapi/v1/exchangeInfo
+    'set_leverage': 1,         # POST /fapi/v1/leverage
+    'create_order': 0,         # POST /fapi/v1/order: IP ağırlığı yok, emir sayısı limitine sayılır
+    'cancel_order': 1          # DELETE /fapi/v1/order
+}
+
+
+def kline_request_weight(limit):
+    """Binance futures /klines request weight for the given candle limit"""
+    if limit < 100:
+        return 1
+    elif limit < 500:
+        return 2
+    elif limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightWindow:
+    """Sliding window bookkeeping for Binance request weight (locking is left to subclasses)"""
+
+    def __init__(self, max_weight, window=60.0):
+        self.max_weight = max_weight
+        self.window = window
+        self.request_weights = deque()  # (zaman, ağırlık)
+        self.used_weight = 0
+
+    def _expire(self, now):
+        while self.request_weights and now - self.request_weights[0][0] >= self.window:
+            _, weight = self.request_weights.popleft()
+            self.used_weight -= weight
+
+    def _record(self, weight, now):
+        self._expire(now)
+        self.request_weights.append((now, weight))
+        self.used_weight += weight
+
+    def _reserve(self, weight, now):
+        """Record `weight` if it fits into the window, otherwise return the seconds to wait"""
+        self._expire(now)
+        if self.used_weight + weight <= self.max_weight or not self.request_weights:
+            self._record(weight, now)
+            return 0
+        return max(self.window - (now - self.request_weights[0][0]), 0.01)
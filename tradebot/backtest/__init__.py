@@ -0,0 +1,3 @@
+from .data import load_candles_csv, load_coin_candles, load_store_candles, candle_file_name
+from .signals import CoinSignals, compute_coin_signals, compute_all_signals
+from .simulator import BacktestParams, BacktestResult, run_backtest
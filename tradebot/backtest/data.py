@@ -0,0 +1,53 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def candle_file_name(symbol, timeframe):
+    """'BTC/USDT', '1h' -> 'BTCUSDT_1h.csv'"""
+    return f"{symbol.split(':')[0].replace('/', '')}_{timeframe}.csv"
+
+
+def load_candles_csv(path):
+    """Load an OHLCV CSV (timestamp in ms, open, high, low, close, volume) as an (n, 6) float64 array"""
+    df = pd.read_csv(path, usecols=CANDLE_COLUMNS)
+    candles = df[CANDLE_COLUMNS].to_numpy(dtype=np.float64)
+
+    # Sıralı ve tekrarsız zaman damgaları
+    _, unique_index = np.unique(candles[:, 0], return_index=True)
+    return candles[unique_index]
+
+
+def load_coin_candles(data_dir, coins, timeframe='15m'):
+    """{symbol: candles} for every coin that has a CSV file in data_dir, in coin list order"""
+    candles = {}
+    for symbol in coins:
+        path = os.path.join(data_dir, candle_file_name(symbol, timeframe))
+        if not os.path.exists(path):
+            logger.warning(f"No {timeframe} data for {symbol} ({path})")
+            continue
+        try:
+            candles[symbol] = load_candles_csv(path)
+        except Exception as e:
+            logger.error(f"Could not load {path}: {e}")
+    return candles
+
+
+def load_store_candles(store_dir, coins, timeframe='15m', start=None, end=None):
+    """{symbol: candles} from a market_data CandleStore (memory-mapped month partitions)"""
+    from market_data import CandleStore
+
+    store = CandleStore(store_dir)
+    candles = {}
+    for symbol in coins:
+        data = store.load(symbol, timeframe, start, end)
+        if len(data) == 0:
+            logger.warning(f"No {timeframe} data for {symbol} in {store_dir}")
+            continue
+        candles[symbol] = data
+    return candles
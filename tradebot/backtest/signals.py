@@ -0,0 +1,222 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import ccxt
+import numpy as np
+import pandas as pd
+from config import ATR_PERIOD, ATR_SMOOTHING, VOLUME_PROFILE_DISTRIBUTION
+from indicators.engine import rolling_mean, rolling_std, rolling_max, rolling_min
+from indicators.technical import true_range, atr_values
+from indicators.volume_profile import rolling_poc_prices
+
+# Canlı bot her taramada son SIGNAL_WINDOW mumu çeker (get_ohlcv_data) ve
+# calculate_total_signal_score'u bu pencere üzerinde çalıştırır. Burada aynı skor
+# tüm mumlar için tek seferde, pencere etkileri (MACD/Wilder başlangıcı, 200 MA
+# yerine pencere ortalaması) korunarak hesaplanır.
+SIGNAL_WINDOW = 100
+HIGHER_TIMEFRAMES = (('1h', 10), ('4h', 10))  # (zaman dilimi, puan)
+BASE_TREND_POINTS = 5
+MTF_MA_WINDOW = 20
+
+
+class CoinSignals:
+    """Per-candle signal score and trend direction of one coin"""
+
+    FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'score', 'direction', 'atr')
+
+    def __init__(self, symbol, timestamp, open_, high, low, close, score, direction, atr):
+        self.symbol = symbol
+        self.timestamp = timestamp  # ms
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.score = score          # NaN: yeterli geçmiş yok
+        self.direction = direction  # 1 long, -1 short, 0 trend yok
+        self.atr = atr
+
+    @classmethod
+    def from_candles(cls, symbol, candles, score, direction, atr):
+        return cls(symbol, candles[:, 0].astype(np.int64), candles[:, 1], candles[:, 2], candles[:, 3],
+                   candles[:, 4], score, direction, atr)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+
+def timeframe_to_ms(timeframe):
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+def _windows(values, window):
+    return np.lib.stride_tricks.sliding_window_view(values, window)
+
+
+def _window_values(values, window=SIGNAL_WINDOW):
+    """Result aligned with the last candle of each window (NaN for the first window - 1 candles)"""
+    out = np.full(len(values) + window - 1, np.nan)
+    out[window - 1:] = values
+    return out
+
+
+def _shift(values, periods=1):
+    out = np.full(len(values), np.nan)
+    out[periods:] = values[:-periods]
+    return out
+
+
+def rolling_nan_mean(values, window):
+    """Rolling mean skipping NaN like nan_mean on each window"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            out[window - 1:] = np.nanmean(_windows(values, window), axis=1)
+    return out
+
+
+def _ewm_rows(matrix, **kwargs):
+    return pd.DataFrame(matrix).ewm(adjust=False, **kwargs).mean().to_numpy()
+
+
+@lru_cache(maxsize=None)
+def macd_window_weights(window=SIGNAL_WINDOW, fast=12, slow=26, signal=9):
+    """Weight vectors giving MACD and signal line of a window's last two candles as dot products
+
+    EWM is linear in its inputs, so running it on the identity matrix gives the weight of
+    every close in the window. Returns (macd[-1], macd[-2], signal[-1], signal[-2]) weights.
+    """
+    identity = np.eye(window)
+    macd = _ewm_rows(identity, span=fast) - _ewm_rows(identity, span=slow)
+    signal_line = _ewm_rows(macd, span=signal)
+    return macd[-1], macd[-2], signal_line[-1], signal_line[-2]
+
+
+@lru_cache(maxsize=None)
+def wilder_window_weights(window=SIGNAL_WINDOW, period=ATR_PERIOD):
+    """Weights of each true range in the Wilder ATR of a window's last candle (SMA seeded)"""
+    identity = np.eye(window)
+    seeded = identity[period - 1:].copy()
+    seeded[0] = identity[:period].mean(axis=0)
+    return _ewm_rows(seeded, alpha=1 / period)[-1]
+
+
+def windowed_atr(high, low, close, period=ATR_PERIOD, smoothing=ATR_SMOOTHING, window=SIGNAL_WINDOW):
+    """ATR of the last candle of every window, as calculate_atr on the window frame returns it"""
+    if smoothing == 'sma':
+        # Sadece son `period` TR kullanılır, pencere başlangıcından etkilenmez
+        return atr_values(high, low, close, period, 'sma')
+
+    tr_windows = _windows(true_range(high, low, close), window).copy()
+    # Pencerenin ilk mumunda önceki kapanış yoktur: TR = high - low
+    tr_windows[:, 0] = (high - low)[:len(tr_windows)]
+    return _window_values(tr_windows @ wilder_window_weights(window, period), window)
+
+
+def higher_timeframe_trend(timestamp, close, timeframe_ms, ma_window=MTF_MA_WINDOW):
+    """Is the price above the MA of the higher timeframe candle closes (open candle = current price)?"""
+    group = timestamp // timeframe_ms
+    last_in_group = np.r_[group[1:] != group[:-1], True]
+    group_close = close[last_in_group]
+    group_index = np.cumsum(np.r_[False, last_in_group[:-1]])  # Her mumun üst zaman dilimi mumu
+
+    # Önceki (kapanmış) ma_window - 1 mumun toplamı
+    previous_sum = np.full(len(group_close), np.nan)
+    if len(group_close) >= ma_window:
+        previous_sum[ma_window - 1:] = _windows(group_close, ma_window - 1).sum(axis=1)[:len(group_close) - ma_window + 1]
+
+    ma = (previous_sum[group_index] + close) / ma_window
+    return close > ma  # NaN karşılaştırması False
+
+
+def compute_coin_signals(symbol, candles, base_timeframe='15m', volume_distribution=VOLUME_PROFILE_DISTRIBUTION):
+    """Score every candle of a coin like calculate_total_signal_score does on the live window"""
+    timestamp = candles[:, 0].astype(np.int64)
+    high, low, close, volume = candles[:, 2], candles[:, 3], candles[:, 4], candles[:, 5]
+    n = len(candles)
+    if n < SIGNAL_WINDOW:
+        return CoinSignals.from_candles(symbol, candles, np.full(n, np.nan), np.zeros(n, dtype=np.int8), np.full(n, np.nan))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ===== Market yapısı (30 puan) =====
+        higher_high = high > _shift(rolling_max(high, 20))
+        lower_low = ~higher_high & (low < _shift(rolling_min(low, 20)))
+        direction = np.where(higher_high, 1, np.where(lower_low, -1, 0)).astype(np.int8)
+        market_score = 15.0 * (direction != 0)
+        market_score += 10.0 * (volume > rolling_mean(volume, 20) * 1.5)
+        near_low = np.abs(close - rolling_min(low, 50)) / close < 0.02
+        near_high = np.abs(close - rolling_max(high, 50)) / close < 0.02
+        market_score += 5.0 * (near_low | near_high)
+
+        # ===== RSI uyumsuzluğu (25 puan) =====
+        delta = np.diff(close, prepend=np.nan)
+        avg_gain = rolling_mean(np.clip(delta, 0, None), 14)
+        avg_loss = rolling_mean(-np.clip(delta, None, 0), 14)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        close_mean = rolling_mean(close, 10)
+        rsi_mean = rolling_nan_mean(rsi, 10)
+        price_trend = close_mean > _shift(close_mean, 10)
+        rsi_trend = rsi_mean > _shift(rsi_mean, 10)
+        divergence = price_trend != rsi_trend
+        bullish = divergence & ~price_trend & rsi_trend
+        bearish = divergence & ~bullish
+        rsi_score = 15.0 * divergence
+
+        close_windows = _windows(close, SIGNAL_WINDOW)
+        macd_last, macd_prev, signal_last, signal_prev = (
+            _window_values(close_windows @ weights) for weights in macd_window_weights()
+        )
+        cross = ((macd_last > signal_last) & (macd_prev <= signal_prev)) | \
+                ((macd_last < signal_last) & (macd_prev >= signal_prev))
+        rsi_score += 5.0 * cross
+        rsi_score += 5.0 * ((rsi < 30) | (rsi > 70))
+
+        # ===== Bollinger Bands (20 puan) =====
+        middle = rolling_mean(close, 20)
+        std = rolling_std(close, 20)
+        upper, lower = middle + std * 2, middle - std * 2
+        width = (upper - lower) / middle
+        bollinger_score = 10.0 * (width < rolling_mean(width, 50) * 0.7)
+        touch = (np.abs(close - lower) < close * 0.001) | (np.abs(close - upper) < close * 0.001)
+        bollinger_score += 5.0 * touch
+        poc = rolling_poc_prices(low, high, volume, 50, distribution=volume_distribution)
+        bollinger_score += 5.0 * (np.abs(close - poc) / close < 0.01)
+
+        # ===== Çoklu zaman dilimi (25 puan) =====
+        mtf_score = BASE_TREND_POINTS * (close > rolling_mean(close, MTF_MA_WINDOW))
+        base_ms = timeframe_to_ms(base_timeframe)
+        for timeframe, points in HIGHER_TIMEFRAMES:
+            timeframe_ms = max(timeframe_to_ms(timeframe), base_ms)
+            mtf_score = mtf_score + points * higher_timeframe_trend(timestamp, close, timeframe_ms)
+
+        total_score = market_score + rsi_score + bollinger_score + mtf_score
+
+        # ===== Filtreler ve cezalar =====
+        penalty = 0.3 * ((bearish & (direction == 1)) | (bullish & (direction == -1)))
+        # Pencerede 200 mum olmadığı için canlıda "200 MA" pencere ortalamasıdır
+        ma_filter = rolling_mean(close, SIGNAL_WINDOW) if SIGNAL_WINDOW < 200 else rolling_mean(close, 200)
+        penalty += 0.5 * (((direction == 1) & (close < ma_filter)) | ((direction == -1) & (close > ma_filter)))
+        atr = windowed_atr(high, low, close)
+        penalty += 0.2 * ((atr / close) * 100 < 0.5)
+
+        score = total_score * (1 - penalty)
+
+    score[:SIGNAL_WINDOW - 1] = np.nan
+    return CoinSignals.from_candles(symbol, candles, score, direction, atr)
+
+
+def _score_coin(job):
+    symbol, candles, base_timeframe = job
+    return compute_coin_signals(symbol, candles, base_timeframe)
+
+
+def compute_all_signals(candles_by_symbol, base_timeframe='15m', workers=None):
+    """CoinSignals for every coin in dict order, scored in parallel processes when workers > 1"""
+    jobs = [(symbol, candles, base_timeframe) for symbol, candles in candles_by_symbol.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) < 2:
+        return [_score_coin(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_score_coin, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
@@ -0,0 +1,294 @@
+import numpy as np
+from config import (
+    WEAK_SIGNAL_THRESHOLD,
+    MEDIUM_SIGNAL_THRESHOLD,
+    STRONG_SIGNAL_THRESHOLD,
+    POSITION_SIZE_MAPPING,
+    TRAILING_STOP_ACTIVATION,
+    TRAILING_STOP_DISTANCE,
+    TRAILING_STOP_STEP,
+    MAX_POSITIONS,
+    LEVERAGE,
+    TRADE_AMOUNT,
+    MIN_NOTIONAL,
+    EXCHANGE_FEES,
+    COOLDOWN_PERIOD
+)
+from utils.risk_management import (
+    DYNAMIC_RISK_MULTIPLIERS,
+    dynamic_risk_levels,
+    pnl_to_price,
+    create_trailing_stop,
+    advance_trailing_stop,
+    trailing_stop_hit
+)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class BacktestParams:
+    """Tunable trading rules, defaults taken from config.py"""
+
+    def __init__(self, **overrides):
+        self.weak_threshold = WEAK_SIGNAL_THRESHOLD
+        self.medium_threshold = MEDIUM_SIGNAL_THRESHOLD
+        self.strong_threshold = STRONG_SIGNAL_THRESHOLD
+        self.position_size_mapping = dict(POSITION_SIZE_MAPPING)
+        self.risk_multipliers = list(DYNAMIC_RISK_MULTIPLIERS)
+        self.trailing_activation = TRAILING_STOP_ACTIVATION
+        self.trailing_distance = TRAILING_STOP_DISTANCE
+        self.trailing_step = TRAILING_STOP_STEP
+        self.max_positions = MAX_POSITIONS
+        self.leverage = LEVERAGE
+        self.trade_amount = TRADE_AMOUNT
+        self.min_notional = MIN_NOTIONAL
+        self.fee_percent = EXCHANGE_FEES  # Her işlem yönü için, notional üzerinden
+        self.cooldown = COOLDOWN_PERIOD   # Saniye
+        self.daily_profit_limit = 10.0    # Günlük bakiye artışı bu yüzdeye ulaşınca yeni işlem yok (None: kapalı)
+        self.initial_balance = 100.0
+
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown backtest parameter: {name}")
+            setattr(self, name, value)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def size_multiplier(self, score):
+        """determine_position_size with this parameter set's thresholds"""
+        if score >= self.strong_threshold:
+            return self.position_size_mapping['STRONG']
+        elif score >= self.medium_threshold:
+            return self.position_size_mapping['MEDIUM']
+        elif score >= self.weak_threshold:
+            return self.position_size_mapping['WEAK']
+        return 0
+
+
+class BacktestResult:
+    """Closed trades, realized equity curve and summary statistics"""
+
+    def __init__(self, params, trades, equity_curve):
+        self.params = params
+        self.trades = trades
+        self.equity_curve = equity_curve  # [(zaman ms, bakiye)]
+
+    def summary(self):
+        pnls = np.array([trade['pnl'] for trade in self.trades])
+        equity = np.array([self.params.initial_balance] + [value for _, value in self.equity_curve])
+        peak = np.maximum.accumulate(equity)
+        gross_profit = pnls[pnls > 0].sum() if len(pnls) else 0.0
+        gross_loss = -pnls[pnls < 0].sum() if len(pnls) else 0.0
+
+        exit_reasons = {}
+        for trade in self.trades:
+            exit_reasons[trade['reason']] = exit_reasons.get(trade['reason'], 0) + 1
+
+        return {
+            'trades': len(pnls),
+            'win_rate': float((pnls > 0).mean() * 100) if len(pnls) else 0.0,
+            'net_pnl': float(pnls.sum()) if len(pnls) else 0.0,
+            'return_percent': float((equity[-1] / equity[0] - 1) * 100),
+            'max_drawdown_percent': float(((peak - equity) / peak).max() * 100),
+            'profit_factor': float(gross_profit / gross_loss) if gross_loss > 0 else float('inf') if gross_profit > 0 else 0.0,
+            'avg_trade': float(pnls.mean()) if len(pnls) else 0.0,
+            'exit_reasons': exit_reasons
+        }
+
+
+def _price_path(open_, high, low, close):
+    """Intrabar price path: open, first extreme, second extreme, close"""
+    if close >= open_:
+        return (open_, low, high, close)
+    return (open_, high, low, close)
+
+
+def _fill_price(level, previous_price, price, falling):
+    """Fill at the trigger level when the path crossed it, at the price itself on gaps"""
+    if falling:
+        return level if previous_price > level >= price else price
+    return level if previous_price < level <= price else price
+
+
+class _Position:
+    def __init__(self, coin_index, bar, position_type, entry_price, margin, score, stop_loss_percent,
+                 take_profit_percent, trailing_stop, entry_time):
+        self.coin_index = coin_index
+        self.bar = bar
+        self.type = position_type
+        self.entry_price = entry_price
+        self.margin = margin
+        self.score = score
+        self.stop_loss_percent = stop_loss_percent
+        self.take_profit_percent = take_profit_percent
+        self.trailing_stop = trailing_stop
+        self.entry_time = entry_time
+        self.last_price = entry_price
+
+
+def _check_exit(position, params, price, first_point):
+    """evaluate_position_exit for one price point, returns (reason, fill price) or None"""
+    long = position.type == 'long'
+    entry = position.entry_price
+    previous = position.last_price
+    position.last_price = price
+    pnl = ((price - entry) if long else (entry - price)) / entry * 100 * params.leverage
+
+    ts = position.trailing_stop
+    advance_trailing_stop(ts, position.type, pnl)
+    if trailing_stop_hit(ts, position.type, price):
+        fill = price if first_point else _fill_price(ts['stop_level'], previous, price, falling=long)
+        return 'trailing_stop', fill
+
+    if pnl >= position.take_profit_percent:
+        level = pnl_to_price(entry, position.take_profit_percent, position.type, params.leverage)
+        return 'take_profit', price if first_point else _fill_price(level, previous, price, falling=not long)
+
+    if pnl <= -position.stop_loss_percent:
+        level = pnl_to_price(entry, -position.stop_loss_percent, position.type, params.leverage)
+        return 'stop_loss', price if first_point else _fill_price(level, previous, price, falling=long)
+
+    return None
+
+
+def _entry_events(signals, params):
+    """(timestamp, coin order, bar) of every candle whose score opens a position, sorted like the live scan"""
+    times, coins, bars = [], [], []
+    for coin_index, coin in enumerate(signals):
+        bar = np.flatnonzero((coin.score >= params.weak_threshold) & (coin.direction != 0))
+        times.append(coin.timestamp[bar])
+        coins.append(np.full(len(bar), coin_index))
+        bars.append(bar)
+    if not times:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    times, coins, bars = np.concatenate(times), np.concatenate(coins), np.concatenate(bars)
+    order = np.lexsort((coins, times))
+    return times[order], coins[order], bars[order]
+
+
+def run_backtest(signals, params=None):
+    """Replay entries and exits over the scored candles of all coins
+
+    signals: list of CoinSignals in coin list order (entries on the same candle follow this order)
+    Entries fill at the candle close, exits are checked on the following candles along the
+    open -> extreme -> extreme -> close path with the live trailing stop / take profit / stop loss rules.
+    """
+    params = params or BacktestParams()
+    if not signals:
+        return BacktestResult(params, [], [])
+
+    timeline = np.unique(np.concatenate([coin.timestamp for coin in signals]))
+    event_times, event_coins, event_bars = _entry_events(signals, params)
+    event_steps = np.searchsorted(timeline, event_times)
+
+    balance = params.initial_balance
+    day_start_balance, current_day = balance, None
+    positions = {}        # coin index -> _Position
+    recently_closed = {}  # coin index -> kapanış zamanı (ms)
+    trades, equity_curve = [], []
+    cooldown_ms = params.cooldown * 1000
+
+    step, event = 0, 0
+    while step < len(timeline):
+        if not positions:
+            # Açık pozisyon yoksa bir sonraki sinyale atla
+            if event >= len(event_steps):
+                break
+            step = max(step, event_steps[event])
+        now = timeline[step]
+
+        if now // DAY_MS != current_day:
+            current_day = now // DAY_MS
+            day_start_balance = balance
+
+        # 1) Açık pozisyonların çıkışları (mum içi fiyat yolu)
+        for coin_index, position in list(positions.items()):
+            coin = signals[coin_index]
+            bar = position.bar + 1
+            if bar >= len(coin) or coin.timestamp[bar] != now:
+                continue
+            position.bar = bar
+
+            path = _price_path(coin.open[bar], coin.high[bar], coin.low[bar], coin.close[bar])
+            for point, price in enumerate(path):
+                exit_ = _check_exit(position, params, price, point == 0)
+                if exit_ is not None:
+                    balance += _close_trade(position, coin, exit_[1], exit_[0], now, params, trades)
+                    equity_curve.append((int(now), balance))
+                    recently_closed[coin_index] = now
+                    del positions[coin_index]
+                    break
+
+        # 2) Bu mumun kapanışındaki sinyaller (coin listesi sırasıyla)
+        daily_limit = params.daily_profit_limit is not None and day_start_balance > 0 and \
+            (balance - day_start_balance) / day_start_balance * 100 >= params.daily_profit_limit
+        while event < len(event_steps) and event_steps[event] == step:
+            coin_index, bar = event_coins[event], event_bars[event]
+            event += 1
+            if daily_limit or len(positions) >= params.max_positions or coin_index in positions:
+                continue
+            if coin_index in recently_closed and now - recently_closed[coin_index] < cooldown_ms:
+                continue
+            position = _open_position(signals[coin_index], coin_index, bar, params, balance, positions)
+            if position is not None:
+                positions[coin_index] = position
+
+        step += 1
+
+    # Veri sonunda açık kalan pozisyonlar son kapanıştan kapatılır
+    for coin_index, position in positions.items():
+        coin = signals[coin_index]
+        balance += _close_trade(position, coin, coin.close[position.bar], 'end_of_data',
+                                coin.timestamp[position.bar], params, trades)
+        equity_curve.append((int(coin.timestamp[position.bar]), balance))
+
+    return BacktestResult(params, trades, equity_curve)
+
+
+def _open_position(coin, coin_index, bar, params, balance, positions):
+    """place_order sizing rules: score based margin, minimum notional and free balance check"""
+    score = float(coin.score[bar])
+    margin = params.trade_amount * params.size_multiplier(score)
+    if margin * params.leverage < params.min_notional:
+        margin = params.min_notional / params.leverage
+
+    free_balance = balance - sum(position.margin for position in positions.values())
+    if margin <= 0 or margin > free_balance:
+        return None
+
+    entry_price = float(coin.close[bar])
+    stop_loss_percent, take_profit_percent = dynamic_risk_levels(
+        score, entry_price, float(coin.atr[bar]), params.risk_multipliers
+    )
+    position_type = 'long' if coin.direction[bar] == 1 else 'short'
+    trailing_stop = create_trailing_stop(entry_price, params.trailing_activation,
+                                         params.trailing_distance, params.trailing_step)
+    return _Position(coin_index, bar, position_type, entry_price, margin, score, stop_loss_percent,
+                     take_profit_percent, trailing_stop, int(coin.timestamp[bar]))
+
+
+def _close_trade(position, coin, exit_price, reason, exit_time, params, trades):
+    """Record a closed trade and return its net PnL in USDT (after fees)"""
+    notional = position.margin * params.leverage
+    quantity = notional / position.entry_price
+    direction = 1 if position.type == 'long' else -1
+    gross = quantity * (exit_price - position.entry_price) * direction
+    fees = (notional + quantity * exit_price) * params.fee_percent / 100
+    pnl = gross - fees
+
+    trades.append({
+        'symbol': coin.symbol,
+        'type': position.type,
+        'score': position.score,
+        'entry_time': position.entry_time,
+        'exit_time': int(exit_time),
+        'entry_price': position.entry_price,
+        'exit_price': float(exit_price),
+        'reason': reason,
+        'margin': position.margin,
+        'pnl': pnl,
+        'pnl_percent': pnl / position.margin * 100
+    })
+    return pnl
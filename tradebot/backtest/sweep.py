@@ -0,0 +1,138 @@
+import csv
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from backtest.signals import CoinSignals
+from backtest.simulator import BacktestParams, run_backtest
+
+logger = logging.getLogger(__name__)
+
+# Çalışan süreçlerde paylaşılan bellek bağlantısı ve sinyal görünümleri
+_worker_memory = None
+_worker_signals = None
+
+
+class SharedSignals:
+    """Signal arrays of all coins packed into one shared memory block (fields x candles, float64)"""
+
+    def __init__(self, signals):
+        self.symbols = [coin.symbol for coin in signals]
+        lengths = [len(coin) for coin in signals]
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+        shape = (len(CoinSignals.FIELDS), self.offsets[-1])
+
+        self.memory = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        block = np.ndarray(shape, dtype=np.float64, buffer=self.memory.buf)
+        for row, field in enumerate(CoinSignals.FIELDS):
+            block[row] = np.concatenate([getattr(coin, field) for coin in signals]) if signals else []
+        self.spec = {'name': self.memory.name, 'shape': shape, 'symbols': self.symbols, 'offsets': self.offsets}
+
+    def close(self):
+        """Release and remove the shared block (parent only)"""
+        self.memory.close()
+        self.memory.unlink()
+
+
+def attach_signals(spec):
+    """Zero-copy CoinSignals views on a shared block, returns (memory, signals)"""
+    memory = shared_memory.SharedMemory(name=spec['name'])
+    block = np.ndarray(spec['shape'], dtype=np.float64, buffer=memory.buf)
+    offsets = spec['offsets']
+    signals = [
+        CoinSignals(symbol, *(block[row, offsets[i]:offsets[i + 1]] for row in range(len(CoinSignals.FIELDS))))
+        for i, symbol in enumerate(spec['symbols'])
+    ]
+    return memory, signals
+
+
+def _init_worker(spec):
+    global _worker_memory, _worker_signals
+    _worker_memory, _worker_signals = attach_signals(spec)
+
+
+def _run_params(overrides):
+    result = run_backtest(_worker_signals, BacktestParams(**overrides))
+    return overrides, result.summary()
+
+
+def expand_grid(grid):
+    """{'name': [values]} -> list of override dicts (cartesian product)"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def pnl_drawdown_ratio(summary):
+    """Return divided by max drawdown (higher is better)
+
+    Losing sets are multiplied by the drawdown instead: dividing would rank -10% with 50%
+    drawdown (-0.2) above -1% with 1% drawdown (-1.0).
+    """
+    drawdown = max(summary['max_drawdown_percent'], 0.01)
+    if summary['return_percent'] < 0:
+        return summary['return_percent'] * drawdown
+    return summary['return_percent'] / drawdown
+
+
+def ranking_violations(rows):
+    """(higher rank, lower rank) pairs, 1-based, where the lower ranked set dominates
+
+    A set dominates another when its return is at least as high and its drawdown at most
+    as deep (one of them strictly); ranked rows should never contain such a pair.
+    """
+    returns = np.array([row['return_percent'] for row in rows], dtype=np.float64)
+    drawdowns = np.array([row['max_drawdown_percent'] for row in rows], dtype=np.float64)
+    at_least = (returns[:, None] >= returns[None, :]) & (drawdowns[:, None] <= drawdowns[None, :])
+    strictly = (returns[:, None] > returns[None, :]) | (drawdowns[:, None] < drawdowns[None, :])
+    # dominates[i, j]: j, i'yi domine eder; i < j ise sıralama hatalı
+    dominates = (at_least & strictly).T
+    higher, lower = np.nonzero(np.triu(dominates, k=1))
+    return [(int(i) + 1, int(j) + 1) for i, j in zip(higher, lower)]
+
+
+def run_sweep(signals, grid, base_overrides=None, workers=None):
+    """Backtest every parameter combination in a process pool over shared memory signals
+
+    Scores are computed once by the caller; workers only run the event loop.
+    Returns rows sorted by pnl/drawdown ratio, best first.
+    """
+    combinations = [{**(base_overrides or {}), **overrides} for overrides in expand_grid(grid)]
+    workers = min(workers or os.cpu_count() or 1, len(combinations))
+    logger.info(f"Sweeping {len(combinations)} parameter sets with {workers} workers")
+
+    shared = SharedSignals(signals)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            results = list(pool.map(_run_params, combinations))
+    finally:
+        shared.close()
+
+    rows = []
+    for overrides, summary in results:
+        row = {name: overrides[name] for name in grid}
+        row.update({key: value for key, value in summary.items() if key != 'exit_reasons'})
+        row['pnl_drawdown'] = pnl_drawdown_ratio(summary)
+        rows.append(row)
+    # Eşit oranda daha yüksek getiri, sonra daha sığ drawdown önde
+    rows.sort(key=lambda row: (row['pnl_drawdown'], row['return_percent'], -row['max_drawdown_percent']), reverse=True)
+
+    violations = ranking_violations(rows)
+    if violations:
+        logger.warning(f"Sweep ranking check failed: {len(violations)} pairs out of order, e.g. "
+                       f"#{violations[0][1]} dominates #{violations[0][0]}")
+    else:
+        logger.info("Sweep ranking check passed: no set ranks above one with higher return and lower drawdown")
+    return rows
+
+
+def write_sweep_results(path, rows):
+    """Write ranked sweep rows to CSV"""
+    if not rows:
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['rank'] + list(rows[0]))
+        writer.writeheader()
+        for rank, row in enumerate(rows, 1):
+            writer.writerow({'rank': rank, **row})
@@ -0,0 +1,81 @@
+"""
+ATR benchmark: eski satır bazlı DataFrame.apply ile vektörel NumPy ATR karşılaştırması
+
+Kullanım (tradebot klasöründen): python benchmarks/atr_benchmark.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.technical import calculate_atr
+
+
+def legacy_calculate_atr(df, period=14):
+    """Önceki satır bazlı uygulama (referans)"""
+    df['previous_close'] = df['close'].shift(1)
+    df['tr'] = df[['high', 'low', 'previous_close']].apply(
+        lambda row: max(
+            row['high'] - row['low'],
+            abs(row['high'] - row['previous_close']),
+            abs(row['low'] - row['previous_close'])
+        ), axis=1
+    )
+    df['atr'] = df['tr'].rolling(window=period).mean()
+    return df
+
+
+def make_candles(n, seed=42):
+    """Rastgele yürüyüş ile sentetik mum verisi"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n)
+    })
+
+
+def best_time(func, df, repeat):
+    """En iyi süre (saniye)"""
+    times = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'Candles':>10} | {'apply (ms)':>12} | {'vectorized (ms)':>15} | {'speedup':>8} | match")
+    print("-" * 64)
+    
+    for n, repeat in [(1_000, 20), (100_000, 3)]:
+        df = make_candles(n)
+        
+        legacy = legacy_calculate_atr(df.copy())['atr'].to_numpy()
+        vectorized = calculate_atr(df.copy())['atr'].to_numpy()
+        match = np.allclose(legacy, vectorized, equal_nan=True)
+        
+        legacy_time = best_time(legacy_calculate_atr, df, repeat)
+        vectorized_time = best_time(calculate_atr, df, repeat)
+        
+        print(f"{n:>10,} | {legacy_time * 1000:>12.2f} | {vectorized_time * 1000:>15.3f} | "
+              f"{legacy_time / vectorized_time:>7.0f}x | {match}")
+    
+    # Wilder yumuşatma (borsa grafiklerindeki ATR)
+    df = make_candles(100_000)
+    wilder_time = best_time(lambda frame: calculate_atr(frame, smoothing='wilder'), df, 3)
+    print(f"\nWilder ATR on 100,000 candles: {wilder_time * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Volume profile benchmark: eski bin döngüsü ile vektörel histogram karşılaştırması
+
+Kullanım (tradebot klasöründen): python benchmarks/volume_profile_benchmark.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.volume_profile import find_poc_level
+from atr_benchmark import make_candles
+
+
+def legacy_find_poc_level(df, lookback=50, bins=50):
+    """Önceki bin döngüsü uygulaması (referans)"""
+    recent_data = df.tail(lookback)
+    price_range = np.linspace(recent_data['low'].min(), recent_data['high'].max(), bins)
+    volume_profile = []
+    
+    for i in range(len(price_range) - 1):
+        mask = (recent_data['low'] <= price_range[i+1]) & (recent_data['high'] >= price_range[i])
+        volume_profile.append({
+            'price': (price_range[i] + price_range[i+1]) / 2,
+            'volume': recent_data.loc[mask, 'volume'].sum()
+        })
+    
+    volume_profile = pd.DataFrame(volume_profile)
+    return volume_profile.loc[volume_profile['volume'].idxmax(), 'price']
+
+
+def average_time(func, repeat):
+    """Ortalama süre (mikrosaniye)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    frames = [make_candles(100, seed) for seed in range(200)]
+    matches = sum(legacy_find_poc_level(df) == find_poc_level(df) for df in frames)
+    print(f"POC match (full distribution): {matches}/{len(frames)}")
+    
+    df = frames[0]
+    legacy = average_time(lambda: legacy_find_poc_level(df), 100)
+    full = average_time(lambda: find_poc_level(df), 1000)
+    proportional = average_time(lambda: find_poc_level(df, distribution='proportional'), 1000)
+    
+    print(f"Loop POC:                {legacy:>10.1f} us")
+    print(f"Vectorized POC (full):   {full:>10.1f} us ({legacy / full:.0f}x)")
+    print(f"Vectorized POC (prop.):  {proportional:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,30 @@ TRAILING_STOP_UPGRADE_LEVEL = 20.0  # %20 kârda trailing stop upgrade
 TRAILING_STOP_UPGRADED_DISTANCE = 3.0  # Upgrade sonrası mesafe
 TRAILING_STOP_STEP = 5.0 
 
+# ================== EXCHANGE PROTECTION ORDERS ==================
+# Girişte Binance'e STOP_MARKET / TAKE_PROFIT_MARKET emirleri gönderilir, bot kapansa da pozisyon korunur
+EXCHANGE_PROTECTION_ORDERS = False     # True: borsa tarafı stop loss / take profit emirleri
+EXCHANGE_TRAILING_STOP = False         # True: TRAILING_STOP_MARKET emri de gönder (callback = TRAILING_STOP_DISTANCE / LEVERAGE)
+PROTECTION_WORKING_TYPE = 'MARK_PRICE'  # Tetik fiyatı: 'MARK_PRICE' or 'CONTRACT_PRICE'
+
+# ================== PRICE FEED SETTINGS ==================
+# Websocket fiyat akışı (açık pozisyonlar için REST ticker yerine)
+PRICE_FEED_ENABLED = True      # aiohttp gerekli, yoksa REST ticker kullanılır
+PRICE_FEED_STREAM = 'aggTrade'  # 'aggTrade' (son işlem fiyatı) or 'markPrice@1s' (mark fiyatı)
+PRICE_FEED_MAX_AGE = 5.0       # Bu süreden (saniye) eski fiyatlar için REST'e dönülür
+
+# ================== EXIT ENGINE SETTINGS ==================
+# Stop loss / take profit / trailing stop her fiyat tick'inde ayrı bir thread'de kontrol edilir
+EXIT_ENGINE_ENABLED = True            # False: çıkışlar ana döngüde (30 sn) kontrol edilir
+EXIT_ENGINE_POLL_INTERVAL = 1.0       # Websocket tick'i gelmeyen pozisyonlar için REST yoklama aralığı (saniye)
+EXIT_LATENCY_REPORT_INTERVAL = 300    # Tick -> emir gecikme istatistiklerinin loglanma aralığı (saniye)
+EXIT_RETRY_DELAY = 10.0               # Kapanış emri başarısız olup pozisyon borsada hâlâ açıksa yeniden denemeden önce beklenir (saniye)
+
+# Açık pozisyonlar her tick'te akış indikatörleriyle (indicators/streaming.py) yeniden puanlanır
+LIVE_RESCORE_ENABLED = True           # Puan: EMA, MACD, RSI ve Bollinger'dan pozisyon yönüyle uyumlu olanların payı (0-100)
+LIVE_RESCORE_TIMEFRAME = '15m'        # Tarama ile aynı zaman dilimi
+LIVE_EXIT_SCORE = None                # ör. 0: tüm indikatörler pozisyonun tersine dönünce kapat (None: sadece puanla)
+
 # ================== ML PRICE PREDICTION SETTINGS ==================
 # ML Model Configuration (Python 3.13 uyumlu)
 ML_ENABLED = True                       # ML tahmin modelini kullan
@@ -48,13 +72,19 @@ ML_SEQUENCE_LENGTH = 60                 # Girdi sekans uzunluğu (mum sayısı)
 ML_PREDICTION_STEPS = 3                 # Kaç adım öncesini tahmin et
 ML_PREDICTION_WEIGHT = 0.3              # ML tahmininin sinyal skorundaki ağırlığı
 ML_MIN_CONFIDENCE = 0.6                 # Minimum model güven skoru
-ML_RETRAIN_INTERVAL_HOURS = 24          # Model yeniden eğitim aralığı (saat)
+ML_RETRAIN_INTERVAL_HOURS = 24          # Model güncelleme aralığı (saat): update_models.py artımlı günceller, drift varsa tam eğitir
 
 # ML Integration with Trading
 ML_SIGNAL_THRESHOLD = 0.7               # Tahmin sinyali için minimum eşik
 ML_TREND_CONFIRMATION = True            # Trend onayı için ML kullan
 ML_PRICE_TARGET_WEIGHT = 0.4            # Take profit hesaplamada ML ağırlığı
 
+# ML Prediction Server (coin_prediction_model/model_server.py)
+ML_SERVER_URL = 'http://127.0.0.1:8765'  # Tahmin sunucusu adresi
+ML_PREDICTION_TIMEFRAME = '1h'          # Model mum aralığı: tahminler her mum kapanışında arka planda yenilenir
+ML_LATENCY_BUDGET_MS = 50               # Coin başına taze tahmin için en fazla bekleme (ms), aşılırsa ML atlanır
+ML_REQUEST_TIMEOUT = 10.0               # Toplu tahmin isteği zaman aşımı (saniye)
+
 # ================== LSTM PRICE PREDICTION SETTINGS ==================
 # LSTM Model Configuration (TensorFlow gerekli)
 LSTM_ENABLED = False                    # LSTM tahmin modelini kullan (TensorFlow gerekli)
@@ -105,11 +135,15 @@ BOLLINGER_SQUEEZE_THRESHOLD = 0.002  # Minimum squeeze percentage
 # ATR settings
 ATR_PERIOD = 14
 ATR_MULTIPLIER = 1.5  # For stop loss calculation
+ATR_SMOOTHING = 'sma'  # 'sma' or 'wilder' (exchange chart ATR)
 
 # Market structure settings
 MARKET_STRUCTURE_LOOKBACK = 20  # Candles to analyze market structure
 TREND_STRENGTH_THRESHOLD = 0.6  # Minimum trend strength to trade
 
+# Volume profile settings
+VOLUME_PROFILE_DISTRIBUTION = 'full'  # 'full' (tüm hacim her bine) or 'proportional' (mum aralığına oransal)
+
 # ================== MULTI-TIMEFRAME SETTINGS ==================
 # Additional timeframes for analysis
 MULTI_TIMEFRAMES = ['5m', '15m', '1h', '4h']
@@ -148,6 +182,14 @@ COOLDOWN_PERIOD = 300  # Seconds to wait before re-entering same coin
 # API rate limiting
 API_RATE_LIMIT = 1200  # Max requests per minute
 REQUEST_DELAY = 0.1    # Seconds between API calls
+# Weight limiti ve tarama / backfill payları: market_data/rate_limits.py (ikisi aynı limiti paylaşır)
+
+# Concurrent scanning
+CONCURRENT_SCAN = True  # Score coins in parallel with a thread pool
+SCAN_MAX_WORKERS = 8    # Maximum parallel scan workers
+
+# Local candle warehouse (market_data.CandleStore)
+MARKET_DATA_DIR = None  # e.g. '../data/candles': seed the candle cache from disk and persist closed candles
 
 # ================== PERFORMANCE TRACKING ==================
 # Statistics tracking
@@ -2,11 +2,30 @@ from .technical import (
     calculate_ema, 
     calculate_rsi, 
     calculate_atr,
+    true_range,
+    atr_values,
     calculate_macd,
     calculate_bollinger_bands
 )
 
 from .volume_profile import (
     calculate_volume_profile,
+    volume_profile_arrays,
+    poc_price,
+    rolling_poc_prices,
     find_poc_level
+)
+
+from .engine import (
+    IndicatorBundle,
+    compute_indicator_bundle
+)
+
+from .streaming import (
+    StreamingEMA,
+    StreamingRSI,
+    StreamingMACD,
+    StreamingBollinger,
+    StreamingATR,
+    LiveIndicators
 )
\ No newline at end of file
@@ -0,0 +1,134 @@
+import warnings
+import numpy as np
+import pandas as pd
+from indicators.technical import atr_values
+from indicators.volume_profile import poc_price
+
+# ================== NUMPY SERİ YARDIMCILARI ==================
+# Pandas rolling karşılıkları: pencere dolmadan veya pencerede NaN varken sonuç NaN
+
+def _windows(values, window):
+    return np.lib.stride_tricks.sliding_window_view(values, window)
+
+def rolling_mean(values, window):
+    """Rolling mean (NaN until the window is full)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = _windows(values, window).mean(axis=1)
+    return out
+
+def rolling_std(values, window):
+    """Rolling sample standard deviation (ddof=1)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = _windows(values, window).std(axis=1, ddof=1)
+    return out
+
+def rolling_max(values, window):
+    """Rolling maximum"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = _windows(values, window).max(axis=1)
+    return out
+
+def rolling_min(values, window):
+    """Rolling minimum"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = _windows(values, window).min(axis=1)
+    return out
+
+def ewm_mean(values, span):
+    """Exponential moving average (adjust=False)"""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+def nan_mean(values):
+    """Mean that skips NaN like pandas .mean(), NaN for an all-NaN slice"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(values) if len(values) else np.nan
+
+# ================== İNDİKATÖR PAKETİ ==================
+
+class IndicatorBundle:
+    """All indicator series the strategies need, computed once per frame as NumPy arrays"""
+
+    def __init__(self, close, high, low, volume):
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+
+        # RSI (basit hareketli ortalama)
+        self.rsi = None
+        # MACD
+        self.macd = None
+        self.macd_signal = None
+        # Bollinger Bands ve bant genişliği
+        self.bb_upper = None
+        self.bb_middle = None
+        self.bb_lower = None
+        self.bb_width = None
+        self.bb_width_avg = None
+        # Market yapısı
+        self.rolling_high = None
+        self.rolling_low = None
+        self.volume_ma = None
+        self.recent_high = None
+        self.recent_low = None
+        # Filtreler
+        self.atr = None
+        self.ma_200 = None
+        self.poc_price = None
+
+    def __len__(self):
+        return len(self.close)
+
+
+def compute_indicator_bundle(df, rsi_period=14, bb_window=20, bb_std=2, structure_window=20,
+                             macd_fast=12, macd_slow=26, macd_signal=9, volume_distribution='full'):
+    """Compute every series used by the four strategies in a single pass over the frame"""
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
+
+    bundle = IndicatorBundle(close, high, low, volume)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # RSI
+        delta = np.diff(close, prepend=np.nan)
+        avg_gain = rolling_mean(np.clip(delta, 0, None), rsi_period)
+        avg_loss = rolling_mean(-np.clip(delta, None, 0), rsi_period)
+        bundle.rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        # MACD
+        bundle.macd = ewm_mean(close, macd_fast) - ewm_mean(close, macd_slow)
+        bundle.macd_signal = ewm_mean(bundle.macd, macd_signal)
+
+        # Bollinger Bands
+        bundle.bb_middle = rolling_mean(close, bb_window)
+        std = rolling_std(close, bb_window)
+        bundle.bb_upper = bundle.bb_middle + std * bb_std
+        bundle.bb_lower = bundle.bb_middle - std * bb_std
+        bundle.bb_width = (bundle.bb_upper - bundle.bb_lower) / bundle.bb_middle
+        bundle.bb_width_avg = rolling_mean(bundle.bb_width, 50)
+
+    # Market yapısı
+    bundle.rolling_high = rolling_max(high, structure_window)
+    bundle.rolling_low = rolling_min(low, structure_window)
+    bundle.volume_ma = rolling_mean(volume, structure_window)
+    bundle.recent_high = high[-50:].max()
+    bundle.recent_low = low[-50:].min()
+
+    # Trend ve volatilite filtreleri
+    bundle.ma_200 = rolling_mean(close, 200)[-1] if len(close) >= 200 else close.mean()
+    if 'atr' in df:
+        bundle.atr = df['atr'].to_numpy(dtype=np.float64)
+    else:
+        bundle.atr = atr_values(high, low, close)
+
+    # Hacim profili POC seviyesi
+    bundle.poc_price = poc_price(low, high, volume, distribution=volume_distribution)
+
+    return bundle
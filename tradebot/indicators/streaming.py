@@ -0,0 +1,219 @@
+import math
+from collections import deque
+
+# Sabit zamanlı (O(1)) artımlı indikatörler.
+# update(..., closed=True)  : mum kapandı, durum kalıcı olarak güncellenir
+# update(..., closed=False) : açık mum fiyatı değişti, durum değişmeden geçici değer döner
+# Sonuçlar technical.py içindeki tam pencere hesaplarıyla aynıdır.
+
+
+class RollingWindow:
+    """Fixed-size window with running sum and sum of squares"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pushes = 0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        # Kayan nokta birikimini önlemek için toplamları ara ara yeniden hesapla
+        self.pushes += 1
+        if self.pushes % (self.size * 50) == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def is_full(self):
+        return len(self.values) == self.size
+
+    def mean_with(self, value=None):
+        """Window mean, optionally with `value` replacing the oldest element (not committed)"""
+        if value is None:
+            return self.total / self.size if self.is_full() else math.nan
+        if len(self.values) < self.size - 1:
+            return math.nan
+        total = self.total + value - (self.values[0] if self.is_full() else 0.0)
+        return total / self.size
+
+    def std_with(self, value=None):
+        """Sample standard deviation (ddof=1), optionally with a provisional value"""
+        if value is None:
+            if not self.is_full():
+                return math.nan
+            total, total_sq = self.total, self.total_sq
+        else:
+            if len(self.values) < self.size - 1:
+                return math.nan
+            old = self.values[0] if self.is_full() else 0.0
+            total = self.total + value - old
+            total_sq = self.total_sq + value * value - old * old
+        variance = (total_sq - total * total / self.size) / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class StreamingEMA:
+    """Exponential moving average (adjust=False)"""
+
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, price, closed=True):
+        if self.value is None:
+            value = price
+        else:
+            value = self.value + self.alpha * (price - self.value)
+        if closed:
+            self.value = value
+        return value
+
+
+class StreamingRSI:
+    """RSI with simple moving averages of gains and losses, like calculate_rsi"""
+
+    def __init__(self, period=14):
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.last_close = None
+
+    def update(self, close, closed=True):
+        if self.last_close is None:
+            if closed:
+                self.last_close = close
+            return math.nan
+
+        delta = close - self.last_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if closed:
+            self.gains.push(gain)
+            self.losses.push(loss)
+            self.last_close = close
+            avg_gain, avg_loss = self.gains.mean_with(), self.losses.mean_with()
+        else:
+            avg_gain, avg_loss = self.gains.mean_with(gain), self.losses.mean_with(loss)
+
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class StreamingMACD:
+    """MACD line and signal line"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, close, closed=True):
+        macd = self.fast.update(close, closed) - self.slow.update(close, closed)
+        return macd, self.signal.update(macd, closed)
+
+
+class StreamingBollinger:
+    """Bollinger Bands over a rolling window (sample std)"""
+
+    def __init__(self, window=20, std_dev=2):
+        self.window = RollingWindow(window)
+        self.std_dev = std_dev
+
+    def update(self, close, closed=True):
+        if closed:
+            self.window.push(close)
+            middle, std = self.window.mean_with(), self.window.std_with()
+        else:
+            middle, std = self.window.mean_with(close), self.window.std_with(close)
+        return middle + std * self.std_dev, middle, middle - std * self.std_dev
+
+
+class StreamingATR:
+    """ATR with 'sma' or 'wilder' smoothing, like atr_values"""
+
+    def __init__(self, period=14, smoothing='sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown ATR smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.true_ranges = RollingWindow(period)
+        self.previous_close = None
+        self.value = None  # Wilder durumu
+
+    def _true_range(self, high, low):
+        if self.previous_close is None:
+            return high - low
+        return max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+
+    def update(self, high, low, close, closed=True):
+        tr = self._true_range(high, low)
+
+        if self.smoothing == 'sma':
+            if closed:
+                self.true_ranges.push(tr)
+                atr = self.true_ranges.mean_with()
+            else:
+                atr = self.true_ranges.mean_with(tr)
+        else:
+            if self.value is not None:
+                atr = self.value + (tr - self.value) / self.period
+            elif closed:
+                # Wilder başlangıcı: ilk `period` TR'nin basit ortalaması
+                self.true_ranges.push(tr)
+                atr = self.true_ranges.mean_with()
+            else:
+                atr = self.true_ranges.mean_with(tr)
+            if closed and not math.isnan(atr):
+                self.value = atr
+
+        if closed:
+            self.previous_close = close
+        return atr
+
+
+class LiveIndicators:
+    """Per-symbol set of streaming indicators seeded from closed candle history"""
+
+    def __init__(self, rsi_period=14, bb_window=20, bb_std=2, atr_period=14, atr_smoothing='sma'):
+        self.ema_short = StreamingEMA(9)
+        self.ema_long = StreamingEMA(21)
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD()
+        self.bollinger = StreamingBollinger(bb_window, bb_std)
+        self.atr = StreamingATR(atr_period, atr_smoothing)
+        self.last_values = {}
+
+    def update(self, high, low, close, closed=True):
+        """Feed a closed candle or an open candle tick, returns the latest indicator values"""
+        macd, signal = self.macd.update(close, closed)
+        upper, middle, lower = self.bollinger.update(close, closed)
+        self.last_values = {
+            'close': close,
+            'short_ema': self.ema_short.update(close, closed),
+            'long_ema': self.ema_long.update(close, closed),
+            'rsi': self.rsi.update(close, closed),
+            'macd': macd,
+            'macd_signal': signal,
+            'bb_upper': upper,
+            'bb_middle': middle,
+            'bb_lower': lower,
+            'atr': self.atr.update(high, low, close, closed)
+        }
+        return self.last_values
+
+    @classmethod
+    def from_dataframe(cls, df, **kwargs):
+        """Seed from an OHLCV frame of closed candles"""
+        indicators = cls(**kwargs)
+        for high, low, close in zip(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()):
+            indicators.update(float(high), float(low), float(close))
+        return indicators
@@ -20,17 +20,45 @@ def calculate_rsi(df, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
-def calculate_atr(df, period=14):
-    """Calculate Average True Range (ATR)"""
-    df['previous_close'] = df['close'].shift(1)
-    df['tr'] = df[['high', 'low', 'previous_close']].apply(
-        lambda row: max(
-            row['high'] - row['low'],
-            abs(row['high'] - row['previous_close']),
-            abs(row['low'] - row['previous_close'])
-        ), axis=1
-    )
-    df['atr'] = df['tr'].rolling(window=period).mean()
+def true_range(high, low, close):
+    """Vectorized True Range over NumPy arrays (first candle uses high - low)"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    
+    previous_close = np.empty_like(close)
+    previous_close[:1] = np.nan
+    previous_close[1:] = close[:-1]
+    
+    # fmax NaN değerleri yok sayar, ilk mumda sonuç high - low olur
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+def atr_values(high, low, close, period=14, smoothing='sma'):
+    """ATR as a NumPy array
+    
+    smoothing='sma'    : simple moving average of TR (bot default)
+    smoothing='wilder' : Wilder's RMA seeded with the first SMA, as shown on exchange charts
+    """
+    tr = true_range(high, low, close)
+    atr = np.full(len(tr), np.nan)
+    if len(tr) < period:
+        return atr
+    
+    if smoothing == 'wilder':
+        seeded = tr[period - 1:].copy()
+        seeded[0] = tr[:period].mean()
+        atr[period - 1:] = pd.Series(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    elif smoothing == 'sma':
+        atr[period - 1:] = np.lib.stride_tricks.sliding_window_view(tr, period).mean(axis=1)
+    else:
+        raise ValueError(f"Unknown ATR smoothing: {smoothing}")
+    
+    return atr
+
+def calculate_atr(df, period=14, smoothing='sma'):
+    """Calculate Average True Range (ATR) into df['atr'] without helper columns"""
+    df['atr'] = atr_values(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                           period, smoothing)
     return df
 
 def calculate_macd(df, fast=12, slow=26, signal=9):
@@ -1,25 +1,143 @@
 import numpy as np
 import pandas as pd
 
-def calculate_volume_profile(df, bins=50):
+# Oransal dağıtımda bellek kullanımını sınırlamak için mum parçası boyutu
+PROFILE_CHUNK_SIZE = 4096
+
+def volume_profile_arrays(low, high, volume, bins=50, distribution='full'):
+    """Volume profile as NumPy arrays: (bin center prices, bin volumes)
+    
+    distribution='full'         : each candle adds its whole volume to every bin its range touches
+    distribution='proportional' : each candle's volume is spread over its range by overlap length
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    
+    edges = np.linspace(low.min(), high.max(), bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    
+    if distribution == 'full':
+        # Bin i ile kesişim: low <= edges[i+1] ve high >= edges[i]
+        first_bin = np.searchsorted(edges[1:], low, side='left')
+        last_bin = np.searchsorted(edges[:-1], high, side='right') - 1
+        valid = first_bin <= last_bin
+        
+        # Fark dizisi: aralığın başına hacim ekle, sonundan çıkar
+        diff = np.zeros(bins)
+        np.add.at(diff, first_bin[valid], volume[valid])
+        np.add.at(diff, last_bin[valid] + 1, -volume[valid])
+        volumes = np.cumsum(diff[:-1])
+    
+    elif distribution == 'proportional':
+        # Kümülatif hacim: her kenarın altında kalan hacim (mum içinde düzgün dağılım)
+        cumulative = np.zeros(bins)
+        for start in range(0, len(low), PROFILE_CHUNK_SIZE):
+            chunk_low = low[start:start + PROFILE_CHUNK_SIZE]
+            chunk_range = high[start:start + PROFILE_CHUNK_SIZE] - chunk_low
+            with np.errstate(divide='ignore', invalid='ignore'):
+                share = np.clip((edges[:, None] - chunk_low) / chunk_range, 0, 1)
+            
+            # Aralığı sıfır olan mumlar tek bir fiyat noktasıdır
+            point = chunk_range <= 0
+            share[:, point] = edges[:, None] > chunk_low[point]
+            cumulative += share @ volume[start:start + PROFILE_CHUNK_SIZE]
+        
+        cumulative[-1] = volume.sum()
+        volumes = np.diff(cumulative)
+    
+    else:
+        raise ValueError(f"Unknown volume distribution: {distribution}")
+    
+    return centers, volumes
+
+def calculate_volume_profile(df, bins=50, distribution='full'):
     """Calculate volume profile for given data"""
-    price_range = np.linspace(df['low'].min(), df['high'].max(), bins)
-    volume_profile = []
-    
-    for i in range(len(price_range) - 1):
-        mask = (df['low'] <= price_range[i+1]) & (df['high'] >= price_range[i])
-        volume_in_range = df.loc[mask, 'volume'].sum()
-        volume_profile.append({
-            'price': (price_range[i] + price_range[i+1]) / 2,
-            'volume': volume_in_range
-        })
-    
-    return pd.DataFrame(volume_profile)
+    prices, volumes = volume_profile_arrays(df['low'].to_numpy(), df['high'].to_numpy(),
+                                            df['volume'].to_numpy(), bins, distribution)
+    return pd.DataFrame({'price': prices, 'volume': volumes})
+
+def poc_price(low, high, volume, lookback=50, bins=50, distribution='full'):
+    """Point of Control price from the last `lookback` candles (NumPy arrays)"""
+    prices, volumes = volume_profile_arrays(low[-lookback:], high[-lookback:], volume[-lookback:],
+                                            bins, distribution)
+    return prices[np.argmax(volumes)]
 
-def find_poc_level(df, lookback=50):
+def find_poc_level(df, lookback=50, distribution='full'):
     """Find Point of Control (POC) level"""
-    recent_data = df.tail(lookback)
-    volume_profile = calculate_volume_profile(recent_data)
-    poc_index = volume_profile['volume'].idxmax()
-    poc_price = volume_profile.loc[poc_index, 'price']
-    return poc_price
+    return poc_price(df['low'].to_numpy(), df['high'].to_numpy(), df['volume'].to_numpy(),
+                     lookback, distribution=distribution)
+
+def _count_edges_below(edges, values, inclusive):
+    """Per window count of edges < value (or <= value) for evenly spaced edges, exact like searchsorted"""
+    bins = edges.shape[1]
+    step = (edges[:, -1] - edges[:, 0]) / max(bins - 1, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = np.floor((values - edges[:, :1]) / step[:, None]) + 1
+    count = np.clip(np.nan_to_num(guess, nan=bins), 0, bins).astype(np.int64)
+    
+    below = np.less_equal if inclusive else np.less
+    # Kayan nokta tahminini gerçek kenarlarla düzelt
+    for _ in range(2):
+        up = (count < bins) & below(np.take_along_axis(edges, np.minimum(count, bins - 1), axis=1), values)
+        count += up
+        down = (count > 0) & ~below(np.take_along_axis(edges, np.maximum(count - 1, 0), axis=1), values)
+        count -= down
+    return count
+
+def rolling_poc_prices(low, high, volume, lookback=50, bins=50, distribution='full', chunk_size=512):
+    """POC price of the trailing `lookback` candles at every candle, same result as poc_price per window
+    
+    NaN until the first full window. Windows are processed in chunks as (windows, candles, bins) arrays.
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    
+    out = np.full(len(low), np.nan)
+    if len(low) < lookback:
+        return out
+    
+    low_windows = np.lib.stride_tricks.sliding_window_view(low, lookback)
+    high_windows = np.lib.stride_tricks.sliding_window_view(high, lookback)
+    volume_windows = np.lib.stride_tricks.sliding_window_view(volume, lookback)
+    
+    for start in range(0, len(low_windows), chunk_size):
+        lw = low_windows[start:start + chunk_size]
+        hw = high_windows[start:start + chunk_size]
+        vw = volume_windows[start:start + chunk_size]
+        rows = np.arange(len(lw))
+        
+        edges = np.linspace(lw.min(axis=1), hw.max(axis=1), bins, axis=1)
+        centers = (edges[:, :-1] + edges[:, 1:]) / 2
+        
+        if distribution == 'full':
+            # searchsorted karşılığı: her mumun kesiştiği ilk ve son bin
+            first_bin = _count_edges_below(edges, lw, inclusive=False) - (edges[:, :1] < lw)
+            last_bin = _count_edges_below(edges[:, :-1], hw, inclusive=True) - 1
+            valid = first_bin <= last_bin
+            window_index = np.broadcast_to(rows[:, None], lw.shape)[valid]
+            
+            # Fark dizisi: önce tüm eklemeler, sonra tüm çıkarmalar (poc_price ile aynı sıra)
+            flat_index = np.concatenate([window_index * bins + first_bin[valid],
+                                         window_index * bins + last_bin[valid] + 1])
+            weights = np.concatenate([vw[valid], -vw[valid]])
+            diff = np.bincount(flat_index, weights, minlength=len(lw) * bins).reshape(len(lw), bins)
+            volumes = np.cumsum(diff[:, :-1], axis=1)
+        
+        elif distribution == 'proportional':
+            candle_range = hw - lw
+            with np.errstate(divide='ignore', invalid='ignore'):
+                share = np.clip((edges[:, :, None] - lw[:, None, :]) / candle_range[:, None, :], 0, 1)
+            share = np.where((candle_range <= 0)[:, None, :], edges[:, :, None] > lw[:, None, :], share)
+            
+            cumulative = np.einsum('wec,wc->we', share, vw)
+            cumulative[:, -1] = vw.sum(axis=1)
+            volumes = np.diff(cumulative, axis=1)
+        
+        else:
+            raise ValueError(f"Unknown volume distribution: {distribution}")
+        
+        out[start + lookback - 1:start + lookback - 1 + len(lw)] = centers[rows, np.argmax(volumes, axis=1)]
+    
+    return out
\ No newline at end of file
@@ -1,11 +1,14 @@
 # === main.py ===
+import os
 import sys
 import locale
 import time
+import threading
 import ccxt
 import pandas as pd
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 
 if sys.platform.startswith('win'):
@@ -17,9 +20,13 @@ if sys.platform.startswith('win'):
         except:
             pass
 
+# market_data paketi depo kökünde
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Local imports
 from config import *
 from indicators.technical import calculate_atr
+from indicators.engine import compute_indicator_bundle
 from strategies import (
     calculate_market_structure_score,
     calculate_rsi_divergence_score,
@@ -30,10 +37,29 @@ from utils import (
     setup_logging,
     log_trade_action,
     check_position_pnl,
+    pnl_to_price,
+    dynamic_risk_levels,
+    create_trailing_stop,
+    advance_trailing_stop,
+    trailing_stop_hit,
     determine_position_size,
     calculate_position_amount
 )
 from utils.coin_manager import load_coins_from_json
+from utils.rate_limiter import api_weight_limiter, count_request
+from utils.candle_cache import candle_cache
+from utils.price_feed import PriceFeed
+from utils.exit_engine import ExitEngine
+from utils.live_indicators import LiveIndicatorTracker, live_position_score
+from utils.ml_signals import MLPredictionCache, request_predictions, ml_signal_score, blend_ml_score
+from utils.protection_orders import (
+    STOP_LOSS,
+    place_protection_orders,
+    create_trigger_order,
+    cancel_order_safe,
+    cancel_protection_orders,
+    fetch_open_position_sides
+)
 
 # Setup logging
 setup_logging(DEBUG_MODE)
@@ -41,7 +67,12 @@ logger = logging.getLogger(__name__)
 
 # Global variables
 exchange = None  # Global exchange değişkeni
+price_feed = None  # Websocket fiyat akışı (PRICE_FEED_ENABLED)
+exit_engine = None  # Tick bazlı çıkış motoru (EXIT_ENGINE_ENABLED)
+live_indicators = None  # Pozisyonların tick bazlı indikatörleri (LIVE_RESCORE_ENABLED)
+ml_predictions = None  # Arka planda yenilenen ML tahminleri (ML_ENABLED)
 positions = {}
+positions_lock = threading.RLock()  # positions/trailing_stops çıkış motoru thread'i ile paylaşılır
 trailing_stops = {}
 recently_closed = {}
 ACCOUNT_BALANCE = 0
@@ -61,6 +92,7 @@ def set_leverage_for_all_coins(coin_list):
         try:
             symbol = coin  # coin is already in format like "BTC/USDT"
             # Set leverage for this symbol
+            count_request('set_leverage')
             exchange.set_leverage(LEVERAGE, symbol)
             successful += 1
             logger.debug(f"Leverage set to {LEVERAGE}x for {symbol}")
@@ -88,9 +120,11 @@ def initialize_exchange():
                 'adjustForTimeDifference': True,  # Otomatik zaman ayarı
             }
         })
+        count_request('load_markets')
         exchange.load_markets()
         
         # Test için balance çek
+        count_request('fetch_balance')
         test_balance = exchange.fetch_balance()
         logger.info("API connection successful")
         
@@ -122,9 +156,109 @@ def send_telegram(message):
     except Exception as e:
         logger.error(f"Telegram error: {str(e)}")
 
+def get_current_price(symbol):
+    """Latest price from the websocket price table, REST ticker as fallback"""
+    if price_feed is not None:
+        price = price_feed.get_price(symbol)
+        if price is not None:
+            return price
+    count_request('fetch_ticker')
+    return exchange.fetch_ticker(symbol)['last']
+
+def attach_candle_store():
+    """Seed the candle cache from / persist closed candles to the local warehouse"""
+    if not MARKET_DATA_DIR:
+        return
+    try:
+        from market_data import CandleStore
+        candle_cache.attach_store(CandleStore(MARKET_DATA_DIR))
+        logger.info(f"Candle store attached: {MARKET_DATA_DIR}")
+    except Exception as e:
+        logger.error(f"Could not attach candle store: {e}")
+
+def start_ml_predictions(coin_list):
+    """Start the background ML prediction cache for the coin list"""
+    global ml_predictions
+    
+    if not ML_ENABLED:
+        return
+    
+    ml_predictions = MLPredictionCache(
+        lambda symbols: request_predictions(ML_SERVER_URL, symbols, ML_REQUEST_TIMEOUT),
+        timeframe_ms=exchange.parse_timeframe(ML_PREDICTION_TIMEFRAME) * 1000
+    )
+    ml_predictions.track(coin_list)
+    ml_predictions.start()
+
+def start_price_feed():
+    """Start the websocket price feed for open positions"""
+    global price_feed
+    
+    if not PRICE_FEED_ENABLED:
+        return None
+    
+    feed = PriceFeed(PRICE_FEED_STREAM, max_age=PRICE_FEED_MAX_AGE)
+    if not feed.start():
+        return None
+    
+    price_feed = feed
+    price_feed.watch(list(positions))
+    return price_feed
+
+def fetch_last_prices(symbols):
+    """Last prices for several symbols in one REST call (exit engine fallback poller)"""
+    if exchange.has.get('fetchLastPrices'):
+        # /fapi/v1/ticker/price: tüm semboller için ağırlık 2
+        count_request('fetch_last_prices')
+        prices = exchange.fetch_last_prices()
+        by_symbol = {key.split(':')[0]: value['price'] for key, value in prices.items()}
+        return {symbol: by_symbol[symbol] for symbol in symbols if by_symbol.get(symbol) is not None}
+    count_request('fetch_ticker', len(symbols))
+    return {symbol: exchange.fetch_ticker(symbol)['last'] for symbol in symbols}
+
+def start_live_indicators():
+    """Track streaming indicators of open positions for live re-scoring"""
+    global live_indicators
+    
+    if not LIVE_RESCORE_ENABLED:
+        return None
+    
+    live_indicators = LiveIndicatorTracker(
+        lambda symbol: candle_cache.get_candles(exchange, symbol, LIVE_RESCORE_TIMEFRAME, 100),
+        exchange.parse_timeframe(LIVE_RESCORE_TIMEFRAME) * 1000,
+        rsi_period=RSI_PERIOD,
+        bb_window=BOLLINGER_PERIOD,
+        bb_std=BOLLINGER_STD,
+        atr_period=ATR_PERIOD,
+        atr_smoothing=ATR_SMOOTHING
+    )
+    for symbol in list(positions):
+        live_indicators.seed(symbol)
+    return live_indicators
+
+def start_exit_engine():
+    """Start the exit engine on price feed ticks with a REST poller as fallback"""
+    global exit_engine
+    
+    if not EXIT_ENGINE_ENABLED:
+        return None
+    
+    exit_engine = ExitEngine(
+        evaluate_position_exit,
+        lambda: list(positions),
+        fetch_last_prices,
+        poll_interval=EXIT_ENGINE_POLL_INTERVAL,
+        report_interval=EXIT_LATENCY_REPORT_INTERVAL
+    )
+    if price_feed is not None:
+        price_feed.add_listener(exit_engine.on_tick)
+    exit_engine.start()
+    return exit_engine
+
 def check_position_mode():
     """Check current position mode on Binance Futures"""
     try:
+        count_request('position_side_dual')
         response = exchange.fapiPrivateGetPositionSideDual()
         dual_side_position = response['dualSidePosition']
         
@@ -142,6 +276,7 @@ def load_balance():
     global ACCOUNT_BALANCE
     try:
         # Balance bilgisini çek
+        count_request('fetch_balance')
         balance_info = exchange.fetch_balance()
         
         # Debug için balance_info'yu logla
@@ -195,19 +330,19 @@ def check_position_value(symbol, amount, price):
         return False
 
 def get_ohlcv_data(symbol, timeframe='15m', limit=100):
-    """Fetch OHLCV data for a symbol"""
+    """Fetch OHLCV data for a symbol (served from the incremental candle cache)"""
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-        if not ohlcv or len(ohlcv) < limit:
-            logger.warning(f"Incomplete OHLCV data for {symbol}: got {len(ohlcv)} candles, expected {limit}")
-            if not ohlcv:
+        ohlcv = candle_cache.get_candles(exchange, symbol, timeframe, limit)
+        if ohlcv is None or len(ohlcv) < limit:
+            logger.warning(f"Incomplete OHLCV data for {symbol}: got {0 if ohlcv is None else len(ohlcv)} candles, expected {limit}")
+            if ohlcv is None:
                 return None
                 
         df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         
         # Add technical indicators
-        df = calculate_atr(df)
+        df = calculate_atr(df, ATR_PERIOD, ATR_SMOOTHING)
         
         return df
     except Exception as e:
@@ -217,17 +352,20 @@ def get_ohlcv_data(symbol, timeframe='15m', limit=100):
 def calculate_total_signal_score(df, symbol):
     """Calculate total signal score based on all strategies"""
     try:
+        # Tüm indikatörler tek geçişte hesaplanır ve stratejilere paylaştırılır
+        bundle = compute_indicator_bundle(df, volume_distribution=VOLUME_PROFILE_DISTRIBUTION)
+        
         # 1. Market Structure Score
-        market_score, trend_direction = calculate_market_structure_score(df)
+        market_score, trend_direction = calculate_market_structure_score(df, bundle)
         
         # 2. RSI Divergence Score  
-        rsi_score, current_rsi, divergence_type = calculate_rsi_divergence_score(df)
+        rsi_score, current_rsi, divergence_type = calculate_rsi_divergence_score(df, bundle)
         
         # 3. Bollinger Bands Score
-        bollinger_score, squeeze_detected, band_touch = calculate_bollinger_score(df)
+        bollinger_score, squeeze_detected, band_touch = calculate_bollinger_score(df, bundle)
         
         # 4. Multi-Timeframe Score
-        mtf_score, trend_alignment, all_aligned = calculate_multi_timeframe_score(exchange, symbol)
+        mtf_score, trend_alignment, all_aligned = calculate_multi_timeframe_score(exchange, symbol, df)
         
         # Calculate total score
         total_score = market_score + rsi_score + bollinger_score + mtf_score
@@ -242,15 +380,15 @@ def calculate_total_signal_score(df, symbol):
             penalty += 0.3
             
         # Trend filter (200 MA)
-        ma_200 = df['close'].rolling(window=200).mean().iloc[-1] if len(df) >= 200 else df['close'].mean()
-        current_price = df['close'].iloc[-1]
+        ma_200 = bundle.ma_200
+        current_price = bundle.close[-1]
         
         if (trend_direction == 'long' and current_price < ma_200) or \
            (trend_direction == 'short' and current_price > ma_200):
             penalty += 0.5
             
         # Volatility filter
-        atr = df['atr'].iloc[-1]
+        atr = bundle.atr[-1]
         atr_percent = (atr / current_price) * 100
         
         if atr_percent < 0.5:  # Very low volatility
@@ -259,6 +397,11 @@ def calculate_total_signal_score(df, symbol):
         # Apply penalty
         final_score = total_score * (1 - penalty)
         
+        # ML tahmini: önbellekten okunur, gecikme bütçesi aşılırsa atlanır
+        if ml_predictions is not None:
+            prediction = ml_predictions.get(symbol, ML_LATENCY_BUDGET_MS / 1000)
+            final_score = blend_ml_score(final_score, ml_signal_score(prediction, trend_direction))
+        
         # Only log if signal is strong enough to potentially trade
         if final_score >= WEAK_SIGNAL_THRESHOLD:
             logger.info(f"Signal Alert: {symbol} - Score: {final_score:.1f}/100 - Trend: {trend_direction}")
@@ -283,24 +426,8 @@ def get_signal_strength(score):
 def calculate_dynamic_risk_levels(symbol, signal_score, current_price, atr):
     """Calculate dynamic stop loss and take profit levels based on signal strength and ATR"""
     try:
-        # ATR bazlı dinamik risk yönetimi
-        if signal_score >= 90:
-            sl_multiplier = 10
-            tp_multiplier = 30
-        elif signal_score >= 70:
-            sl_multiplier = 15
-            tp_multiplier = 25
-        else:  # 50-69 puan
-            sl_multiplier = 20
-            tp_multiplier = 15
-        
-        # Stop loss ve take profit seviyeleri
-        stop_loss_distance = atr * sl_multiplier
-        take_profit_distance = atr * tp_multiplier
-        
-        # Yüzde olarak hesapla
-        stop_loss_percent = (stop_loss_distance / current_price) * 100
-        take_profit_percent = (take_profit_distance / current_price) * 100
+        # ATR bazlı dinamik risk yönetimi (DYNAMIC_RISK_MULTIPLIERS)
+        stop_loss_percent, take_profit_percent = dynamic_risk_levels(signal_score, current_price, atr)
         
         logger.info(f"Dynamic Risk Levels for {symbol} (Score: {signal_score:.1f})")
         logger.info(f"ATR: {atr:.6f} | Current Price: {current_price:.6f}")
@@ -352,8 +479,7 @@ def place_order(symbol, order_type, signal_score):
             return False
             
         # Get current price
-        ticker = exchange.fetch_ticker(symbol)
-        current_price = ticker['last']
+        current_price = get_current_price(symbol)
         
         # Get OHLCV data for ATR
         df = get_ohlcv_data(symbol)
@@ -396,6 +522,7 @@ def place_order(symbol, order_type, signal_score):
         position_side = 'LONG' if order_type == 'long' else 'SHORT'
         params['positionSide'] = position_side
         
+        count_request('create_order')
         order = exchange.create_market_order(
             symbol=symbol,
             side=side,
@@ -404,19 +531,31 @@ def place_order(symbol, order_type, signal_score):
         )
         
         # Save position info with dynamic risk levels
-        positions[symbol] = {
-            'type': order_type,
-            'entry_price': current_price,
-            'amount': amount,
-            'signal_score': signal_score,
-            'open_time': datetime.now().isoformat(),
-            'stop_loss_percent': stop_loss_percent,
-            'take_profit_percent': take_profit_percent,
-            'atr': current_atr
-        }
+        with positions_lock:
+            positions[symbol] = {
+                'type': order_type,
+                'entry_price': current_price,
+                'amount': amount,
+                'signal_score': signal_score,
+                'open_time': datetime.now().isoformat(),
+                'stop_loss_percent': stop_loss_percent,
+                'take_profit_percent': take_profit_percent,
+                'atr': current_atr
+            }
+            
+            # Setup trailing stop
+            setup_trailing_stop(symbol, order_type, current_price)
         
-        # Setup trailing stop
-        setup_trailing_stop(symbol, order_type, current_price)
+        # Borsa tarafı stop loss / take profit emirleri
+        if EXCHANGE_PROTECTION_ORDERS:
+            place_position_protection(symbol, order_type, amount, current_price, stop_loss_percent, take_profit_percent)
+        
+        # Pozisyon fiyatını websocket üzerinden takip et
+        if price_feed is not None:
+            price_feed.watch([symbol])
+        # Canlı indikatörler arka planda kurulur, çıkış motoru hazır durumu kullanır
+        if live_indicators is not None:
+            live_indicators.seed(symbol)
         
         # Log and notify
         log_trade_action("OPEN POSITION", symbol, {
@@ -452,25 +591,163 @@ def place_order(symbol, order_type, signal_score):
         logger.error(traceback.format_exc())
         return False
 
+def place_position_protection(symbol, position_type, amount, entry_price, stop_loss_percent, take_profit_percent):
+    """Place exchange-side stop loss, take profit and optional trailing stop orders for a new position"""
+    trailing = None
+    if EXCHANGE_TRAILING_STOP:
+        # Kaldıraçlı PnL yüzdeleri fiyat yüzdesine çevrilir
+        trailing = (
+            pnl_to_price(entry_price, TRAILING_STOP_ACTIVATION, position_type, LEVERAGE),
+            TRAILING_STOP_DISTANCE / LEVERAGE
+        )
+    
+    orders = place_protection_orders(
+        exchange, symbol, position_type, amount,
+        pnl_to_price(entry_price, -stop_loss_percent, position_type, LEVERAGE),
+        pnl_to_price(entry_price, take_profit_percent, position_type, LEVERAGE),
+        trailing,
+        PROTECTION_WORKING_TYPE
+    )
+    with positions_lock:
+        pos_info = positions.get(symbol)
+        registered = pos_info is not None and not pos_info.get('closing')
+        if registered:
+            pos_info['protection_orders'] = orders
+    
+    if not registered:
+        # Pozisyon emirler gönderilirken kapandı
+        cancel_protection_orders(exchange, symbol, orders)
+        return {}
+    return orders
+
+def amend_protective_stop(symbol, position_type, stop_price):
+    """Move the exchange stop loss order to a new trailing stop level
+
+    The new stop is placed before the old one is canceled, so the position is never
+    unprotected. Order ids are read and registered under positions_lock: if the position
+    was removed or started closing meanwhile, the new stop is canceled right away.
+    """
+    with positions_lock:
+        pos_info = positions.get(symbol)
+        if not pos_info or pos_info.get('closing') or 'protection_orders' not in pos_info:
+            return None
+        amount = pos_info['amount']
+        old_order_id = pos_info['protection_orders'].get(STOP_LOSS)
+    
+    try:
+        new_order_id = create_trigger_order(
+            exchange, symbol, position_type, amount, stop_price, 'STOP_MARKET', PROTECTION_WORKING_TYPE
+        )
+    except Exception as e:
+        # Eski stop emri iptal edilmedi, pozisyon korunmaya devam eder
+        logger.error(f"Could not move exchange stop loss for {symbol}: {e}")
+        return None
+    
+    with positions_lock:
+        registered = positions.get(symbol) is pos_info and not pos_info.get('closing')
+        if registered:
+            pos_info['protection_orders'][STOP_LOSS] = new_order_id
+    
+    if not registered:
+        # Pozisyon bu arada kapandı: yeni stop borsada sahipsiz kalmasın
+        cancel_order_safe(exchange, symbol, new_order_id)
+        return None
+    
+    if old_order_id is not None:
+        cancel_order_safe(exchange, symbol, old_order_id)
+    logger.info(f"Exchange stop loss moved for {symbol} | Stop: {stop_price}")
+    return new_order_id
+
+def protection_order_snapshot(pos_info):
+    """Copy of a position's protection order ids, taken under positions_lock
+
+    amend_protective_stop registers new stop ids under the same lock and only while the
+    position is still open and not closing, so a snapshot taken after the position was
+    removed or marked closing contains every order that still has to be canceled.
+    """
+    with positions_lock:
+        return dict(pos_info.get('protection_orders') or {})
+
+def sync_exchange_positions():
+    """Remove positions that were closed on the exchange by a protection order"""
+    if not positions:
+        return
+    
+    try:
+        open_sides = fetch_open_position_sides(exchange, list(positions))
+    except Exception as e:
+        logger.warning(f"Could not fetch positions from exchange: {e}")
+        return
+    
+    for symbol, pos_info in list(positions.items()):
+        if pos_info['type'] in open_sides.get(symbol, ()):
+            continue
+        
+        with positions_lock:
+            # Çıkış motoru kapatıyorsa temizliği close_position yapar
+            if pos_info.get('closing') or positions.pop(symbol, None) is None:
+                continue
+            trailing_stops.pop(symbol, None)
+        
+        finish_exchange_close(symbol, pos_info)
+
+def finish_exchange_close(symbol, pos_info):
+    """Clean up a position that was already removed because it closed on the exchange"""
+    # Kalan koruma emirlerini (ör. stop dolduysa take profit) iptal et
+    cancel_protection_orders(exchange, symbol, protection_order_snapshot(pos_info))
+    if price_feed is not None:
+        price_feed.unwatch([symbol])
+    if live_indicators is not None:
+        live_indicators.discard(symbol)
+    recently_closed[symbol] = time.time()
+    
+    log_trade_action("POSITION CLOSED ON EXCHANGE", symbol, {
+        "Type": pos_info['type'].upper(),
+        "Entry Price": pos_info['entry_price'],
+        "Amount": pos_info['amount']
+    })
+    send_telegram(
+        f"🛡 <b>POZİSYON BORSADA KAPANDI</b>\n\n"
+        f"🪙 <b>Coin:</b> {symbol}\n"
+        f"📊 <b>Tip:</b> {pos_info['type'].upper()}\n"
+        f"💰 <b>Giriş:</b> {pos_info['entry_price']}"
+    )
+
+def reconcile_failed_close(symbol, pos_info):
+    """Check the exchange after a failed closing order
+
+    A protection order (or a manual close) may have filled first, in which case the
+    position is cleaned up right away; otherwise the exit is retried after EXIT_RETRY_DELAY.
+    """
+    try:
+        still_open = pos_info['type'] in fetch_open_position_sides(exchange, [symbol]).get(symbol, ())
+    except Exception as e:
+        logger.warning(f"Could not fetch position for {symbol} from exchange: {e}")
+        still_open = True
+    
+    with positions_lock:
+        if still_open:
+            pos_info['closing'] = False
+            pos_info['exit_retry_at'] = time.time() + EXIT_RETRY_DELAY
+            logger.warning(f"Position {symbol} is still open, retrying exit in {EXIT_RETRY_DELAY:.0f}s")
+            return
+        if positions.get(symbol) is not pos_info:
+            return
+        positions.pop(symbol)
+        trailing_stops.pop(symbol, None)
+    
+    finish_exchange_close(symbol, pos_info)
+
 def setup_trailing_stop(symbol, position_type, entry_price):
     """Setup trailing stop for position"""
     global trailing_stops
     
-    trailing_stops[symbol] = {
-        "entry_price": float(entry_price),
-        "activation_percent": TRAILING_STOP_ACTIVATION,
-        "step_percent": TRAILING_STOP_STEP,      # Her adımda artış miktarı
-        "highest_pnl": 0,
-        "trailing_distance": TRAILING_STOP_DISTANCE,
-        "is_active": False,
-        "stop_level": None,
-        "last_upgrade_level": 0      # Son stop yükseltme seviyesi
-    }
+    trailing_stops[symbol] = create_trailing_stop(entry_price)
     
     logger.info(f"Trailing stop set for {symbol} ({position_type.upper()}) | Activation: {TRAILING_STOP_ACTIVATION}%")
 
 def update_trailing_stop(symbol, position_type, current_pnl):
-    """Update trailing stop level"""
+    """Update trailing stop level (moving the exchange stop order is left to the caller)"""
     global trailing_stops
     
     if symbol not in trailing_stops:
@@ -478,77 +755,38 @@ def update_trailing_stop(symbol, position_type, current_pnl):
     
     ts = trailing_stops[symbol]
     
-    # Check if trailing stop should be activated
-    if not ts["is_active"]:
-        if current_pnl >= ts["activation_percent"]:
-            ts["is_active"] = True
-            current_price = exchange.fetch_ticker(symbol)['last']
-            
-            # İlk etkinleşmede, stop seviyesini giriş seviyesine çek (break-even)
-            if position_type.lower() == "long":
-                ts["stop_level"] = ts["entry_price"]
-            else:  # short
-                ts["stop_level"] = ts["entry_price"]
-                
-            logger.info(f"Trailing stop activated for {symbol} | PnL: {current_pnl:.2f}% | Stop: Break-even")
-    
-    # Actif olduğunda, her %5 artış için stopu yükselt
-    elif ts["is_active"]:
-        # Upgrade seviyelerini kontrol et (8, 13, 18, 23, ...)
-        current_upgrade_level = int((current_pnl - ts["activation_percent"]) / ts["step_percent"])
-        
-        if current_upgrade_level > ts["last_upgrade_level"]:
-            ts["last_upgrade_level"] = current_upgrade_level
-            current_price = exchange.fetch_ticker(symbol)['last']
-            
-            # Yeni stop seviyesi = giriş fiyatı + (upgrade level * step percent)
-            new_stop_percent = current_upgrade_level * ts["step_percent"]
-            
-            if position_type.lower() == "long":
-                # Long pozisyonlarda, giriş fiyatından new_stop_percent kadar yukarı
-                price_change = ts["entry_price"] * (new_stop_percent / 100)
-                new_stop = ts["entry_price"] + price_change
-                ts["stop_level"] = new_stop
-                
-                logger.info(f"Trailing stop upgraded for {symbol} | New Stop: +{new_stop_percent:.1f}% | PnL: {current_pnl:.2f}%")
-            else:  # short
-                # Short pozisyonlarda, giriş fiyatından new_stop_percent kadar aşağı
-                price_change = ts["entry_price"] * (new_stop_percent / 100)
-                new_stop = ts["entry_price"] - price_change
-                ts["stop_level"] = new_stop
-                
-                logger.info(f"Trailing stop upgraded for {symbol} | New Stop: -{new_stop_percent:.1f}% | PnL: {current_pnl:.2f}%")
+    event = advance_trailing_stop(ts, position_type, current_pnl)
+    if event == 'activated':
+        logger.info(f"Trailing stop activated for {symbol} | PnL: {current_pnl:.2f}% | Stop: Break-even")
+    elif event == 'upgraded':
+        new_stop_percent = ts["last_upgrade_level"] * ts["step_percent"]
+        sign = '+' if position_type.lower() == "long" else '-'
+        logger.info(f"Trailing stop upgraded for {symbol} | New Stop: {sign}{new_stop_percent:.1f}% | PnL: {current_pnl:.2f}%")
     
     return ts["stop_level"]
 
-def check_trailing_stop_hit(symbol, position_type):
+def check_trailing_stop_hit(symbol, position_type, current_price=None):
     """Check if trailing stop is hit"""
     if symbol not in trailing_stops or not trailing_stops[symbol]["is_active"]:
         return False
     
     ts = trailing_stops[symbol]
-    current_price = exchange.fetch_ticker(symbol)['last']
+    if current_price is None:
+        current_price = get_current_price(symbol)
     
+    if not trailing_stop_hit(ts, position_type, current_price):
+        return False
+    
+    # Stop seviyesi için ham kâr hesapla
+    entry_price = ts["entry_price"]
     if position_type.lower() == "long":
-        if current_price <= ts["stop_level"]:
-            # Stop seviyesi için ham kâr hesapla
-            entry_price = ts["entry_price"]
-            stop_pnl = ((ts["stop_level"] - entry_price) / entry_price) * 100
-            
-            logger.info(f"Trailing stop hit! {symbol} ({position_type.upper()}) | "
-                        f"Price: {current_price} | Stop: {ts['stop_level']} | Locked PnL: {stop_pnl:.2f}%")
-            return True
+        stop_pnl = ((ts["stop_level"] - entry_price) / entry_price) * 100
     else:  # short
-        if current_price >= ts["stop_level"]:
-            # Stop seviyesi için ham kâr hesapla
-            entry_price = ts["entry_price"]
-            stop_pnl = ((entry_price - ts["stop_level"]) / entry_price) * 100
-            
-            logger.info(f"Trailing stop hit! {symbol} ({position_type.upper()}) | "
-                        f"Price: {current_price} | Stop: {ts['stop_level']} | Locked PnL: {stop_pnl:.2f}%")
-            return True
+        stop_pnl = ((entry_price - ts["stop_level"]) / entry_price) * 100
     
-    return False
+    logger.info(f"Trailing stop hit! {symbol} ({position_type.upper()}) | "
+                f"Price: {current_price} | Stop: {ts['stop_level']} | Locked PnL: {stop_pnl:.2f}%")
+    return True
 
 def check_daily_pnl_limit():
     """Check if daily balance increase limit is reached"""
@@ -618,8 +856,8 @@ def check_midnight_reset():
         return True
     return False
 
-def close_position(symbol, position_type):
-    """Close an open position"""
+def close_position(symbol, position_type, tick_time=None):
+    """Close an open position (tick_time: monotonic time of the price tick that triggered the exit)"""
     global current_balance, initial_daily_balance
     
     try:
@@ -638,6 +876,7 @@ def close_position(symbol, position_type):
             
         }
         
+        count_request('create_order')
         order = exchange.create_market_order(
             symbol=symbol,
             side=side,
@@ -645,8 +884,18 @@ def close_position(symbol, position_type):
             params=params
         )
         
+        # Tick -> emir gecikmesi
+        if tick_time is not None:
+            order_latency_ms = (time.monotonic() - tick_time) * 1000
+            logger.info(f"Exit order sent for {symbol} {order_latency_ms:.1f}ms after price tick")
+            if exit_engine is not None:
+                exit_engine.record_order_latency(order_latency_ms)
+        
+        # Borsadaki koruma emirlerini iptal et
+        cancel_protection_orders(exchange, symbol, protection_order_snapshot(pos_info))
+        
         # Get current price
-        current_price = exchange.fetch_ticker(symbol)['last']
+        current_price = get_current_price(symbol)
         
         # Calculate final PnL
         entry_price = pos_info['entry_price']
@@ -663,9 +912,13 @@ def close_position(symbol, position_type):
             daily_balance_change = 0
         
         # Remove from positions
-        del positions[symbol]
-        if symbol in trailing_stops:
-            del trailing_stops[symbol]
+        with positions_lock:
+            positions.pop(symbol, None)
+            trailing_stops.pop(symbol, None)
+        if price_feed is not None:
+            price_feed.unwatch([symbol])
+        if live_indicators is not None:
+            live_indicators.discard(symbol)
             
         # Add to recently closed
         recently_closed[symbol] = time.time()
@@ -709,44 +962,111 @@ def close_position(symbol, position_type):
         logger.error(traceback.format_exc())
         return False
 
-def check_existing_positions():
-    """Check and manage existing positions"""
-    for symbol, pos_info in list(positions.items()):
-        try:
-            position_type = pos_info['type']
-            entry_price = pos_info['entry_price']
-            current_price = exchange.fetch_ticker(symbol)['last']
+def evaluate_position_exit(symbol, current_price, tick_time=None):
+    """Check trailing stop, take profit, stop loss and the live score of one position at the given price"""
+    # İlk tick'te mum önbelleğinden doldurulur (istek kilit dışında yapılır)
+    live_values = None
+    if live_indicators is not None and symbol in positions:
+        live_values = live_indicators.update(symbol, current_price)
+    
+    # Kilit yalnızca karar için tutulur; emir, iptal, bakiye ve Telegram çağrıları kilit dışında
+    exit_reason = None
+    amended_stop = None
+    with positions_lock:
+        pos_info = positions.get(symbol)
+        if not pos_info or pos_info.get('closing'):
+            return False  # Pozisyon kapatıldı veya kapatılıyor
+        if time.time() < pos_info.get('exit_retry_at', 0):
+            return False  # Başarısız kapanıştan sonra bekleniyor
+        
+        position_type = pos_info['type']
+        entry_price = pos_info['entry_price']
+        
+        # Calculate PnL
+        pnl = check_position_pnl(symbol, position_type, entry_price, current_price, LEVERAGE)
+        
+        # Live re-score
+        if live_values is not None:
+            pos_info['live_score'] = live_position_score(live_values, position_type)
+        live_score = pos_info.get('live_score')
+        
+        stop_loss_percent = pos_info.get('stop_loss_percent', STOP_LOSS_PERCENT)
+        take_profit_percent = pos_info.get('take_profit_percent', TAKE_PROFIT_PERCENT)
+
+        # Update trailing stop
+        previous_stop = trailing_stops[symbol]["stop_level"] if symbol in trailing_stops else None
+        stop_level = update_trailing_stop(symbol, position_type, pnl)
+        if EXCHANGE_PROTECTION_ORDERS and stop_level != previous_stop:
+            amended_stop = stop_level
+        
+        if check_trailing_stop_hit(symbol, position_type, current_price):
+            logger.info(f"Closing position due to trailing stop: {symbol}")
+            exit_reason = 'trailing_stop'
             
-            # Calculate PnL
-            pnl = check_position_pnl(symbol, position_type, entry_price, current_price, LEVERAGE)
+        # Check dynamic take profit
+        elif pnl >= take_profit_percent:
+            logger.info(f"Dynamic take profit hit: {symbol} ({pnl:.2f}% >= {take_profit_percent:.2f}%)")
+            exit_reason = 'take_profit'
             
-            stop_loss_percent = pos_info.get('stop_loss_percent', STOP_LOSS_PERCENT)
-            take_profit_percent = pos_info.get('take_profit_percent', TAKE_PROFIT_PERCENT)
+        # Check dynamic stop loss
+        elif pnl <= -stop_loss_percent:
+            logger.info(f"Dynamic stop loss hit: {symbol} ({pnl:.2f}% <= -{stop_loss_percent:.2f}%)")
+            exit_reason = 'stop_loss'
+        
+        # Indicators turned against the position
+        elif LIVE_EXIT_SCORE is not None and live_score is not None and live_score <= LIVE_EXIT_SCORE:
+            logger.info(f"Live score exit: {symbol} (score {live_score:.0f} <= {LIVE_EXIT_SCORE})")
+            exit_reason = 'live_score'
+        
+        # İkinci bir tick aynı pozisyonu tekrar kapatmaya çalışmaz
+        if exit_reason is not None:
+            pos_info['closing'] = True
+    
+    if exit_reason is None:
+        # Borsadaki stop emrini yeni seviyeye taşı
+        if amended_stop is not None:
+            amend_protective_stop(symbol, position_type, amended_stop)
+        return False
+    
+    if close_position(symbol, position_type, tick_time):
+        return True
+    reconcile_failed_close(symbol, pos_info)
+    return False
 
-            # Update trailing stop
-            update_trailing_stop(symbol, position_type, pnl)
-            
-            if check_trailing_stop_hit(symbol, position_type):
-                logger.info(f"Closing position due to trailing stop: {symbol}")
-                close_position(symbol, position_type)
-                continue
-                
-            # Check dynamic take profit
-            if pnl >= take_profit_percent:
-                logger.info(f"Dynamic take profit hit: {symbol} ({pnl:.2f}% >= {take_profit_percent:.2f}%)")
-                close_position(symbol, position_type)
-                continue
-                
-            # Check dynamic stop loss
-            if pnl <= -stop_loss_percent:
-                logger.info(f"Dynamic stop loss hit: {symbol} ({pnl:.2f}% <= -{stop_loss_percent:.2f}%)")
-                close_position(symbol, position_type)
-                continue
-                
+def check_existing_positions():
+    """Check and manage existing positions"""
+    for symbol in list(positions):
+        try:
+            evaluate_position_exit(symbol, get_current_price(symbol))
         except Exception as e:
             logger.error(f"Error checking position for {symbol}: {e}")
             logger.error(traceback.format_exc())
 
+def evaluate_coin(coin):
+    """Fetch data and score a single coin (safe to run in a worker thread)"""
+    try:
+        # Get OHLCV data
+        df = get_ohlcv_data(coin)
+        if df is None or len(df) < 100:
+            return 0, None
+            
+        # Calculate signal score (only logs strong signals)
+        return calculate_total_signal_score(df, coin)
+        
+    except Exception as e:
+        logger.error(f"Error scanning {coin}: {e}")
+        logger.error(traceback.format_exc())
+        return 0, None
+
+def score_coins(coins):
+    """Score coins serially or with a bounded thread pool, preserving coin order"""
+    if not CONCURRENT_SCAN or len(coins) < 2:
+        return [evaluate_coin(coin) for coin in coins]
+    
+    # Ağ beklemesi paralel geçer; istek ağırlığı api_weight_limiter ile sınırlanır
+    with ThreadPoolExecutor(max_workers=min(SCAN_MAX_WORKERS, len(coins)), thread_name_prefix="scan") as pool:
+        return list(pool.map(evaluate_coin, coins))
+
 def scan_for_signals(coin_list):
     """Scan all coins for trading signals"""
     global daily_limit_notified, initial_daily_balance, current_balance
@@ -759,27 +1079,48 @@ def scan_for_signals(coin_list):
             daily_limit_notified = True
         return
     
-    for coin in coin_list:
+    cycle_start = time.time()
+    
+    # Skip if recently closed or already in position
+    coins = [
+        coin for coin in coin_list
+        if not (coin in positions or (coin in recently_closed and time.time() - recently_closed[coin] < 300))
+    ]
+    
+    results = score_coins(coins)
+    scoring_time = time.time() - cycle_start
+    
+    # Emirler sırayla ve coin listesi sırasında verilir
+    signal_count = 0
+    for coin, (score, trend_direction) in zip(coins, results):
         try:
-            # Skip if recently closed or already in position
-            if coin in positions or (coin in recently_closed and time.time() - recently_closed[coin] < 300):
-                continue
-                
-            # Get OHLCV data
-            df = get_ohlcv_data(coin)
-            if df is None or len(df) < 100:
-                continue
-                
-            # Calculate signal score (only logs strong signals)
-            score, trend_direction = calculate_total_signal_score(df, coin)
-            
             # Place order if signal is strong enough
             if score >= WEAK_SIGNAL_THRESHOLD and trend_direction:
+                signal_count += 1
                 place_order(coin, trend_direction, score)
                 
         except Exception as e:
-            logger.error(f"Error scanning {coin}: {e}")
+            logger.error(f"Error placing order for {coin}: {e}")
             logger.error(traceback.format_exc())
+    
+    cycle_time = time.time() - cycle_start
+    workers = min(SCAN_MAX_WORKERS, len(coins)) if CONCURRENT_SCAN else 1
+    cache_stats = candle_cache.stats()
+    logger.info(f"Scan cycle: {len(coins)} coins scored in {scoring_time:.2f}s "
+                f"({workers} workers, {api_weight_limiter.current_weight()} weight/min) | "
+                f"Signals: {signal_count} | Total: {cycle_time:.2f}s")
+    logger.debug(f"Candle cache: {cache_stats['symbols']} series | "
+                 f"Full fetches: {cache_stats['full_fetches']} | Incremental: {cache_stats['incremental_fetches']} | "
+                 f"No request: {cache_stats['cache_hits']}")
+    if ml_predictions is not None:
+        ml_stats = ml_predictions.stats()
+        logger.debug(f"ML predictions: {ml_stats['symbols']} symbols | Hits: {ml_stats['hits']} | "
+                     f"Over budget: {ml_stats['misses']} | Refreshes: {ml_stats['refreshes']} | "
+                     f"Server: {'up' if ml_stats['available'] else 'down'}")
+    
+    if cycle_time > SCAN_INTERVAL:
+        logger.warning(f"Scan cycle took {cycle_time:.1f}s, longer than SCAN_INTERVAL ({SCAN_INTERVAL}s). "
+                       f"Reduce the coin list or raise SCAN_MAX_WORKERS.")
 
 def main():
     """Main trading loop"""
@@ -815,6 +1156,15 @@ def main():
     # Set leverage for all coins
     set_leverage_for_all_coins(coin_list)
     
+    # Kayıtlı mumları yükle, kapanan mumları diske yaz
+    attach_candle_store()
+    
+    # Websocket fiyat akışını, pozisyon indikatörlerini ve çıkış motorunu başlat
+    start_price_feed()
+    start_live_indicators()
+    start_exit_engine()
+    start_ml_predictions(coin_list)
+    
     # Send start message - ACCOUNT_BALANCE global değişkenini kullan
     send_telegram(
         f"🚀 <b>Trading Bot Started</b>\n\n"
@@ -830,8 +1180,12 @@ def main():
             # Gece yarısı kontrolü
             reset_daily_balance()
             
-            # Check existing positions  
-            if positions:
+            # Borsada koruma emriyle kapanan pozisyonları temizle
+            if EXCHANGE_PROTECTION_ORDERS:
+                sync_exchange_positions()
+            
+            # Check existing positions (çıkış motoru kapalıysa)
+            if positions and exit_engine is None:
                 check_existing_positions()
             
             # Scan for new signals (günlük limit kontrolü içinde)
@@ -842,6 +1196,12 @@ def main():
             
         except KeyboardInterrupt:
             logger.warning("Bot stopped by user")
+            if exit_engine is not None:
+                exit_engine.stop()
+            if price_feed is not None:
+                price_feed.stop()
+            if ml_predictions is not None:
+                ml_predictions.stop()
             break
             
         except Exception as e:
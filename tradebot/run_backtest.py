@@ -0,0 +1,76 @@
+"""
+Backtest: kayıtlı OHLCV verisi üzerinde sinyal skoru + dinamik risk + trailing stop simülasyonu
+
+Kullanım (tradebot klasöründen):
+    python run_backtest.py --data-dir data/ --timeframe 15m --workers 8 --trades trades.csv
+
+Veri: data-dir içinde her coin için BTCUSDT_15m.csv (timestamp,open,high,low,close,volume; ms)
+"""
+import argparse
+import os
+import sys
+import csv
+import logging
+import time
+
+# market_data paketi depo kökünde
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import COIN_LIST_FILE
+from utils.coin_manager import load_coins_from_json
+from backtest import BacktestParams, load_coin_candles, load_store_candles, compute_all_signals, run_backtest
+
+logger = logging.getLogger(__name__)
+
+
+def write_trades(path, trades):
+    """Write closed trades to a CSV file"""
+    if not trades:
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(trades[0]))
+        writer.writeheader()
+        writer.writerows(trades)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tradebot backtest")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help="OHLCV CSV klasörü")
+    source.add_argument('--store-dir', help="market_data.CandleStore klasörü (ör. ../data/candles)")
+    parser.add_argument('--coins', default=COIN_LIST_FILE, help="Coin listesi (JSON)")
+    parser.add_argument('--timeframe', default='15m', help="Ana zaman dilimi (canlı bot: 15m)")
+    parser.add_argument('--balance', type=float, default=100.0, help="Başlangıç bakiyesi (USDT)")
+    parser.add_argument('--workers', type=int, default=None, help="Skor hesabı için süreç sayısı")
+    parser.add_argument('--trades', default=None, help="İşlemlerin yazılacağı CSV dosyası")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
+
+    coins = load_coins_from_json(args.coins) or []
+    started = time.time()
+    if args.store_dir:
+        candles = load_store_candles(args.store_dir, coins, args.timeframe)
+    else:
+        candles = load_coin_candles(args.data_dir, coins, args.timeframe)
+    total_candles = sum(len(c) for c in candles.values())
+    logger.info(f"Loaded {len(candles)} coins, {total_candles} candles in {time.time() - started:.1f}s")
+
+    started = time.time()
+    signals = compute_all_signals(candles, args.timeframe, args.workers)
+    logger.info(f"Scored {total_candles} candles in {time.time() - started:.1f}s")
+
+    started = time.time()
+    result = run_backtest(signals, BacktestParams(initial_balance=args.balance))
+    logger.info(f"Simulated {len(result.trades)} trades in {time.time() - started:.1f}s")
+
+    for name, value in result.summary().items():
+        logger.info(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+
+    if args.trades:
+        write_trades(args.trades, result.trades)
+        logger.info(f"Trades written to {args.trades}")
+
+
+if __name__ == "__main__":
+    main()
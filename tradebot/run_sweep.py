@@ -0,0 +1,88 @@
+"""
+Parametre taraması: sinyal eşikleri, dinamik risk çarpanları ve trailing stop ayarları
+
+Skorlar bir kez hesaplanır, her parametre seti paylaşılan bellek üzerindeki dizilerle
+ayrı bir süreçte backtest edilir. Sonuçlar PnL / drawdown oranına göre sıralanır (zarar eden
+setlerde PnL x drawdown: küçük zarar ve sığ drawdown önde).
+
+Kullanım (tradebot klasöründen):
+    python run_sweep.py --data-dir data/ --timeframe 15m --grid grid.json --output sweep_results.csv
+
+grid.json: {"strong_threshold": [80, 85, 90], "trailing_activation": [6, 8, 10], ...}
+(anahtarlar BacktestParams alanlarıdır, risk_multipliers için [[skor, sl, tp], ...] tabloları listesi)
+"""
+import argparse
+import os
+import sys
+import json
+import logging
+import time
+
+# market_data paketi depo kökünde
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import COIN_LIST_FILE
+from utils.coin_manager import load_coins_from_json
+from utils.risk_management import DYNAMIC_RISK_MULTIPLIERS
+from backtest import load_coin_candles, load_store_candles, compute_all_signals
+from backtest.sweep import run_sweep, write_sweep_results
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {
+    'weak_threshold': [60.0, 65.0, 70.0],
+    'strong_threshold': [80.0, 85.0, 90.0],
+    'risk_multipliers': [
+        DYNAMIC_RISK_MULTIPLIERS,
+        [(min_score, sl * 0.75, tp) for min_score, sl, tp in DYNAMIC_RISK_MULTIPLIERS],
+        [(min_score, sl, tp * 1.5) for min_score, sl, tp in DYNAMIC_RISK_MULTIPLIERS]
+    ],
+    'trailing_activation': [6.0, 8.0, 10.0],
+    'trailing_step': [3.0, 5.0]
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tradebot parameter sweep")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help="OHLCV CSV klasörü")
+    source.add_argument('--store-dir', help="market_data.CandleStore klasörü (ör. ../data/candles)")
+    parser.add_argument('--coins', default=COIN_LIST_FILE, help="Coin listesi (JSON)")
+    parser.add_argument('--timeframe', default='15m', help="Ana zaman dilimi (canlı bot: 15m)")
+    parser.add_argument('--grid', default=None, help="Parametre ızgarası (JSON), verilmezse DEFAULT_GRID")
+    parser.add_argument('--balance', type=float, default=100.0, help="Başlangıç bakiyesi (USDT)")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı")
+    parser.add_argument('--output', default='sweep_results.csv', help="Sıralı sonuç tablosu (CSV)")
+    parser.add_argument('--top', type=int, default=10, help="Loglanacak en iyi sonuç sayısı")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    coins = load_coins_from_json(args.coins) or []
+    started = time.time()
+    if args.store_dir:
+        candles = load_store_candles(args.store_dir, coins, args.timeframe)
+    else:
+        candles = load_coin_candles(args.data_dir, coins, args.timeframe)
+    signals = compute_all_signals(candles, args.timeframe, args.workers)
+    logger.info(f"Loaded and scored {len(signals)} coins in {time.time() - started:.1f}s")
+
+    started = time.time()
+    rows = run_sweep(signals, grid, {'initial_balance': args.balance}, args.workers)
+    logger.info(f"Sweep finished in {time.time() - started:.1f}s")
+
+    write_sweep_results(args.output, rows)
+    logger.info(f"Results written to {args.output}")
+    for rank, row in enumerate(rows[:args.top], 1):
+        params = ', '.join(f"{name}={row[name]}" for name in grid)
+        logger.info(f"#{rank} PnL/DD: {row['pnl_drawdown']:.2f} | Return: {row['return_percent']:.2f}% | "
+                    f"Max DD: {row['max_drawdown_percent']:.2f}% | Trades: {row['trades']} | {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,21 @@
 import logging
-from indicators.technical import calculate_bollinger_bands
-from indicators.volume_profile import find_poc_level
+from indicators.engine import compute_indicator_bundle
 
 logger = logging.getLogger(__name__)
 
-def calculate_bollinger_score(df):
+def calculate_bollinger_score(df, bundle=None):
     """Bollinger Band Sıkışma puanlaması (20 puan)"""
+    if bundle is None:
+        bundle = compute_indicator_bundle(df)
+    
     score = 0
     
-    # Bollinger Bands hesaplama
-    upper_band, middle_band, lower_band = calculate_bollinger_bands(df)
+    # Bollinger Bands (paketten)
+    upper_band, lower_band = bundle.bb_upper, bundle.bb_lower
     
     # Band sıkışması tespiti (10 puan)
-    current_width = (upper_band.iloc[-1] - lower_band.iloc[-1]) / middle_band.iloc[-1]
-    avg_width = ((upper_band - lower_band) / middle_band).rolling(window=50).mean().iloc[-1]
+    current_width = bundle.bb_width[-1]
+    avg_width = bundle.bb_width_avg[-1]
     
     squeeze_detected = False
     if current_width < avg_width * 0.7:  # %30 daha dar
@@ -21,18 +23,18 @@ def calculate_bollinger_score(df):
         squeeze_detected = True
     
     # Fiyatın banda dokunması (5 puan)
-    current_price = df['close'].iloc[-1]
+    current_price = bundle.close[-1]
     band_touch = None
     
-    if abs(current_price - lower_band.iloc[-1]) < current_price * 0.001:  # Alt banda değiyor
+    if abs(current_price - lower_band[-1]) < current_price * 0.001:  # Alt banda değiyor
         score += 5
         band_touch = 'lower'
-    elif abs(current_price - upper_band.iloc[-1]) < current_price * 0.001:  # Üst banda değiyor
+    elif abs(current_price - upper_band[-1]) < current_price * 0.001:  # Üst banda değiyor
         score += 5
         band_touch = 'upper'
     
     # Hacim profili POC seviyesi teyidi (5 puan)
-    poc_price = find_poc_level(df)
+    poc_price = bundle.poc_price
     
     if abs(current_price - poc_price) / current_price < 0.01:  # POC'a %1 yakın
         score += 5
@@ -1,35 +1,38 @@
 import logging
-from indicators.technical import calculate_atr
+from indicators.engine import compute_indicator_bundle
 
 logger = logging.getLogger(__name__)
 
-def calculate_market_structure_score(df):
+def calculate_market_structure_score(df, bundle=None):
     """Market yapısı ve hacim puanlaması (30 puan)"""
+    if bundle is None:
+        bundle = compute_indicator_bundle(df)
+    
     score = 0
     
     # Higher High/Lower Low trend tespiti (15 puan)
-    highs = df['high'].rolling(window=20).max()
-    lows = df['low'].rolling(window=20).min()
+    highs = bundle.rolling_high
+    lows = bundle.rolling_low
     
     trend_direction = None
-    if df['high'].iloc[-1] > highs.iloc[-2]:  # Higher High
+    if bundle.high[-1] > highs[-2]:  # Higher High
         trend_direction = 'long'
         score += 15
-    elif df['low'].iloc[-1] < lows.iloc[-2]:  # Lower Low
+    elif bundle.low[-1] < lows[-2]:  # Lower Low
         trend_direction = 'short'
         score += 15
     
     # Hacim artışı teyidi (10 puan)
-    avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-    current_volume = df['volume'].iloc[-1]
+    avg_volume = bundle.volume_ma[-1]
+    current_volume = bundle.volume[-1]
     
     if current_volume > avg_volume * 1.5:
         score += 10
     
     # Destek/direnç seviyesine yakınlık (5 puan)
-    recent_highs = df['high'].tail(50).max()
-    recent_lows = df['low'].tail(50).min()
-    current_price = df['close'].iloc[-1]
+    recent_highs = bundle.recent_high
+    recent_lows = bundle.recent_low
+    current_price = bundle.close[-1]
     
     if abs(current_price - recent_lows) / current_price < 0.02:  # %2 yakınlıkta
         score += 5
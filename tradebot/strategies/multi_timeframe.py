@@ -1,34 +1,60 @@
 import logging
-import pandas as pd
+import numpy as np
+from utils.candle_cache import candle_cache
 
 logger = logging.getLogger(__name__)
 
-def calculate_multi_timeframe_score(exchange, symbol):
-    """Çoklu Zaman Dilimi Teyit puanlaması (25 puan)"""
+MTF_CANDLE_LIMIT = 50
+MTF_MA_WINDOW = 20
+
+def _is_above_ma(closes, window=MTF_MA_WINDOW):
+    """Son kapanış fiyatı 20 periyotluk ortalamanın üzerinde mi?"""
+    if len(closes) < window:
+        return False
+    return bool(closes[-1] > closes[-window:].mean())
+
+def _higher_timeframe_closes(exchange, symbol, timeframe, current_price):
+    """Üst zaman dilimi kapanışları; istek sadece mum kapandığında atılır"""
+    candles = candle_cache.get_candles(exchange, symbol, timeframe, MTF_CANDLE_LIMIT, refresh_on_close=True)
+    if candles is None:
+        return np.array([])
+    
+    closes = candles[:, 4].copy()
+    # Açık mumun kapanışı güncel fiyattır
+    if current_price is not None:
+        closes[-1] = current_price
+    return closes
+
+def calculate_multi_timeframe_score(exchange, symbol, df=None):
+    """Çoklu Zaman Dilimi Teyit puanlaması (25 puan)
+    
+    df: 15 dakikalık ana veri (verilmezse önbellekten alınır)
+    """
     score = 0
     
     trend_alignment = {}
     
     # 15 dakikalık trend uyumu (5 puan)
-    df_15m = pd.DataFrame(exchange.fetch_ohlcv(symbol, timeframe='15m', limit=50),
-                          columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    trend_15m = df_15m['close'].iloc[-1] > df_15m['close'].rolling(window=20).mean().iloc[-1]
+    if df is not None:
+        closes_15m = df['close'].to_numpy(dtype=np.float64)[-MTF_CANDLE_LIMIT:]
+    else:
+        candles = candle_cache.get_candles(exchange, symbol, '15m', MTF_CANDLE_LIMIT)
+        closes_15m = candles[:, 4] if candles is not None else np.array([])
+    
+    current_price = closes_15m[-1] if len(closes_15m) else None
+    trend_15m = _is_above_ma(closes_15m)
     trend_alignment['15m'] = trend_15m
     if trend_15m:
         score += 5
     
     # 1 saatlik trend uyumu (10 puan)
-    df_1h = pd.DataFrame(exchange.fetch_ohlcv(symbol, timeframe='1h', limit=50),
-                         columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    trend_1h = df_1h['close'].iloc[-1] > df_1h['close'].rolling(window=20).mean().iloc[-1]
+    trend_1h = _is_above_ma(_higher_timeframe_closes(exchange, symbol, '1h', current_price))
     trend_alignment['1h'] = trend_1h
     if trend_1h:
         score += 10
     
     # 4 saatlik trend uyumu (10 puan)
-    df_4h = pd.DataFrame(exchange.fetch_ohlcv(symbol, timeframe='4h', limit=50),
-                         columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    trend_4h = df_4h['close'].iloc[-1] > df_4h['close'].rolling(window=20).mean().iloc[-1]
+    trend_4h = _is_above_ma(_higher_timeframe_closes(exchange, symbol, '4h', current_price))
     trend_alignment['4h'] = trend_4h
     if trend_4h:
         score += 10
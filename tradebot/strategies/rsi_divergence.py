@@ -1,18 +1,22 @@
 import logging
-from indicators.technical import calculate_rsi, calculate_macd
+from indicators.engine import compute_indicator_bundle, nan_mean
 
 logger = logging.getLogger(__name__)
 
-def calculate_rsi_divergence_score(df):
+def calculate_rsi_divergence_score(df, bundle=None):
     """RSI Divergence puanlaması (25 puan)"""
+    if bundle is None:
+        bundle = compute_indicator_bundle(df)
+    
     score = 0
     
-    # RSI hesaplama
-    rsi = calculate_rsi(df)
+    # RSI (paketten)
+    rsi = bundle.rsi
+    close = bundle.close
     
     # Güçlü RSI uyumsuzluğu tespiti (15 puan)
-    price_trend = df['close'].iloc[-10:].mean() > df['close'].iloc[-20:-10].mean()
-    rsi_trend = rsi.iloc[-10:].mean() > rsi.iloc[-20:-10].mean()
+    price_trend = nan_mean(close[-10:]) > nan_mean(close[-20:-10])
+    rsi_trend = nan_mean(rsi[-10:]) > nan_mean(rsi[-20:-10])
     
     divergence_type = None
     if price_trend != rsi_trend:  # Divergence var
@@ -20,15 +24,15 @@ def calculate_rsi_divergence_score(df):
         divergence_type = 'bullish' if not price_trend and rsi_trend else 'bearish'
     
     # MACD momentum teyidi (5 puan)
-    macd, signal = calculate_macd(df)
+    macd, signal = bundle.macd, bundle.macd_signal
     
-    if macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]:  # MACD yukarı kesiş
+    if macd[-1] > signal[-1] and macd[-2] <= signal[-2]:  # MACD yukarı kesiş
         score += 5
-    elif macd.iloc[-1] < signal.iloc[-1] and macd.iloc[-2] >= signal.iloc[-2]:  # MACD aşağı kesiş
+    elif macd[-1] < signal[-1] and macd[-2] >= signal[-2]:  # MACD aşağı kesiş
         score += 5
     
     # RSI aşırı alım/satım bölgesi (5 puan)
-    current_rsi = rsi.iloc[-1]
+    current_rsi = rsi[-1]
     if current_rsi < 30 or current_rsi > 70:
         score += 5
     
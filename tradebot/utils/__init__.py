@@ -1,3 +1,12 @@
-from .risk_management import calculate_stop_loss, calculate_take_profit, check_position_pnl
+from .risk_management import (
+    calculate_stop_loss,
+    calculate_take_profit,
+    check_position_pnl,
+    pnl_to_price,
+    dynamic_risk_levels,
+    create_trailing_stop,
+    advance_trailing_stop,
+    trailing_stop_hit
+)
 from .position_sizing import determine_position_size, calculate_position_amount
 from .logging_helper import setup_logging, log_trade_action
\ No newline at end of file
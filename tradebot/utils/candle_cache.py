@@ -0,0 +1,151 @@
+import logging
+import threading
+import numpy as np
+from utils.rate_limiter import api_weight_limiter, kline_request_weight
+
+logger = logging.getLogger(__name__)
+
+# Artımlı isteğin mum limiti bunu aşmazsa ağırlık 1 olur (kline_request_weight: limit < 100)
+INCREMENTAL_FETCH_LIMIT = 99
+
+
+class CandleCache:
+    """Rolling OHLCV store per (symbol, timeframe) that only fetches new candles
+
+    With a market_data CandleStore attached, cold starts are seeded from disk and
+    newly closed candles are persisted, so a restart only fetches what it missed.
+    """
+
+    def __init__(self, store=None):
+        self.candles = {}  # (symbol, timeframe) -> np.ndarray (n, 6)
+        self.max_rows = {}  # (symbol, timeframe) -> en büyük istenen limit
+        self.store = store
+        self.persisted = {}  # (symbol, timeframe) -> diske yazılmış son kapanmış mum zamanı
+        self.lock = threading.Lock()
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.cache_hits = 0
+
+    def _fetch(self, exchange, symbol, timeframe, limit, since=None):
+        api_weight_limiter.acquire(kline_request_weight(limit))
+        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        if not ohlcv:
+            return None
+        return np.asarray(ohlcv, dtype=np.float64)
+
+    def attach_store(self, store):
+        """Seed cold starts from / persist closed candles to a CandleStore (None disables)"""
+        self.store = store
+
+    def _load_from_store(self, key, rows):
+        """Newest stored closed candles for a key not cached yet, None if the store has none"""
+        try:
+            candles = np.array(self.store.load(*key, limit=rows))
+        except Exception as e:
+            logger.warning(f"Candle store read failed for {key[0]} {key[1]}: {e}")
+            return None
+        if len(candles) == 0:
+            return None
+        with self.lock:
+            self.persisted[key] = int(candles[-1, 0])
+        return candles
+
+    def _persist(self, key, candles, timeframe_ms, now):
+        """Write candles closed since the last write to the store"""
+        with self.lock:
+            persisted = self.persisted.get(key)
+        closed = candles[candles[:, 0] + timeframe_ms <= now]
+        if persisted is not None:
+            closed = closed[closed[:, 0] > persisted]
+        if len(closed) == 0:
+            return
+        try:
+            self.store.write(*key, closed)
+        except Exception as e:
+            logger.warning(f"Candle store write failed for {key[0]} {key[1]}: {e}")
+            return
+        with self.lock:
+            self.persisted[key] = int(closed[-1, 0])
+
+    def get_candles(self, exchange, symbol, timeframe='15m', limit=100, refresh_on_close=False):
+        """Return the latest `limit` candles as an (n, 6) array, fetching only what changed
+
+        With refresh_on_close=True no request is made until the cached open
+        candle has closed, so the last row may hold a stale close price.
+        """
+        key = (symbol, timeframe)
+        with self.lock:
+            cached = self.candles.get(key)
+            max_rows = max(limit, self.max_rows.get(key, 0))
+            self.max_rows[key] = max_rows
+
+        timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+        now = exchange.milliseconds()
+
+        if cached is None and self.store is not None:
+            cached = self._load_from_store(key, max_rows)
+
+        if refresh_on_close and cached is not None and len(cached) >= limit and now < cached[-1, 0] + timeframe_ms:
+            with self.lock:
+                self.cache_hits += 1
+            return cached[-limit:]
+
+        # Son kayıtlı mum (açık mum olabilir) dahil eksik mum sayısı, istekte bir mum pay bırakılır
+        fetch_limit = None
+        if cached is not None and len(cached) >= limit:
+            fetch_limit = int((now - cached[-1, 0]) // timeframe_ms) + 2
+
+        if fetch_limit is None or fetch_limit > INCREMENTAL_FETCH_LIMIT:
+            candles = self._fetch(exchange, symbol, timeframe, max_rows)
+            if candles is None:
+                return None
+            incremental = False
+        else:
+            new_rows = self._fetch(exchange, symbol, timeframe, fetch_limit, since=int(cached[-1, 0]))
+            incremental = True
+            if new_rows is None:
+                candles = cached
+            else:
+                # Açık mumu güncelle, yeni kapanan mumları ekle
+                keep = cached[cached[:, 0] < new_rows[0, 0]]
+                candles = np.concatenate([keep, new_rows])[-max_rows:]
+
+        if self.store is not None:
+            self._persist(key, candles, timeframe_ms, now)
+
+        with self.lock:
+            self.candles[key] = candles
+            if incremental:
+                self.incremental_fetches += 1
+            else:
+                self.full_fetches += 1
+
+        return candles[-limit:]
+
+    def get_last_candle_time(self, symbol, timeframe):
+        """Open time (ms) of the newest cached candle, None if not cached"""
+        with self.lock:
+            cached = self.candles.get((symbol, timeframe))
+        return None if cached is None else int(cached[-1, 0])
+
+    def clear(self, symbol=None):
+        """Drop cached candles for one symbol or for all symbols"""
+        with self.lock:
+            for key in list(self.candles):
+                if symbol is None or key[0] == symbol:
+                    del self.candles[key]
+                    self.max_rows.pop(key, None)
+                    self.persisted.pop(key, None)
+
+    def stats(self):
+        """Fetch counters since startup"""
+        return {
+            'symbols': len(self.candles),
+            'full_fetches': self.full_fetches,
+            'incremental_fetches': self.incremental_fetches,
+            'cache_hits': self.cache_hits
+        }
+
+
+# Bot genelinde paylaşılan mum önbelleği
+candle_cache = CandleCache()
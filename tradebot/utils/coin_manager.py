@@ -2,6 +2,8 @@ import logging
 from datetime import datetime
 import json
 import os
+# Coin listesi okuyucusu backfill ve model eğitimi ile ortak (market_data depo kökünde)
+from market_data.coin_list import read_coin_list
 
 logger = logging.getLogger(__name__)
 
@@ -10,15 +12,7 @@ def load_coins_from_json(filename='coins.json'):
     """Load coin list from JSON file"""
     try:
         if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    coins = data
-                elif isinstance(data, dict) and 'coins' in data:
-                    coins = data['coins']
-                else:
-                    logger.error("Invalid JSON format")
-                    return None
+            coins = read_coin_list(filename)
             logger.info(f"Loaded {len(coins)} coins from {filename}")
             return coins
         else:
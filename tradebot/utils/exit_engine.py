@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, percent):
+    """Percentile of a small list (nearest rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class ExitEngine:
+    """Evaluates exits for open positions on every price tick, independent of the scan loop
+
+    evaluate(symbol, price, tick_time) -> True when an exit order was sent
+    get_symbols() -> symbols of open positions
+    fetch_prices(symbols) -> {symbol: price}, used by the fallback poller
+    """
+
+    def __init__(self, evaluate, get_symbols, fetch_prices=None, poll_interval=1.0, report_interval=300):
+        self.evaluate = evaluate
+        self.get_symbols = get_symbols
+        self.fetch_prices = fetch_prices
+        self.poll_interval = poll_interval
+        self.report_interval = report_interval
+
+        self.pending = {}  # symbol -> (fiyat, tick zamanı); sadece son tick tutulur
+        self.last_tick = {}  # symbol -> son tick zamanı (monotonic)
+        self.condition = threading.Condition()
+        self.running = False
+        self.threads = []
+
+        self.evaluations = 0
+        self.decision_latencies = deque(maxlen=5000)  # tick -> değerlendirme (ms)
+        self.order_latencies = deque(maxlen=500)      # tick -> çıkış emri (ms)
+        self.last_report = time.monotonic()
+
+    def on_tick(self, symbol, price, event_time=None):
+        """Price feed listener: queue the newest price for evaluation"""
+        now = time.monotonic()
+        with self.condition:
+            self.pending[symbol] = (price, now)
+            self.last_tick[symbol] = now
+            self.condition.notify()
+
+    def start(self):
+        """Start the evaluation worker and the fallback poller"""
+        self.running = True
+        self.threads = [threading.Thread(target=self._worker, name="exit-engine", daemon=True)]
+        if self.fetch_prices is not None:
+            self.threads.append(threading.Thread(target=self._poller, name="exit-poller", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        logger.info(f"Exit engine started (poll interval: {self.poll_interval}s)")
+
+    def stop(self):
+        """Stop worker threads"""
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+    def record_order_latency(self, latency_ms):
+        """Called by the order code once the exit order has been sent"""
+        self.order_latencies.append(latency_ms)
+
+    def latency_stats(self):
+        """Tick-to-decision and tick-to-order latency summary in milliseconds"""
+        decisions = list(self.decision_latencies)
+        orders = list(self.order_latencies)
+        return {
+            'evaluations': self.evaluations,
+            'decision_p50_ms': percentile(decisions, 50),
+            'decision_p99_ms': percentile(decisions, 99),
+            'exit_orders': len(orders),
+            'order_p50_ms': percentile(orders, 50),
+            'order_max_ms': max(orders) if orders else 0.0
+        }
+
+    def _worker(self):
+        while self.running:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait(timeout=1.0)
+                batch = self.pending
+                self.pending = {}
+
+            for symbol, (price, tick_time) in batch.items():
+                try:
+                    self.decision_latencies.append((time.monotonic() - tick_time) * 1000)
+                    self.evaluations += 1
+                    self.evaluate(symbol, price, tick_time)
+                except Exception as e:
+                    logger.error(f"Exit evaluation error for {symbol}: {e}")
+
+            self._maybe_report()
+
+    def _poller(self):
+        """Poll prices for positions that have no fresh ticks (feed down or disabled)"""
+        while self.running:
+            started = time.monotonic()
+            try:
+                now = time.monotonic()
+                stale = [
+                    symbol for symbol in self.get_symbols()
+                    if now - self.last_tick.get(symbol, 0) > self.poll_interval * 2
+                ]
+                if stale:
+                    for symbol, price in self.fetch_prices(stale).items():
+                        self.on_tick(symbol, price)
+            except Exception as e:
+                logger.warning(f"Exit poller error: {e}")
+
+            time.sleep(max(self.poll_interval - (time.monotonic() - started), 0.05))
+
+    def _maybe_report(self):
+        if time.monotonic() - self.last_report < self.report_interval:
+            return
+        self.last_report = time.monotonic()
+        stats = self.latency_stats()
+        logger.info(f"Exit engine: {stats['evaluations']} evaluations | "
+                    f"Tick->decision p50: {stats['decision_p50_ms']:.1f}ms p99: {stats['decision_p99_ms']:.1f}ms | "
+                    f"Exit orders: {stats['exit_orders']} (tick->order p50: {stats['order_p50_ms']:.1f}ms, "
+                    f"max: {stats['order_max_ms']:.1f}ms)")
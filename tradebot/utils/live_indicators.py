@@ -0,0 +1,121 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from indicators.streaming import LiveIndicators
+
+logger = logging.getLogger(__name__)
+
+
+def live_position_score(values, position_type):
+    """0-100 share of live indicator checks that agree with the position direction
+
+    Checks: short EMA vs long EMA, MACD vs signal, RSI vs 50 and price vs Bollinger
+    middle band. Checks still warming up (NaN) are skipped; None if none is ready.
+    """
+    checks = [
+        (values['short_ema'], values['long_ema']),
+        (values['macd'], values['macd_signal']),
+        (values['rsi'], 50.0),
+        (values['close'], values['bb_middle'])
+    ]
+    votes = [value > reference for value, reference in checks
+             if not (math.isnan(value) or math.isnan(reference))]
+    if not votes:
+        return None
+    bullish = sum(votes) / len(votes) * 100
+    return bullish if position_type.lower() == 'long' else 100 - bullish
+
+
+class LiveIndicatorTracker:
+    """Streaming indicators per open position, advanced on every price tick
+
+    Symbols are seeded from the candle cache on a background thread (seed() when the
+    position opens), because load_candles may make a REST request; update() only consumes
+    seeded state and returns None until it is ready, so the exit engine never waits on it.
+    Ticks inside the current candle are fed with closed=False (state unchanged); when a
+    tick falls into a later candle, the tracked candle (high/low/last price of its ticks)
+    is committed as closed.
+
+    load_candles(symbol) -> (n, 6) OHLCV array, the last row may be the open candle
+    """
+
+    def __init__(self, load_candles, timeframe_ms, **indicator_kwargs):
+        self.load_candles = load_candles
+        self.timeframe_ms = timeframe_ms
+        self.indicator_kwargs = indicator_kwargs
+        self.states = {}  # symbol -> {'indicators', 'open_time', 'high', 'low', 'close'}
+        self.seeding = set()  # arka planda kurulumu bekleyen semboller
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-indicators")
+
+    def _seed(self, symbol, now_ms):
+        candles = self.load_candles(symbol)
+        if candles is None or len(candles) == 0:
+            return None
+        indicators = LiveIndicators(**self.indicator_kwargs)
+        closed = candles[candles[:, 0] + self.timeframe_ms <= now_ms]
+        for _, _, high, low, close, _ in closed:
+            indicators.update(float(high), float(low), float(close))
+
+        state = {'indicators': indicators, 'open_time': None}
+        if len(closed) < len(candles):
+            # Açık mumun şimdiye kadarki high/low değerleri
+            open_time, _, high, low, close, _ = candles[-1]
+            state.update(open_time=int(open_time), high=float(high), low=float(low), close=float(close))
+        return state
+
+    def _seed_job(self, symbol, now_ms):
+        try:
+            state = self._seed(symbol, int(time.time() * 1000) if now_ms is None else now_ms)
+        except Exception as e:
+            logger.warning(f"Could not seed live indicators for {symbol}: {e}")
+            state = None
+        with self.lock:
+            # discard() sırasında kapanan pozisyon tekrar eklenmez
+            if symbol not in self.seeding:
+                return
+            self.seeding.discard(symbol)
+            if state is not None:
+                self.states[symbol] = state
+
+    def seed(self, symbol, now_ms=None):
+        """Seed a symbol from the candle cache in the background (no-op while one is pending)"""
+        with self.lock:
+            if symbol in self.seeding:
+                return
+            self.seeding.add(symbol)
+        self.executor.submit(self._seed_job, symbol, now_ms)
+
+    def update(self, symbol, price, now_ms=None):
+        """Feed a price tick, returns the live indicator values (None until the symbol is seeded)"""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        candle_open = now_ms - now_ms % self.timeframe_ms
+
+        with self.lock:
+            state = self.states.get(symbol)
+            if state is not None and state['open_time'] is not None and candle_open > state['open_time'] + self.timeframe_ms:
+                # Tick gelmeyen mumlar kaçırıldı: geçmişten yeniden kur
+                del self.states[symbol]
+                state = None
+        if state is None:
+            self.seed(symbol, now_ms)
+            return None
+
+        with self.lock:
+            indicators = state['indicators']
+            if state['open_time'] is not None and candle_open > state['open_time']:
+                indicators.update(state['high'], state['low'], state['close'])
+                state['open_time'] = None
+            if state['open_time'] is None:
+                state.update(open_time=candle_open, high=price, low=price, close=price)
+            else:
+                state.update(high=max(state['high'], price), low=min(state['low'], price), close=price)
+            return indicators.update(state['high'], state['low'], price, closed=False)
+
+    def discard(self, symbol):
+        """Stop tracking a closed position"""
+        with self.lock:
+            self.states.pop(symbol, None)
+            self.seeding.discard(symbol)
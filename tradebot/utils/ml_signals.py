@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from config import ML_MIN_CONFIDENCE, ML_SIGNAL_THRESHOLD, ML_PREDICTION_WEIGHT
+from market_data.prediction_client import request_predictions
+
+logger = logging.getLogger(__name__)
+
+
+def ml_signal_score(prediction, trend_direction, min_confidence=ML_MIN_CONFIDENCE, threshold=ML_SIGNAL_THRESHOLD):
+    """0-100 support of a prediction for the trade direction, None when the prediction is not usable
+
+    Confidence is the rf/gb agreement; a move of `threshold` percent or more in the
+    trade direction gives the full confidence, the opposite direction gives 0.
+    """
+    if not prediction or not prediction.get('success') or trend_direction not in ('long', 'short'):
+        return None
+    confidence = min(max(prediction['agreement'], 0.0), 100.0) / 100
+    if confidence < min_confidence:
+        return None
+    change = prediction['change_percent']
+    if (change > 0) != (trend_direction == 'long'):
+        return 0.0
+    return min(abs(change) / threshold, 1.0) * confidence * 100
+
+
+def blend_ml_score(score, ml_score, weight=ML_PREDICTION_WEIGHT):
+    """Mix the strategy score with the ML score (unchanged without a usable prediction)"""
+    if ml_score is None:
+        return score
+    return score * (1 - weight) + ml_score * weight
+
+
+def candle_time_ms(value):
+    """ISO candle open time from the model server (UTC) -> epoch ms"""
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class MLPredictionCache:
+    """Model predictions refreshed in the background once per candle close
+
+    The scanner reads them with get(symbol, budget): a fresh prediction is returned
+    at once, otherwise it waits at most `budget` seconds for the refresh thread.
+
+    fetch_predictions(symbols) -> {symbol: prediction}
+    """
+
+    def __init__(self, fetch_predictions, timeframe_ms=3600000, refresh_delay=5.0, retry_interval=60.0):
+        self.fetch_predictions = fetch_predictions
+        self.timeframe_ms = timeframe_ms
+        self.refresh_delay = refresh_delay    # Mum kapanışından sonra bekleme (saniye)
+        self.retry_interval = retry_interval  # Başarısız/eski sonuç için tekrar deneme aralığı (saniye)
+
+        self.symbols = []
+        self.predictions = {}    # symbol -> tahmin
+        self.last_attempt = {}   # symbol -> son istek zamanı (monotonic)
+        self.requested = set()   # Tarayıcının beklediği semboller
+        self.available = True    # Son istek başarılı mı (sunucu kapalıyken bekleme yapılmaz)
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def track(self, symbols):
+        """Symbols refreshed on every candle close"""
+        with self.condition:
+            self.symbols = list(symbols)
+            self.condition.notify()
+
+    def _is_fresh(self, prediction, now_ms):
+        """Prediction made on the last closed candle"""
+        if not prediction or not prediction.get('success'):
+            return False
+        return now_ms < candle_time_ms(prediction['candle_time']) + 2 * self.timeframe_ms
+
+    def get(self, symbol, budget=0.05):
+        """Fresh prediction for a symbol, None if it is not available within `budget` seconds"""
+        deadline = time.monotonic() + budget
+        with self.condition:
+            prediction = self.predictions.get(symbol)
+            if self._is_fresh(prediction, time.time() * 1000):
+                self.hits += 1
+                return prediction
+
+            if self.available and budget > 0:
+                self.requested.add(symbol)
+                self.condition.notify_all()
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                    prediction = self.predictions.get(symbol)
+                    if self._is_fresh(prediction, time.time() * 1000):
+                        self.hits += 1
+                        return prediction
+
+            self.misses += 1
+            return None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, name="ml-predictions", daemon=True)
+        self.thread.start()
+        logger.info(f"ML prediction cache started ({len(self.symbols)} symbols)")
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _due_symbols(self):
+        """Stale symbols whose last request is older than retry_interval"""
+        now_ms = time.time() * 1000
+        now = time.monotonic()
+        candidates = list(dict.fromkeys(self.symbols + list(self.requested)))
+        return [
+            symbol for symbol in candidates
+            if not self._is_fresh(self.predictions.get(symbol), now_ms)
+            and now - self.last_attempt.get(symbol, -self.retry_interval) >= self.retry_interval
+        ]
+
+    def _next_close_wait(self):
+        """Seconds until the next candle close + refresh_delay"""
+        now_ms = time.time() * 1000
+        next_close = (now_ms // self.timeframe_ms + 1) * self.timeframe_ms
+        return (next_close - now_ms) / 1000 + self.refresh_delay
+
+    def _worker(self):
+        while self.running:
+            with self.condition:
+                due = self._due_symbols()
+                if not due:
+                    self.condition.wait(min(self._next_close_wait(), self.retry_interval))
+                    continue
+                now = time.monotonic()
+                for symbol in due:
+                    self.last_attempt[symbol] = now
+                self.requested.difference_update(due)
+
+            try:
+                predictions = self.fetch_predictions(due)
+                available = True
+            except Exception as e:
+                if self.available:
+                    logger.warning(f"ML predictions unavailable: {e}")
+                predictions, available = {}, False
+
+            with self.condition:
+                if available and not self.available:
+                    logger.info("ML predictions available again")
+                self.available = available
+                self.predictions.update(predictions)
+                self.refreshes += 1
+                self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'symbols': len(self.predictions),
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'available': self.available
+            }
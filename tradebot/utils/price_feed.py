@@ -0,0 +1,223 @@
+import asyncio
+import csv
+import json
+import logging
+import threading
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+BINANCE_FUTURES_WS_URL = 'wss://fstream.binance.com/ws'
+
+
+def to_stream_id(symbol):
+    """'BTC/USDT' -> 'btcusdt'"""
+    return symbol.split(':')[0].replace('/', '').lower()
+
+
+class BasePriceFeed:
+    """In-memory latest price table shared by live and replay feeds"""
+
+    def __init__(self, max_age=5.0):
+        self.max_age = max_age
+        self.prices = {}  # symbol -> (fiyat, olay zamanı ms, alındığı monotonic zaman)
+        self.symbols_by_id = {}  # 'btcusdt' -> 'BTC/USDT'
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def watch(self, symbols):
+        """Start receiving prices for symbols"""
+        with self.lock:
+            for symbol in symbols:
+                self.symbols_by_id[to_stream_id(symbol)] = symbol
+
+    def unwatch(self, symbols):
+        """Stop receiving prices for symbols"""
+        with self.lock:
+            for symbol in symbols:
+                self.symbols_by_id.pop(to_stream_id(symbol), None)
+                self.prices.pop(symbol, None)
+
+    def add_listener(self, callback):
+        """callback(symbol, price, event_time_ms) is called from the feed thread on every tick"""
+        self.listeners.append(callback)
+
+    def get_price(self, symbol, max_age=None):
+        """Latest price or None when missing or older than max_age seconds"""
+        max_age = self.max_age if max_age is None else max_age
+        with self.lock:
+            entry = self.prices.get(symbol)
+        if entry is None or time.monotonic() - entry[2] > max_age:
+            return None
+        return entry[0]
+
+    def _publish(self, symbol, price, event_time):
+        with self.lock:
+            self.prices[symbol] = (price, event_time, time.monotonic())
+        for callback in self.listeners:
+            try:
+                callback(symbol, price, event_time)
+            except Exception as e:
+                logger.error(f"Price listener error for {symbol}: {e}")
+
+
+class PriceFeed(BasePriceFeed):
+    """Binance futures websocket price feed running in a background thread
+
+    stream='aggTrade'     : last trade price (real time)
+    stream='markPrice@1s' : mark price, once per second
+    """
+
+    def __init__(self, stream='aggTrade', url=BINANCE_FUTURES_WS_URL, max_age=5.0):
+        super().__init__(max_age)
+        self.stream = stream
+        self.url = url
+        self.loop = None
+        self.ws = None
+        self.thread = None
+        self.running = False
+        self.request_id = 0
+
+    def is_available(self):
+        return aiohttp is not None
+
+    def start(self):
+        """Start the websocket thread, returns False if aiohttp is not installed"""
+        if aiohttp is None:
+            logger.warning("aiohttp not installed, price feed disabled (REST ticker fallback)")
+            return False
+        if self.running:
+            return True
+
+        self.running = True
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="price-feed", daemon=True)
+        self.thread.start()
+        logger.info(f"Price feed started ({self.stream})")
+        return True
+
+    def stop(self):
+        """Stop the websocket thread"""
+        self.running = False
+        if self.loop is not None and self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def watch(self, symbols):
+        new_symbols = [s for s in symbols if to_stream_id(s) not in self.symbols_by_id]
+        super().watch(symbols)
+        if new_symbols:
+            self._send_threadsafe('SUBSCRIBE', new_symbols)
+
+    def unwatch(self, symbols):
+        super().unwatch(symbols)
+        self._send_threadsafe('UNSUBSCRIBE', symbols)
+
+    def _stream_names(self, symbols):
+        return [f"{to_stream_id(symbol)}@{self.stream}" for symbol in symbols]
+
+    def _send_threadsafe(self, method, symbols):
+        if self.loop is None or self.ws is None:
+            return  # Bağlantı kurulunca tüm semboller abone edilir
+        asyncio.run_coroutine_threadsafe(self._send(method, symbols), self.loop)
+
+    async def _send(self, method, symbols):
+        if self.ws is None or self.ws.closed or not symbols:
+            return
+        self.request_id += 1
+        await self.ws.send_json({'method': method, 'params': self._stream_names(symbols), 'id': self.request_id})
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._run())
+
+    async def _run(self):
+        backoff = 1
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        self.ws = ws
+                        backoff = 1
+                        with self.lock:
+                            symbols = list(self.symbols_by_id.values())
+                        await self._send('SUBSCRIBE', symbols)
+                        logger.info(f"Price feed connected, {len(symbols)} symbols subscribed")
+
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_message(msg.data)
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                except Exception as e:
+                    logger.warning(f"Price feed connection error: {e}")
+
+                self.ws = None
+                if self.running:
+                    # Yeniden bağlanma (üstel bekleme)
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60)
+
+    def _handle_message(self, raw):
+        data = json.loads(raw)
+        data = data.get('data', data)  # /stream uç noktası sarmalı
+        event = data.get('e')
+        if event not in ('aggTrade', 'markPriceUpdate'):
+            return
+
+        symbol = self.symbols_by_id.get(data['s'].lower())
+        if symbol is None:
+            return
+        self._publish(symbol, float(data['p']), int(data['E']))
+
+
+class ReplayPriceFeed(BasePriceFeed):
+    """Replays recorded ticks into the price table, stand-in for PriceFeed in tests"""
+
+    def __init__(self, ticks, speed=None, max_age=float('inf')):
+        """ticks: iterable of (timestamp_ms, symbol, price); speed=None replays as fast as possible"""
+        super().__init__(max_age)
+        self.ticks = sorted(ticks, key=lambda tick: tick[0])
+        self.speed = speed
+        self.thread = None
+        self.running = False
+
+    @classmethod
+    def from_csv(cls, path, **kwargs):
+        """Load ticks from a CSV file with timestamp,symbol,price columns"""
+        with open(path, 'r', encoding='utf-8') as f:
+            ticks = [(int(row['timestamp']), row['symbol'], float(row['price'])) for row in csv.DictReader(f)]
+        return cls(ticks, **kwargs)
+
+    def is_available(self):
+        return True
+
+    def replay(self):
+        """Publish all ticks in the calling thread"""
+        previous = None
+        for timestamp, symbol, price in self.ticks:
+            if self.speed and previous is not None:
+                time.sleep(max(timestamp - previous, 0) / 1000 / self.speed)
+            previous = timestamp
+            if not self.running and self.thread is not None:
+                break
+            if to_stream_id(symbol) in self.symbols_by_id or not self.symbols_by_id:
+                self._publish(symbol, price, timestamp)
+
+    def start(self):
+        """Replay ticks in a background thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self.replay, name="price-replay", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=5)
@@ -0,0 +1,104 @@
+import logging
+import ccxt
+from utils.rate_limiter import count_request
+
+logger = logging.getLogger(__name__)
+
+# Binance futures üzerinde pozisyonu koruyan emirler (bot kapansa da borsada kalır).
+# Hedge mode: positionSide ile gönderilen kapatma emirleri pozisyonu sadece azaltabilir.
+
+STOP_LOSS = 'stop_loss'
+TAKE_PROFIT = 'take_profit'
+TRAILING_STOP = 'trailing_stop'
+
+
+def _close_side(position_type):
+    return 'SELL' if position_type.lower() == 'long' else 'BUY'
+
+
+def _position_side(position_type):
+    return 'LONG' if position_type.lower() == 'long' else 'SHORT'
+
+
+def create_trigger_order(exchange, symbol, position_type, amount, trigger_price,
+                         order_type='STOP_MARKET', working_type='MARK_PRICE'):
+    """Place a STOP_MARKET or TAKE_PROFIT_MARKET order closing the position, returns the order id"""
+    params = {
+        'stopPrice': exchange.price_to_precision(symbol, trigger_price),
+        'positionSide': _position_side(position_type),
+        'workingType': working_type
+    }
+    count_request('create_order')
+    order = exchange.create_order(symbol, order_type, _close_side(position_type), amount, None, params)
+    return order['id']
+
+
+def create_trailing_stop_order(exchange, symbol, position_type, amount, activation_price, callback_rate,
+                               working_type='MARK_PRICE'):
+    """Place a TRAILING_STOP_MARKET order, callback_rate is a price percentage (Binance: 0.1 - 5)"""
+    params = {
+        'activationPrice': exchange.price_to_precision(symbol, activation_price),
+        'callbackRate': min(max(round(callback_rate, 1), 0.1), 5.0),
+        'positionSide': _position_side(position_type),
+        'workingType': working_type
+    }
+    count_request('create_order')
+    order = exchange.create_order(symbol, 'TRAILING_STOP_MARKET', _close_side(position_type), amount, None, params)
+    return order['id']
+
+
+def place_protection_orders(exchange, symbol, position_type, amount, stop_price, take_profit_price,
+                            trailing=None, working_type='MARK_PRICE'):
+    """Place stop loss, take profit and optional trailing stop orders
+
+    trailing: (activation_price, callback_rate) or None
+    Returns {name: order_id} for the orders that were accepted.
+    """
+    orders = {}
+    requests = [
+        (STOP_LOSS, lambda: create_trigger_order(exchange, symbol, position_type, amount, stop_price,
+                                                 'STOP_MARKET', working_type)),
+        (TAKE_PROFIT, lambda: create_trigger_order(exchange, symbol, position_type, amount, take_profit_price,
+                                                   'TAKE_PROFIT_MARKET', working_type))
+    ]
+    if trailing is not None:
+        requests.append((TRAILING_STOP, lambda: create_trailing_stop_order(exchange, symbol, position_type, amount,
+                                                                           trailing[0], trailing[1], working_type)))
+
+    for name, create in requests:
+        try:
+            orders[name] = create()
+        except Exception as e:
+            logger.error(f"Could not place {name} order for {symbol}: {e}")
+
+    logger.info(f"Protection orders for {symbol}: {', '.join(orders) or 'none'}")
+    return orders
+
+
+def cancel_order_safe(exchange, symbol, order_id):
+    """Cancel an order, ignoring orders that were already filled or canceled"""
+    try:
+        count_request('cancel_order')
+        exchange.cancel_order(order_id, symbol)
+        return True
+    except ccxt.OrderNotFound:
+        return False
+    except Exception as e:
+        logger.warning(f"Could not cancel order {order_id} for {symbol}: {e}")
+        return False
+
+
+def cancel_protection_orders(exchange, symbol, orders):
+    """Cancel all protection orders of a position"""
+    for order_id in (orders or {}).values():
+        cancel_order_safe(exchange, symbol, order_id)
+
+
+def fetch_open_position_sides(exchange, symbols):
+    """{symbol: {'long', 'short'}} for positions that are still open on the exchange"""
+    open_sides = {}
+    count_request('fetch_positions')
+    for position in exchange.fetch_positions(symbols):
+        if abs(float(position.get('contracts') or 0)) > 0 and position.get('side'):
+            open_sides.setdefault(position['symbol'].split(':')[0], set()).add(position['side'])
+    return open_sides
@@ -0,0 +1,57 @@
+import logging
+import threading
+import time
+# Limit ve ağırlık tablosu backfill ile ortak (market_data depo kökünde, giriş betikleri path'e ekler)
+from market_data.rate_limits import (
+    BINANCE_WEIGHT_LIMIT,
+    REQUEST_WEIGHTS,
+    SCAN_WEIGHT_BUDGET,
+    WeightWindow,
+    kline_request_weight
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WeightRateLimiter(WeightWindow):
+    """Thread-safe sliding window limiter for Binance request weight
+
+    Kline fetches wait in acquire() until their weight fits. Every other REST call
+    (tickers, positions, balance, orders) is counted with record() without waiting, so
+    exits never queue behind the scan but the scan backs off while they use weight.
+    """
+
+    def __init__(self, max_weight, window=60.0):
+        super().__init__(max_weight, window)
+        self.lock = threading.Lock()
+
+    def acquire(self, weight=1):
+        """Block until `weight` fits into the current one minute window"""
+        while True:
+            with self.lock:
+                sleep_time = self._reserve(weight, time.monotonic())
+            if not sleep_time:
+                return
+
+            logger.debug(f"Weight limit reached ({self.used_weight}/{self.max_weight}), waiting {sleep_time:.2f}s")
+            time.sleep(sleep_time)
+
+    def record(self, weight):
+        """Count a request that must not wait, even if the window is already full"""
+        with self.lock:
+            self._record(weight, time.monotonic())
+
+    def current_weight(self):
+        """Weight used in the last window"""
+        with self.lock:
+            self._expire(time.monotonic())
+            return self.used_weight
+
+
+# Bot genelinde paylaşılan limiter (kalan pay: backfill ve sayılmayan istekler, bkz. market_data/rate_limits.py)
+api_weight_limiter = WeightRateLimiter(int(BINANCE_WEIGHT_LIMIT * SCAN_WEIGHT_BUDGET))
+
+
+def count_request(name, count=1):
+    """Count non-kline REST calls (REQUEST_WEIGHTS key) in the shared limiter"""
+    api_weight_limiter.record(REQUEST_WEIGHTS[name] * count)
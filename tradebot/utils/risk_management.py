@@ -1,8 +1,21 @@
 import logging
-from config import STOP_LOSS_PERCENT, TAKE_PROFIT_PERCENT
+from config import (
+    STOP_LOSS_PERCENT,
+    TAKE_PROFIT_PERCENT,
+    TRAILING_STOP_ACTIVATION,
+    TRAILING_STOP_DISTANCE,
+    TRAILING_STOP_STEP
+)
 
 logger = logging.getLogger(__name__)
 
+# ATR bazlı dinamik risk: (minimum skor, stop loss ATR çarpanı, take profit ATR çarpanı)
+DYNAMIC_RISK_MULTIPLIERS = [
+    (90, 10, 30),
+    (70, 15, 25),
+    (0, 20, 15)  # 50-69 puan
+]
+
 def calculate_stop_loss(entry_price, position_type):
     """Calculate stop loss price"""
     if position_type == 'long':
@@ -19,6 +32,13 @@ def calculate_take_profit(entry_price, position_type):
         take_profit = entry_price * (1 - TAKE_PROFIT_PERCENT / 100)
     return take_profit
 
+def pnl_to_price(entry_price, pnl_percent, position_type, leverage=20):
+    """Price at which the leveraged PnL of a position reaches pnl_percent (inverse of check_position_pnl)"""
+    price_change = entry_price * (pnl_percent / leverage / 100)
+    if position_type == 'long':
+        return entry_price + price_change
+    return entry_price - price_change
+
 def check_position_pnl(symbol, position_type, entry_price, current_price, leverage=20):
     """Calculate position PnL"""
     try:
@@ -42,4 +62,68 @@ def check_position_pnl(symbol, position_type, entry_price, current_price, levera
         
     except Exception as e:
         logger.error(f"PnL calculation error for {symbol}: {e}")
-        return 0
\ No newline at end of file
+        return 0
+
+def dynamic_risk_levels(signal_score, current_price, atr, multipliers=DYNAMIC_RISK_MULTIPLIERS):
+    """Stop loss and take profit percentages (leveraged PnL) from signal score and ATR"""
+    sl_multiplier, tp_multiplier = multipliers[-1][1:]
+    for min_score, sl, tp in multipliers:
+        if signal_score >= min_score:
+            sl_multiplier, tp_multiplier = sl, tp
+            break
+    
+    # Stop loss ve take profit mesafeleri fiyatın yüzdesi olarak
+    stop_loss_percent = (atr * sl_multiplier / current_price) * 100
+    take_profit_percent = (atr * tp_multiplier / current_price) * 100
+    return stop_loss_percent, take_profit_percent
+
+def create_trailing_stop(entry_price, activation_percent=TRAILING_STOP_ACTIVATION,
+                         trailing_distance=TRAILING_STOP_DISTANCE, step_percent=TRAILING_STOP_STEP):
+    """Initial trailing stop state for a new position"""
+    return {
+        "entry_price": float(entry_price),
+        "activation_percent": activation_percent,
+        "step_percent": step_percent,      # Her adımda artış miktarı
+        "highest_pnl": 0,
+        "trailing_distance": trailing_distance,
+        "is_active": False,
+        "stop_level": None,
+        "last_upgrade_level": 0      # Son stop yükseltme seviyesi
+    }
+
+def advance_trailing_stop(ts, position_type, current_pnl):
+    """Update a trailing stop state with the current leveraged PnL
+
+    Returns 'activated', 'upgraded' or None when the stop level did not move.
+    """
+    # Check if trailing stop should be activated
+    if not ts["is_active"]:
+        if current_pnl >= ts["activation_percent"]:
+            ts["is_active"] = True
+            # İlk etkinleşmede, stop seviyesini giriş seviyesine çek (break-even)
+            ts["stop_level"] = ts["entry_price"]
+            return 'activated'
+        return None
+    
+    # Actif olduğunda, her adım artışında stopu yükselt (8, 13, 18, 23, ...)
+    current_upgrade_level = int((current_pnl - ts["activation_percent"]) / ts["step_percent"])
+    if current_upgrade_level <= ts["last_upgrade_level"]:
+        return None
+    
+    ts["last_upgrade_level"] = current_upgrade_level
+    
+    # Yeni stop seviyesi = giriş fiyatı +/- (upgrade level * step percent)
+    price_change = ts["entry_price"] * (current_upgrade_level * ts["step_percent"] / 100)
+    if position_type.lower() == "long":
+        ts["stop_level"] = ts["entry_price"] + price_change
+    else:  # short
+        ts["stop_level"] = ts["entry_price"] - price_change
+    return 'upgraded'
+
+def trailing_stop_hit(ts, position_type, current_price):
+    """True when an active trailing stop is crossed by current_price"""
+    if not ts["is_active"]:
+        return False
+    if position_type.lower() == "long":
+        return current_price <= ts["stop_level"]
+    return current_price >= ts["stop_level"]